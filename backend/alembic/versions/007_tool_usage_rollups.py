@@ -0,0 +1,62 @@
+"""007_tool_usage_rollups — create tool_usage_hourly_rollups table
+
+Revision ID: 007_tool_usage_rollups
+Revises: 006_wait_poll
+Create Date: 2025-01-01 00:00:00.000000
+
+Non-breaking: adds a new table; no existing columns are modified.
+The table is filled by the rollup_tool_usage Celery task (first run
+backfills the last 30 days from tool_usage_logs).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# ── Revision identifiers ──────────────────────────────────────────────────────
+
+revision      = "007_tool_usage_rollups"
+down_revision = "006_wait_poll"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tool_usage_hourly_rollups",
+
+        sa.Column("id",         sa.String(36),  nullable=False, primary_key=True),
+        sa.Column("tool_name",  sa.String(100), nullable=False),
+        sa.Column("hour_start", sa.DateTime(),  nullable=False),
+
+        sa.Column("call_count",  sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_count", sa.Integer(), nullable=False, server_default="0"),
+
+        sa.Column("latency_count",  sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_sum_ms", sa.Float(),   nullable=False, server_default="0"),
+        sa.Column("latency_min_ms", sa.Float(),   nullable=True),
+        sa.Column("latency_max_ms", sa.Float(),   nullable=True),
+
+        # Sparse {bucket index: count} log-scale latency histogram
+        sa.Column("latency_histogram", postgresql.JSON(), nullable=False,
+                  server_default=sa.text("'{}'::json")),
+        sa.Column("caller_counts",     postgresql.JSON(), nullable=False,
+                  server_default=sa.text("'{}'::json")),
+        sa.Column("error_counts",      postgresql.JSON(), nullable=False,
+                  server_default=sa.text("'{}'::json")),
+
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+
+        sa.UniqueConstraint("tool_name", "hour_start", name="uq_tool_usage_rollup_tool_hour"),
+    )
+
+    # ── Indexes ───────────────────────────────────────────────────────────
+    # (tool_name, hour_start) is covered by the unique constraint above.
+    op.create_index("ix_tool_usage_hourly_rollups_hour_start",
+                    "tool_usage_hourly_rollups", ["hour_start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tool_usage_hourly_rollups_hour_start",
+                  table_name="tool_usage_hourly_rollups")
+    op.drop_table("tool_usage_hourly_rollups")
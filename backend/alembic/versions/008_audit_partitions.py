@@ -0,0 +1,125 @@
+"""008_audit_partitions — optional monthly range partitioning of audit_logs
+
+Revision ID: 008_audit_partitions
+Revises: 007_tool_usage_rollups
+Create Date: 2025-01-01 00:00:00.000000
+
+Opt-in: only runs when AUDIT_LOG_PARTITIONING=true at migration time,
+otherwise this revision is a no-op.  Partitioning rewrites audit_logs:
+
+  * audit_logs becomes a table PARTITION BY RANGE (created_at) with one
+    partition per month (current month + 2 ahead) and a default partition
+    that receives all existing rows;
+  * the primary key becomes (id, created_at) and the agentium_id unique
+    constraint becomes (agentium_id, created_at), as PostgreSQL requires
+    the partition key in every unique constraint;
+  * the self-referencing parent_audit_id foreign key is dropped (a foreign
+    key cannot target a partitioned table without the partition key).
+
+Later months are created by the maintain_audit_partitions Celery task.
+Old months can then be detached or dropped instead of DELETEd.
+"""
+
+import os
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# ── Revision identifiers ──────────────────────────────────────────────────────
+
+revision      = "008_audit_partitions"
+down_revision = "007_tool_usage_rollups"
+branch_labels = None
+depends_on    = None
+
+
+MONTHS_AHEAD = 2
+
+
+def _enabled() -> bool:
+    return os.getenv("AUDIT_LOG_PARTITIONING", "false").lower() == "true"
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'audit_logs'"
+    )).first() is not None
+
+
+def _month_bounds(months_ahead: int):
+    today = datetime.utcnow()
+    year, month = today.year, today.month
+    for _ in range(months_ahead + 1):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        yield year, month, next_year, next_month
+        year, month = next_year, next_month
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _enabled() or _is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            LIKE audit_logs_unpartitioned INCLUDING DEFAULTS
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("UPDATE audit_logs_unpartitioned SET created_at = now() WHERE created_at IS NULL")
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT uq_audit_logs_agentium_id "
+        "UNIQUE (agentium_id, created_at)"
+    )
+
+    # ── Partitions ────────────────────────────────────────────────────────
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+    for year, month, next_year, next_month in _month_bounds(MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE audit_logs_{year:04d}_{month:02d} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{year:04d}-{month:02d}-01') "
+            f"TO ('{next_year:04d}-{next_month:02d}-01')"
+        )
+
+    # ── Data ──────────────────────────────────────────────────────────────
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_unpartitioned")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+    # ── Indexes (created on every partition) ──────────────────────────────
+    op.create_index("idx_audit_timestamp",      "audit_logs", ["created_at"])
+    op.create_index("idx_audit_actor_action",   "audit_logs", ["actor_id", "action"])
+    op.create_index("idx_audit_level_category", "audit_logs", ["level", "category"])
+    op.create_index("idx_audit_correlation",    "audit_logs", ["correlation_id"])
+    op.create_index("ix_audit_logs_actor_id",   "audit_logs", ["actor_id"])
+    op.create_index("ix_audit_logs_target_id",  "audit_logs", ["target_id"])
+    op.create_index("ix_audit_logs_session_id", "audit_logs", ["session_id"])
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if not _is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            LIKE audit_logs_partitioned INCLUDING DEFAULTS
+        )
+    """)
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+
+    op.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_agentium_id_key UNIQUE (agentium_id)")
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_parent_audit_id_fkey "
+        "FOREIGN KEY (parent_audit_id) REFERENCES audit_logs (id)"
+    )
+    op.create_index("idx_audit_timestamp",      "audit_logs", ["created_at"])
+    op.create_index("idx_audit_actor_action",   "audit_logs", ["actor_id", "action"])
+    op.create_index("idx_audit_level_category", "audit_logs", ["level", "category"])
+    op.create_index("idx_audit_correlation",    "audit_logs", ["correlation_id"])
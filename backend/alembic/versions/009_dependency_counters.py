@@ -0,0 +1,45 @@
+"""009_dependency_counters — add task_dependencies.pending_predecessors
+
+Revision ID: 009_dependency_counters
+Revises: 008_audit_partitions
+Create Date: 2025-01-01 00:00:00.000000
+
+Non-breaking: adds one nullable column.  It holds, per dependency row, the
+number of lower-order siblings that have not completed yet; the dependency
+scheduler dispatches a child when it reaches zero.  Existing pending rows
+are backfilled here; NULLs are also recomputed by the process_dependency_graph
+sweep.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# ── Revision identifiers ──────────────────────────────────────────────────────
+
+revision      = "009_dependency_counters"
+down_revision = "008_audit_partitions"
+branch_labels = None
+depends_on    = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "task_dependencies",
+        sa.Column("pending_predecessors", sa.Integer(), nullable=True),
+    )
+
+    # ── Backfill ──────────────────────────────────────────────────────────
+    op.execute("""
+        UPDATE task_dependencies d
+        SET pending_predecessors = (
+            SELECT count(*) FROM task_dependencies p
+            WHERE p.parent_task_id = d.parent_task_id
+              AND p.dependency_order < d.dependency_order
+              AND p.status <> 'completed'
+        )
+        WHERE d.status = 'pending'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("task_dependencies", "pending_predecessors")
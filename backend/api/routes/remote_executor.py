@@ -18,7 +18,7 @@ from backend.api.schemas.remote_executor import (
     ExecutionSummaryResponse,
 )
 from backend.services.remote_executor.service import RemoteExecutorService
-from backend.services.remote_executor.sandbox import SandboxConfig
+from backend.services.remote_executor.sandbox import SandboxConfig, sandbox_pool
 from backend.core.security.execution_guard import execution_guard
 from backend.models.entities.remote_execution import (
     RemoteExecutionRecord,
@@ -152,6 +152,14 @@ async def list_sandboxes(
     return [SandboxResponse(**s) for s in sandboxes]
 
 
+@router.get("/sandboxes/pool-stats")
+async def get_sandbox_pool_stats(
+    current_user: dict = Depends(get_current_active_user),
+):
+    """Warm pool sizes, hit rate and warm vs cold startup latency."""
+    return sandbox_pool.get_stats()
+
+
 @router.get("/executions/{execution_id}", response_model=ExecutionSummaryResponse)
 async def get_execution(
     execution_id: str,
@@ -446,7 +446,7 @@ async def execute_tool(
     """
     _require_not_task_agent(agent_tier)
     service = ToolCreationService(db)
-    return service.execute_tool(tool_name, agent_id, body.kwargs, body.task_id)
+    return await service.execute_tool_async(tool_name, agent_id, body.kwargs, body.task_id)
 
 
 @router.get("/{tool_name}/analytics")
@@ -2,12 +2,16 @@
 WebSocket endpoint for real-time chat with authentication.
 """
 
+import asyncio
 import json
-from contextlib import contextmanager
-from datetime import datetime
-from typing import Optional, Dict, Any, List
-
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
+import os
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Deque, List
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, HTTPException, Response
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
@@ -19,6 +23,11 @@ from backend.models.entities.user import User
 from backend.api.dependencies.auth import get_current_user
 import redis.asyncio as redis
 
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for ?format=msgpack replays
+    msgpack = None
+
 router = APIRouter()
 
 
@@ -83,6 +92,129 @@ def _build_enriched_message(content: str, attachments: List[dict]) -> str:
     return file_context
 
 
+# ═══════════════════════════════════════════════════════════
+# Broadcast hub
+# ═══════════════════════════════════════════════════════════
+#
+# A broadcast is serialized once and appended to every connection's bounded
+# send queue; each connection has its own writer task, so clients receive
+# in parallel and a slow one only ever delays itself.  When a queue is full
+# the oldest frame is dropped, and high-rate snapshot events (browser frames
+# per task, MCP stats) replace their queued predecessor instead of piling up.
+#
+# Every broadcast is appended to the WS_REPLAY_STREAM Redis stream and
+# published on WS_RELAY_CHANNEL in one round trip (_PUBLISH_SCRIPT).  The
+# stream entry ID is the event's sequence number: it is added to the frame as
+# "seq", and reconnecting clients pass their last seq to /replay.  The stream
+# keeps at most WS_REPLAY_MAX_EVENTS events no older than
+# WS_REPLAY_RETENTION_SECONDS.  Each API worker runs a relay listener
+# (started in main.py) that delivers events emitted by other workers and by
+# Celery to its own connections.
+
+WS_SEND_QUEUE_SIZE       = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT_SECONDS  = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+WS_RELAY_CHANNEL         = "agentium:ws:relay"
+WS_RELAY_RETRY_SECONDS   = 5.0
+WS_REPLAY_STREAM            = "agentium:ws:events"
+WS_REPLAY_MAX_EVENTS        = int(os.getenv("WS_REPLAY_MAX_EVENTS", "5000"))
+WS_REPLAY_RETENTION_SECONDS = int(os.getenv("WS_REPLAY_RETENTION_SECONDS", "3600"))
+WS_REPLAY_PAGE_LIMIT        = 1000
+
+# KEYS: stream, relay channel
+# ARGV: max events, event type, frame, retention ms, relay envelope header
+_PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'type', ARGV[2], 'data', ARGV[3])
+local now = redis.call('TIME')
+local oldest = tonumber(now[1]) * 1000 - tonumber(ARGV[4])
+redis.call('XTRIM', KEYS[1], 'MINID', '~', string.format('%d', oldest))
+redis.call('PUBLISH', KEYS[2], ARGV[5] .. id .. '\\n' .. ARGV[3])
+return id
+"""
+
+# event type -> payload field that identifies what a newer event supersedes
+COALESCED_EVENT_TYPES: Dict[str, Optional[str]] = {
+    "browser_frame":    "task_id",
+    "mcp_stats_update": None,
+}
+
+
+def _with_seq(frame: str, seq: str) -> str:
+    """Add the stream sequence number to a serialized event without re-encoding it."""
+    if frame == "{}":
+        return f'{{"seq":"{seq}"}}'
+    return f'{{"seq":"{seq}",{frame[1:]}'
+
+
+def _coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    event_type = message.get("type")
+    if event_type not in COALESCED_EVENT_TYPES:
+        return None
+    field = COALESCED_EVENT_TYPES[event_type]
+    return f"{event_type}:{message.get(field)}" if field else event_type
+
+
+class _ClientSender:
+    """Bounded, coalescing send queue drained by one writer task per connection."""
+
+    def __init__(self, websocket: WebSocket, hub: "ConnectionManager"):
+        self.websocket = websocket
+        self._hub = hub
+        self._frames: Deque[List[Any]] = deque()       # [coalesce_key, frame]
+        self._keyed: Dict[str, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, frame: str, key: Optional[str] = None) -> None:
+        if key is not None:
+            queued = self._keyed.get(key)
+            if queued is not None:
+                queued[1] = frame                      # Newer snapshot replaces the queued one
+                self._hub.stats["coalesced"] += 1
+                return
+        if len(self._frames) >= WS_SEND_QUEUE_SIZE:
+            dropped = self._frames.popleft()
+            if dropped[0] is not None:
+                self._keyed.pop(dropped[0], None)
+            self._hub.stats["dropped"] += 1
+        entry = [key, frame]
+        self._frames.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._frames:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            entry = self._frames.popleft()
+            if entry[0] is not None and self._keyed.get(entry[0]) is entry:
+                del self._keyed[entry[0]]
+            try:
+                await asyncio.wait_for(self.websocket.send_text(entry[1]), WS_SEND_TIMEOUT_SECONDS)
+                self._hub.stats["sent"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[WebSocket] Send failed, dropping connection: {exc}")
+                self._hub.disconnect(self.websocket)
+                # Close the socket too: the client reconnects and replays from
+                # its last seq instead of silently missing every broadcast.
+                try:
+                    await asyncio.wait_for(
+                        self.websocket.close(code=1013, reason="Send timed out; reconnect and replay"),
+                        WS_SEND_TIMEOUT_SECONDS,
+                    )
+                except Exception:
+                    pass
+                return
+
+    def close(self) -> None:
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
 # ═══════════════════════════════════════════════════════════
 # Connection Manager
 # ═══════════════════════════════════════════════════════════
@@ -93,12 +225,29 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[WebSocket, Dict[str, Any]] = {}
         self.user_connections: Dict[str, WebSocket] = {}
-        self.redis_client: Optional[redis.Redis] = None
+        self._senders: Dict[WebSocket, _ClientSender] = {}
+        # Long-lived client owned by the API event loop (opened by
+        # start_relay).  Async clients are bound to the loop that created
+        # them, so Celery tasks broadcasting from their own short-lived
+        # loops get a client scoped to the call instead.
+        self._redis: Optional[redis.Redis] = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._publish: Optional[Any] = None
+        self._origin = uuid.uuid4().hex                # Ignore our own relayed events
+        self._relay_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "broadcasts": 0, "sent": 0, "dropped": 0, "coalesced": 0,
+            "relayed_out": 0, "relayed_in": 0,
+        }
 
-    async def _get_redis(self) -> redis.Redis:
-        if not self.redis_client:
-            self.redis_client = await redis.from_url(settings.REDIS_URL, decode_responses=True)
-        return self.redis_client
+    @asynccontextmanager
+    async def _redis_client(self):
+        """The API loop's shared client, or a fresh one closed on exit."""
+        if self._redis is not None and asyncio.get_running_loop() is self._redis_loop:
+            yield self._redis
+            return
+        async with redis.from_url(settings.REDIS_URL, decode_responses=True) as client:
+            yield client
 
     # ── connection lifecycle ─────────────────────────────────────────────────
 
@@ -140,60 +289,128 @@ class ConnectionManager:
 
         self.active_connections[websocket] = user_info
         self.user_connections[username]    = websocket
+        self._senders[websocket]           = _ClientSender(websocket, self)
         print(f"[WebSocket] ✅ Authenticated: {username} ({datetime.utcnow().isoformat()})")
         return user_info
 
     def disconnect(self, websocket: WebSocket) -> Optional[str]:
         """Remove connection; return username if found."""
         username = None
+        sender = self._senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
         if websocket in self.active_connections:
             user_info = self.active_connections.pop(websocket)
             username  = user_info.get("username")
-            if username and username in self.user_connections:
+            if username and self.user_connections.get(username) is websocket:
                 del self.user_connections[username]
             print(f"[WebSocket] ❌ Disconnected: {username}")
         return username
 
     # ── send helpers ─────────────────────────────────────────────────────────
 
+    @staticmethod
+    def _serialize(message: dict) -> str:
+        return json.dumps(message, separators=(",", ":"), default=str)
+
     async def send_personal_message(self, message: dict, username: str) -> bool:
-        """Send JSON message to a specific connected user."""
-        if username in self.user_connections:
-            try:
-                await self.user_connections[username].send_json(message)
-                return True
-            except Exception as exc:
-                print(f"[WebSocket] Error sending to {username}: {exc}")
-        return False
+        """Queue JSON message for a specific connected user."""
+        websocket = self.user_connections.get(username)
+        sender = self._senders.get(websocket) if websocket is not None else None
+        if sender is None:
+            return False
+        sender.push(self._serialize(message))
+        return True
 
     async def broadcast(self, message: dict, exclude: Optional[WebSocket] = None) -> None:
-        """Broadcast JSON message to all authenticated connections."""
+        """Broadcast JSON message to all authenticated connections, in every worker."""
+        frame = self._serialize(message)
+        key   = _coalesce_key(message)
+        self.stats["broadcasts"] += 1
+
         try:
-            r        = await self._get_redis()
-            msg_str  = json.dumps(message)
-            pipeline = r.pipeline()
-            pipeline.lpush("agentium:ws:buffer", msg_str)
-            pipeline.ltrim("agentium:ws:buffer", 0, 99)
-            pipeline.expire("agentium:ws:buffer", 60)
-            await pipeline.execute()
+            async with self._redis_client() as client:
+                publish = self._publish if client is self._redis else client.register_script(_PUBLISH_SCRIPT)
+                seq = await publish(
+                    keys=[WS_REPLAY_STREAM, WS_RELAY_CHANNEL],
+                    args=[
+                        WS_REPLAY_MAX_EVENTS,
+                        message.get("type", ""),
+                        frame,
+                        WS_REPLAY_RETENTION_SECONDS * 1000,
+                        f"{self._origin}\n{key or ''}\n",
+                    ],
+                )
+            frame = _with_seq(frame, seq)
+            self.stats["relayed_out"] += 1
         except Exception as exc:
-            print(f"[WebSocket] Event buffer push error: {exc}")
+            # Still reach local clients; the event just cannot be replayed
+            print(f"[WebSocket] Event stream / relay error: {exc}")
 
-        disconnected = []
-        for connection, user_info in list(self.active_connections.items()):
-            if connection is exclude:
-                continue
-            try:
-                await connection.send_json(message)
-            except Exception as exc:
-                print(f"[WebSocket] Broadcast error to {user_info.get('username')}: {exc}")
-                disconnected.append(connection)
-        for conn in disconnected:
-            self.disconnect(conn)
+        self._deliver_local(frame, key, exclude)
+
+    def _deliver_local(self, frame: str, key: Optional[str], exclude: Optional[WebSocket] = None) -> None:
+        for connection, sender in list(self._senders.items()):
+            if connection is not exclude:
+                sender.push(frame, key)
 
     def get_connection_count(self) -> int:
         return len(self.active_connections)
 
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "connections": len(self.active_connections),
+            "queued": sum(len(s._frames) for s in self._senders.values()),
+            "relay_listening": bool(self._relay_task and not self._relay_task.done()),
+        }
+
+    # ── cross-worker relay ───────────────────────────────────────────────────
+
+    async def start_relay(self) -> None:
+        """Deliver broadcasts published by other workers and Celery."""
+        if self._relay_task and not self._relay_task.done():
+            return
+        if self._redis is None:
+            self._redis_loop = asyncio.get_running_loop()
+            self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._publish = self._redis.register_script(_PUBLISH_SCRIPT)
+        self._relay_task = asyncio.create_task(self._relay_loop())
+
+    async def stop_relay(self) -> None:
+        if self._relay_task:
+            self._relay_task.cancel()
+            self._relay_task = None
+        client, self._redis, self._redis_loop, self._publish = self._redis, None, None, None
+        if client is not None:
+            await client.aclose()
+
+    async def _relay_loop(self) -> None:
+        while True:
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(WS_RELAY_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        origin, key, seq, frame = message["data"].split("\n", 3)
+                    except (AttributeError, ValueError):
+                        continue
+                    if origin == self._origin:
+                        continue
+                    self.stats["relayed_in"] += 1
+                    self._deliver_local(_with_seq(frame, seq), key or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[WebSocket] Relay listener error, reconnecting: {exc}")
+            finally:
+                await pubsub.close()
+                await client.close()
+            await asyncio.sleep(WS_RELAY_RETRY_SECONDS)
+
     # ── typed broadcast events ────────────────────────────────────────────────
 
     async def emit_agent_spawned(
@@ -569,23 +786,92 @@ async def websocket_chat_endpoint(
             pass
 
 
+def _stream_id(entry_id: str) -> tuple:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _replay_start(since_id: Optional[str], since: Optional[str]) -> str:
+    """XRANGE start for a resume point: after a seq, or after an ISO timestamp."""
+    if since_id:
+        _stream_id(since_id)  # Validate
+        return f"({since_id}"
+    if since:
+        ts = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return str(int(ts.timestamp() * 1000) + 1)
+    return "-"
+
+
 @router.get("/replay")
-async def replay_events(since: str, current_user=Depends(get_current_user)):
-    """Fetch buffered broadcast events for reconnection replay."""
+async def replay_events(
+    since_id: Optional[str] = Query(None, description="Last seq received; only later events are returned"),
+    since: Optional[str] = Query(None, description="ISO timestamp, for clients that have no seq yet"),
+    types: Optional[str] = Query(None, description="Comma-separated event types to include"),
+    limit: int = Query(500, ge=1, le=WS_REPLAY_PAGE_LIMIT),
+    format: str = Query("json", pattern="^(json|msgpack)$"),
+    current_user=Depends(get_current_user),
+):
+    """
+    Fetch broadcast events missed while disconnected, oldest first.
+
+    Resume from ``last_id`` while ``has_more`` is true.  ``gap`` is set when
+    ``since_id`` has been trimmed from the stream, i.e. events may be missing.
+    """
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(status_code=400, detail="msgpack replay is not available on this server")
     try:
-        r          = await manager._get_redis()
-        events_str = await r.lrange("agentium:ws:buffer", 0, 99)
-        events     = []
-        for e_str in events_str:
-            try:
-                e_obj = json.loads(e_str)
-                if e_obj.get("timestamp", "") > since:
-                    events.append(e_obj)
-            except Exception:
-                pass
-
-        events.sort(key=lambda x: x.get("timestamp", ""))
-        return {"events": events}
+        start = _replay_start(since_id, since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since_id / since")
+    wanted = {t.strip() for t in types.split(",") if t.strip()} if types else None
+
+    frames: List[str] = []
+    last_id = since_id
+    has_more = False
+    gap = False
+    try:
+        async with manager._redis_client() as r:
+            if since_id:
+                oldest = await r.xrange(WS_REPLAY_STREAM, "-", "+", count=1)
+                gap = bool(oldest) and _stream_id(oldest[0][0]) > _stream_id(since_id)
+
+            # Type filters can skip entries, so read pages until the reply is full
+            scanned = 0
+            while True:
+                entries = await r.xrange(WS_REPLAY_STREAM, start, "+", count=limit)
+                for entry_id, fields in entries:
+                    scanned += 1
+                    last_id = entry_id
+                    if wanted is None or fields.get("type") in wanted:
+                        frames.append(_with_seq(fields.get("data", "{}"), entry_id))
+                        if len(frames) == limit:
+                            break
+                if len(entries) < limit and len(frames) < limit:
+                    break                                  # Reached the end of the stream
+                if len(frames) == limit or scanned >= WS_REPLAY_MAX_EVENTS:
+                    has_more = True
+                    break
+                start = f"({last_id}"
     except Exception as exc:
+        # Pages already read cannot be returned without the rest: answering
+        # with an advanced last_id would make the client skip events.
         print(f"[WebSocket] Replay fetch error: {exc}")
-        return {"events": []}
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="Event replay temporarily unavailable")
+
+    if format == "msgpack":
+        body = msgpack.packb({
+            "events":   [json.loads(f) for f in frames],
+            "last_id":  last_id,
+            "has_more": has_more,
+            "gap":      gap,
+        })
+        return Response(content=body, media_type="application/x-msgpack")
+
+    # Events are already serialized: splice them instead of re-encoding
+    body = (
+        '{"events":[' + ",".join(frames) + "]"
+        + f',"last_id":{json.dumps(last_id)},"has_more":{json.dumps(has_more)},"gap":{json.dumps(gap)}}}'
+    )
+    return Response(content=body, media_type="application/json")
@@ -9,7 +9,7 @@ import hashlib
 import logging
 
 from celery import Celery
-from celery.signals import worker_ready
+from celery.signals import worker_ready, worker_process_shutdown
 
 os.environ.setdefault('PYTHONPATH', '/app')
 
@@ -22,6 +22,7 @@ celery_app = Celery(
     include=[
         'backend.services.tasks.task_executor',
         'backend.services.tasks.workflow_tasks',
+        'backend.services.audit.audit_processor',
     ]
 )
 
@@ -109,7 +110,7 @@ celery_app.conf.beat_schedule = {
     },
     'dependency-graph-processor': {
         'task': 'backend.services.tasks.task_executor.process_dependency_graph',
-        'schedule': 30.0,
+        'schedule': 60.0,  # safety net — children are dispatched on completion events
     },
 
     # ── Phase 13.2: Self-Healing & Auto-Recovery ──────────────────────────────
@@ -187,6 +188,22 @@ celery_app.conf.beat_schedule = {
         'task': 'backend.celery_app.broadcast_channel_health',
         'schedule': 300.0,  # every 5 minutes — aligns with health-check-every-5-minutes
     },
+
+    # ── Audit ingestion ───────────────────────────────────────────────────────
+    'process-audit-batch': {
+        'task': 'backend.services.audit.audit_processor.process_audit_batch',
+        'schedule': 30.0,   # safety net — API processes run their own writer thread
+    },
+    'audit-partition-maintenance': {
+        'task': 'backend.services.audit.audit_processor.maintain_audit_partitions',
+        'schedule': 86400.0,
+    },
+
+    # ── Tool analytics ────────────────────────────────────────────────────────
+    'tool-usage-rollup': {
+        'task': 'backend.services.tasks.task_executor.rollup_tool_usage',
+        'schedule': 300.0,
+    },
 }
 
 
@@ -590,5 +607,12 @@ def on_worker_ready(**kwargs):
     start_imap_receivers.delay()
 
 
+@worker_process_shutdown.connect
+def on_worker_process_shutdown(**kwargs):
+    # Write out usage / tool-analytics rows still buffered in this process
+    from backend.services.usage_log_writer import usage_log_writer
+    usage_log_writer.shutdown()
+
+
 if __name__ == '__main__':
-    celery_app.start()
\ No newline at end of file
+    celery_app.start()
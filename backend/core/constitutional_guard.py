@@ -20,11 +20,16 @@ Decision flow:
     Decision: ALLOW / BLOCK / VOTE_REQUIRED
 """
 
+import asyncio
 import json
+import os
 import re
+import time
 import hashlib
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
@@ -140,6 +145,246 @@ GLOBAL_BLACKLIST: List[str] = [
 ]
 
 
+# ---------------------------------------------------------------------------
+# Precompiled Tier 1 matchers
+# ---------------------------------------------------------------------------
+
+def _compile_blacklist(patterns: List[str]) -> "re.Pattern":
+    """One alternation regex; group ``p<i>`` identifies the pattern that fired."""
+    return re.compile(
+        "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns)),
+        re.IGNORECASE,
+    )
+
+
+_GLOBAL_BLACKLIST_RE = _compile_blacklist(GLOBAL_BLACKLIST)
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Build a prefix-factored regex for a set of literal phrases.
+
+    Shared prefixes are matched once, so the regex engine does work
+    proportional to the text length rather than to the number of phrases
+    (the same effect as an Aho–Corasick automaton, but running in C).
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    # Post-order walk with an explicit stack: phrases may be thousands of
+    # characters long, far deeper than Python's recursion limit.
+    built: Dict[int, str] = {}
+    stack: List[Tuple[Dict[str, Any], bool]] = [(trie, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = [(ch, child) for ch, child in sorted(node.items()) if ch != ""]
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in children)
+            continue
+        branches = [re.escape(ch) + built.pop(id(child)) for ch, child in children]
+        if not branches:
+            built[id(node)] = ""
+        elif len(branches) == 1 and "" not in node:
+            built[id(node)] = branches[0]
+        else:
+            body = "(?:" + "|".join(branches) + ")"
+            built[id(node)] = body + "?" if "" in node else body
+    return built[id(trie)]
+
+
+class ProhibitedActionMatcher:
+    """
+    Case-insensitive substring matcher for a constitution's
+    ``prohibited_actions`` list, compiled once per constitution version.
+    """
+
+    def __init__(self, phrases: List[Any]):
+        # lower-cased phrase -> original entry (reported as the rule that fired)
+        self._by_lower: Dict[str, str] = {}
+        for phrase in phrases:
+            if isinstance(phrase, str) and phrase.strip():
+                self._by_lower.setdefault(phrase.lower(), phrase)
+        self._regex = self._compile(list(self._by_lower)) if self._by_lower else None
+
+    @staticmethod
+    def _compile(phrases: List[str]) -> "re.Pattern":
+        try:
+            return re.compile(_trie_pattern(phrases), re.IGNORECASE)
+        except (RecursionError, re.error):
+            # Deeply branching phrase sets can exceed the regex compiler's
+            # nesting limits; plain alternation (longest first) always compiles.
+            ordered = sorted(phrases, key=len, reverse=True)
+            return re.compile("|".join(re.escape(p) for p in ordered), re.IGNORECASE)
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the prohibited entry found in *text*, or ``None``."""
+        if self._regex is None:
+            return None
+        match = self._regex.search(text)
+        if not match:
+            return None
+        found = match.group(0)
+        return self._by_lower.get(found.lower(), found)
+
+
+# (constitution id, version_number) -> matcher; rebuilt only on amendment
+_prohibited_matchers: Dict[Tuple[Any, Any], ProhibitedActionMatcher] = {}
+
+
+def get_prohibited_matcher(constitution: Dict[str, Any]) -> ProhibitedActionMatcher:
+    """Matcher for *constitution*, compiled on first use of each version."""
+    key = (constitution.get("id"), constitution.get("version_number"))
+    matcher = _prohibited_matchers.get(key)
+    if matcher is None:
+        matcher = ProhibitedActionMatcher(constitution.get("prohibited_actions", []))
+        _prohibited_matchers.clear()  # Only the active version is ever needed
+        _prohibited_matchers[key] = matcher
+    return matcher
+
+
+def _action_text(action: str, context: Dict[str, Any]) -> str:
+    """
+    Text the Tier 1 matchers run against, built once per check.
+
+    The context is serialised with ``json.dumps`` so keys and list items
+    keep their original order and newlines are escaped: the blacklist
+    patterns (e.g. ``curl.*\\|.*bash``) rely on both.
+    """
+    return f"{action} {json.dumps(context, default=str)}"
+
+
+# ---------------------------------------------------------------------------
+# Process-wide constitution snapshot
+# ---------------------------------------------------------------------------
+
+CONSTITUTION_VERSION_KEY = "constitution:active_version"
+CONSTITUTION_AMENDED_CHANNEL = "constitution:amended"
+# Safety net for processes without the pub/sub listener: compare the
+# Redis version counter at most this often (one small GET, no JSON).
+CONSTITUTION_VERSION_CHECK_SECONDS = 30
+
+
+class ConstitutionSnapshotCache:
+    """
+    Immutable snapshot of the active constitution shared by every
+    ConstitutionalGuard in the process, stamped with ``version_number``.
+
+    The snapshot is replaced only when a "constitution amended" event
+    arrives (pub/sub) or the Redis version counter moves past the
+    snapshot's version; otherwise checks read it straight from memory.
+    """
+
+    def __init__(self):
+        self.data: Optional[Mapping[str, Any]] = None
+        self.version_number: Optional[int] = None
+        self.stale = True
+        self.verified_at = 0.0
+
+    def install(self, data: Dict[str, Any]) -> Mapping[str, Any]:
+        data = dict(data)
+        data["prohibited_actions"] = tuple(data.get("prohibited_actions") or ())
+        self.data = MappingProxyType(data)
+        self.version_number = data.get("version_number")
+        self.stale = False
+        self.verified_at = time.monotonic()
+        return self.data
+
+    def invalidate(self) -> None:
+        self.stale = True
+
+
+_constitution_snapshot = ConstitutionSnapshotCache()
+
+# Long-lived Redis client and amendment listener, owned by the API event
+# loop (started from the FastAPI lifespan).  Any other loop — a Celery
+# task's asyncio.run() — gets a client scoped to each operation instead,
+# so nothing outlives the loop that created it.
+_shared_redis: Any = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_amendment_listener: Optional[asyncio.Task] = None
+
+
+def _new_redis_client():
+    import redis.asyncio as aioredis
+    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    return aioredis.from_url(redis_url, decode_responses=True)
+
+
+@asynccontextmanager
+async def _redis_client():
+    """Yield the API loop's shared client, or a fresh one closed on exit."""
+    if _shared_redis is not None and asyncio.get_running_loop() is _shared_loop:
+        yield _shared_redis
+        return
+    async with _new_redis_client() as client:
+        yield client
+
+
+async def start_amendment_listener() -> None:
+    """Open the shared client and listen for amendments on the running loop."""
+    global _shared_redis, _shared_loop, _amendment_listener
+    if _amendment_listener is not None and not _amendment_listener.done():
+        return
+    _shared_loop = asyncio.get_running_loop()
+    if _shared_redis is None:
+        _shared_redis = _new_redis_client()
+    _amendment_listener = asyncio.create_task(_listen_for_amendments(_shared_redis))
+
+
+async def stop_amendment_listener() -> None:
+    """Stop the amendment listener and close the shared client."""
+    global _shared_redis, _shared_loop, _amendment_listener
+    listener, client = _amendment_listener, _shared_redis
+    _amendment_listener = _shared_redis = _shared_loop = None
+    if listener is not None:
+        listener.cancel()
+        try:
+            await listener
+        except (asyncio.CancelledError, Exception):
+            pass
+    if client is not None:
+        await client.aclose()
+
+
+async def _listen_for_amendments(client) -> None:
+    """Invalidate the snapshot whenever any worker announces an amendment."""
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(CONSTITUTION_AMENDED_CHANNEL)
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                _constitution_snapshot.invalidate()
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        logger.warning("Constitution amendment listener stopped: %s", exc)
+    finally:
+        await pubsub.close()
+
+
+async def notify_constitution_amended(version_number: int) -> None:
+    """
+    Announce a new active constitution version to every worker.
+
+    Call after the new version is committed: bumps the Redis version
+    counter and publishes a ``constitution:amended`` event.
+    """
+    _constitution_snapshot.invalidate()
+    try:
+        async with _redis_client() as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(CONSTITUTION_VERSION_KEY, version_number)
+            pipe.publish(CONSTITUTION_AMENDED_CHANNEL, str(version_number))
+            await pipe.execute()
+    except Exception as exc:
+        logger.warning("Could not announce constitution v%s: %s", version_number, exc)
+
+
 class ConstitutionalGuard:
     """
     Two-tier constitutional enforcement engine.
@@ -165,30 +410,18 @@ class ConstitutionalGuard:
     GREY_AREA_THRESHOLD = 0.40   # Between this and BLOCK → grey area
 
     # Redis cache TTLs (seconds)
-    CONSTITUTION_CACHE_TTL = 300       # 5 minutes
     EMBEDDING_CACHE_TTL = 1800         # 30 minutes
 
     def __init__(self, db: Session):
         self.db = db
-        self._redis = None
         self._vector_store = None
-        self._constitution_cache: Optional[Dict[str, Any]] = None
-        self._cache_timestamp: Optional[datetime] = None
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
     async def initialize(self):
-        """Load dependencies lazily."""
-        try:
-            import redis.asyncio as aioredis
-            import os
-            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-            self._redis = await aioredis.from_url(redis_url, decode_responses=True)
-        except Exception as exc:
-            logger.warning("Redis unavailable for ConstitutionalGuard cache: %s", exc)
-
+        """Attach the vector store (Redis access goes through ``_redis_client``)."""
         try:
             from backend.core.vector_store import get_vector_store
             self._vector_store = get_vector_store()
@@ -274,16 +507,18 @@ class ConstitutionalGuard:
           3. Constitution prohibited actions list
           4. Resource quotas (placeholder for future expansion)
         """
-        # ---- 1. Global blacklist ----
-        action_text = f"{action} {json.dumps(context)}"
-        for pattern in GLOBAL_BLACKLIST:
-            if re.search(pattern, action_text, re.IGNORECASE):
-                return ConstitutionalDecision(
-                    verdict=Verdict.BLOCK,
-                    severity=ViolationSeverity.CRITICAL,
-                    citations=["Global Security Policy – Blacklisted Command Pattern"],
-                    explanation=f"Action matches globally prohibited pattern: {pattern}",
-                )
+        # ---- 1. Global blacklist (single precompiled pass) ----
+        action_text = _action_text(action, context)
+        match = _GLOBAL_BLACKLIST_RE.search(action_text)
+        if match:
+            pattern = GLOBAL_BLACKLIST[int(match.lastgroup[1:])]
+            return ConstitutionalDecision(
+                verdict=Verdict.BLOCK,
+                severity=ViolationSeverity.CRITICAL,
+                citations=["Global Security Policy – Blacklisted Command Pattern"],
+                explanation=f"Action matches globally prohibited pattern: {pattern}",
+                tier_results={"rule_type": "global_blacklist", "rule": pattern},
+            )
 
         # ---- 2. Tier permission check ----
         agent_tier = agent_id[0] if agent_id else "3"
@@ -305,19 +540,19 @@ class ConstitutionalGuard:
         # ---- 3. Constitution prohibited actions ----
         constitution = await self._get_active_constitution()
         if constitution:
-            prohibited = constitution.get("prohibited_actions", [])
-            for entry in prohibited:
-                if isinstance(entry, str) and entry.lower() in action_text.lower():
-                    return ConstitutionalDecision(
-                        verdict=Verdict.BLOCK,
-                        severity=ViolationSeverity.HIGH,
-                        citations=self._extract_citations(
-                            constitution, f"Prohibited: {entry}"
-                        ),
-                        explanation=(
-                            f"Action violates explicitly prohibited rule: '{entry}'"
-                        ),
-                    )
+            entry = get_prohibited_matcher(constitution).search(action_text)
+            if entry is not None:
+                return ConstitutionalDecision(
+                    verdict=Verdict.BLOCK,
+                    severity=ViolationSeverity.HIGH,
+                    citations=self._extract_citations(
+                        constitution, f"Prohibited: {entry}"
+                    ),
+                    explanation=(
+                        f"Action violates explicitly prohibited rule: '{entry}'"
+                    ),
+                    tier_results={"rule_type": "prohibited_action", "rule": entry},
+                )
 
         # ---- 4. Passed tier 1 ----
         return ConstitutionalDecision(
@@ -360,7 +595,7 @@ class ConstitutionalGuard:
                 return cached
 
             # Query constitution collection
-            results = self._vector_store.query_constitution(
+            results = await self._vector_store.aquery_constitution(
                 query=action_description,
                 n_results=5,
             )
@@ -472,24 +707,20 @@ class ConstitutionalGuard:
             affected_agents=tier1.affected_agents + tier2.affected_agents,
         )
 
-    async def _get_active_constitution(self) -> Optional[Dict[str, Any]]:
-        """Load active constitution with Redis caching."""
-        # Try Redis cache
-        if self._redis:
-            try:
-                cached = await self._redis.get("constitutional_guard:active_constitution")
-                if cached:
-                    return json.loads(cached)
-            except Exception:
-                pass
+    async def _get_active_constitution(self) -> Optional[Mapping[str, Any]]:
+        """
+        Return the process-wide constitution snapshot.
 
-        # Try in-memory cache
-        if (
-            self._constitution_cache
-            and self._cache_timestamp
-            and (datetime.utcnow() - self._cache_timestamp).seconds < self.CONSTITUTION_CACHE_TTL
-        ):
-            return self._constitution_cache
+        Served from memory unless an amendment event invalidated it or the
+        periodic Redis version check finds a newer ``version_number``.
+        """
+        snapshot = _constitution_snapshot
+        if snapshot.data is not None and not snapshot.stale:
+            if time.monotonic() - snapshot.verified_at < CONSTITUTION_VERSION_CHECK_SECONDS:
+                return snapshot.data
+            if not await self._remote_version_changed(snapshot.version_number):
+                snapshot.verified_at = time.monotonic()
+                return snapshot.data
 
         # Load from PostgreSQL
         try:
@@ -503,33 +734,38 @@ class ConstitutionalGuard:
             if not constitution:
                 return None
 
-            data = {
+            data = snapshot.install({
                 "id": constitution.id,
                 "version": constitution.version if hasattr(constitution, 'version') else "1.0",
                 "version_number": constitution.version_number if hasattr(constitution, 'version_number') else 1,
                 "articles": constitution.get_articles_dict(),
                 "prohibited_actions": constitution.get_prohibited_actions_list(),
                 "sovereign_preferences": constitution.get_sovereign_preferences(),
-            }
-
-            # Cache
-            self._constitution_cache = data
-            self._cache_timestamp = datetime.utcnow()
-
-            if self._redis:
-                try:
-                    await self._redis.setex(
-                        "constitutional_guard:active_constitution",
-                        self.CONSTITUTION_CACHE_TTL,
-                        json.dumps(data, default=str),
-                    )
-                except Exception:
-                    pass
-
+            })
+            try:
+                # Seed the version counter on first load; amendments overwrite it
+                async with _redis_client() as client:
+                    await client.set(CONSTITUTION_VERSION_KEY, data["version_number"], nx=True)
+            except Exception:
+                pass
             return data
         except Exception as exc:
             logger.error("Failed to load constitution: %s", exc)
-            return None
+            return snapshot.data
+
+    async def _remote_version_changed(self, version_number: Optional[int]) -> bool:
+        """Compare the snapshot against the Redis version counter."""
+        try:
+            async with _redis_client() as client:
+                remote = await client.get(CONSTITUTION_VERSION_KEY)
+        except Exception:
+            return False
+        if remote is None:
+            return False
+        try:
+            return int(remote) != version_number
+        except (TypeError, ValueError):
+            return True  # Unreadable counter: reload from PostgreSQL to be safe
 
     def _build_action_description(
         self, agent_id: str, action: str, context: Dict[str, Any]
@@ -603,11 +839,10 @@ class ConstitutionalGuard:
         self, action_description: str
     ) -> Optional[ConstitutionalDecision]:
         """Check Redis for a previously computed semantic result."""
-        if not self._redis:
-            return None
         try:
             cache_key = self._embedding_cache_key(action_description)
-            cached = await self._redis.get(cache_key)
+            async with _redis_client() as client:
+                cached = await client.get(cache_key)
             if cached:
                 data = json.loads(cached)
                 return ConstitutionalDecision(
@@ -626,15 +861,14 @@ class ConstitutionalGuard:
         self, action_description: str, decision: ConstitutionalDecision
     ):
         """Cache a semantic check result in Redis."""
-        if not self._redis:
-            return
         try:
             cache_key = self._embedding_cache_key(action_description)
-            await self._redis.setex(
-                cache_key,
-                self.EMBEDDING_CACHE_TTL,
-                json.dumps(decision.to_dict(), default=str),
-            )
+            async with _redis_client() as client:
+                await client.setex(
+                    cache_key,
+                    self.EMBEDDING_CACHE_TTL,
+                    json.dumps(decision.to_dict(), default=str),
+                )
         except Exception:
             pass
 
@@ -679,9 +913,9 @@ class ConstitutionalGuard:
                     f"Severity={decision.severity.value} "
                     f"Citations={decision.citations}"
                 ),
-                agentium_id=f"CG{datetime.utcnow().strftime('%H%M%S')}",
             )
-            self.db.add(audit)
+            from backend.services.audit.audit_pipeline import audit_pipeline
+            audit_pipeline.submit(audit)
 
             # Also create ConstitutionViolation record for BLOCK / VOTE_REQUIRED
             if decision.verdict != Verdict.ALLOW:
@@ -0,0 +1,194 @@
+"""
+Micro-batching embedding executor for Agentium.
+
+Concurrent embedding requests (constitutional checks, escalation context,
+task delegation) are gathered into micro-batches — up to
+``EMBEDDING_BATCH_SIZE`` texts or ``EMBEDDING_BATCH_WAIT_MS`` of waiting,
+whichever comes first — and encoded on a dedicated thread pool.  Encoding
+32 short texts costs about the same as encoding one, and the FastAPI event
+loop never blocks on the model: async callers await a future.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", "1"))
+
+# (texts, future, enqueued_at)
+_Request = Tuple[List[str], Future, float]
+
+
+class EmbeddingExecutor:
+    """
+    Gathers concurrent embedding requests into micro-batches.
+
+    A dispatcher thread waits for a free encoder slot, takes the first
+    queued request, then keeps collecting until the batch is full or the
+    wait budget is spent.  While every encoder is busy, requests pile up
+    in the queue and the next batch takes them all at once, so batch size
+    grows with load instead of latency.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+        workers: int = EMBEDDING_WORKERS,
+    ) -> None:
+        self._embed_fn = embed_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.workers = max(1, workers)
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._slots = threading.Semaphore(self.workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_queue_wait_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, texts: Sequence[str]) -> "Future[List[List[float]]]":
+        """Queue *texts* for embedding; the future resolves to their vectors."""
+        future: Future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result([])
+            return future
+        if self._closed:
+            raise RuntimeError("EmbeddingExecutor is shut down")
+
+        self._ensure_started()
+        self.stats["requests"] += 1
+        self._queue.put((texts, future, time.monotonic()))
+        return future
+
+    def embed_sync(self, texts: Sequence[str]) -> List[List[float]]:
+        """Blocking embedding for sync callers (still joins a micro-batch)."""
+        return self.submit(texts).result()
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Await embeddings without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["texts"] / batches, 2) if batches else 0.0,
+            "queued": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "workers": self.workers,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the dispatcher; queued requests are still served."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._dispatcher is not None:
+            self._queue.put(None)
+            if wait:
+                self._dispatcher.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._dispatcher is not None:
+            return
+        with self._start_lock:
+            if self._dispatcher is not None:
+                return
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="embedding-encode",
+            )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop,
+                name="embedding-dispatcher",
+                daemon=True,
+            )
+            self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            self._slots.acquire()
+            first = self._queue.get()
+            if first is None:
+                self._slots.release()
+                return
+
+            batch: List[_Request] = [first]
+            size = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._pool.submit(self._run_batch, batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        try:
+            now = time.monotonic()
+            waited_ms = max((now - enqueued_at) * 1000 for _, _, enqueued_at in batch)
+            self.stats["max_queue_wait_ms"] = max(self.stats["max_queue_wait_ms"], round(waited_ms, 2))
+
+            all_texts = [text for texts, _, _ in batch for text in texts]
+            try:
+                vectors = self._embed_fn(all_texts)
+            except Exception as exc:  # noqa: BLE001
+                self.stats["errors"] += 1
+                logger.exception("Embedding batch of %d texts failed", len(all_texts))
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+            self.stats["batches"] += 1
+            self.stats["texts"] += len(all_texts)
+            offset = 0
+            for texts, future, _ in batch:
+                chunk = vectors[offset:offset + len(texts)]
+                offset += len(texts)
+                if not future.done():
+                    future.set_result(list(chunk))
+        finally:
+            self._slots.release()
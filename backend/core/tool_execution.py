@@ -0,0 +1,325 @@
+"""
+Tool Execution Engine - one dispatch path for every tool call.
+
+``ToolRegistry`` and ``ToolCreationService`` used to run coroutine tools by
+spawning a ``ThreadPoolExecutor(max_workers=1)`` and a fresh event loop
+(``asyncio.run``) per call, and the agentic loop wrapped that in yet another
+``run_in_executor``.  The engine instead:
+
+  * awaits async tools natively on the caller's loop,
+  * runs sync tools on one shared, size-limited thread pool
+    (``TOOL_EXECUTOR_WORKERS``),
+  * enforces per-tool concurrency limits and timeouts (registry entries may
+    set ``max_concurrency`` / ``timeout_seconds``; the defaults come from
+    ``TOOL_DEFAULT_CONCURRENCY`` / ``TOOL_DEFAULT_TIMEOUT_SECONDS``), and
+  * inspects each tool function's signature once.
+
+Sync callers (``run_sync``) get the same guarantees; async tools invoked
+from sync code run on a single long-lived engine loop thread.
+"""
+
+import asyncio
+import collections
+import inspect
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, FrozenSet, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TOOL_EXECUTOR_WORKERS: int = int(os.getenv("TOOL_EXECUTOR_WORKERS", "32"))
+TOOL_DEFAULT_CONCURRENCY: int = int(os.getenv("TOOL_DEFAULT_CONCURRENCY", "16"))
+TOOL_DEFAULT_TIMEOUT_SECONDS: float = float(os.getenv("TOOL_DEFAULT_TIMEOUT_SECONDS", "120"))
+
+
+class ToolTimeoutError(TimeoutError):
+    """A tool call exceeded its timeout."""
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """What the engine needs to know about a tool function, computed once."""
+    is_async: bool
+    parameters: FrozenSet[str]
+    accepts_var_kwargs: bool
+
+    def accepts(self, name: str) -> bool:
+        return name in self.parameters
+
+
+def _build_spec(fn: Callable) -> ToolSpec:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        params = {}
+    return ToolSpec(
+        is_async=inspect.iscoroutinefunction(fn),
+        parameters=frozenset(
+            name for name, p in params.items()
+            if p.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        ),
+        accepts_var_kwargs=any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()),
+    )
+
+
+class _ToolGate:
+    """
+    Counting semaphore usable from event loops and plain threads alike.
+
+    Freed slots are handed directly to the oldest waiter, so async and sync
+    callers share one fair limit per tool.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Union["asyncio.Future[bool]", threading.Event]] = collections.deque()
+
+    def _try_acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    granted = True  # Slot already handed over
+            if granted:
+                self.release()
+            raise
+
+    def acquire_blocking(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._try_acquire():
+                return True
+            event = threading.Event()
+            self._waiters.append(event)
+        if event.wait(timeout):
+            return True
+        with self._lock:
+            try:
+                self._waiters.remove(event)
+                return False
+            except ValueError:
+                return True  # Granted between the timeout and the lock
+
+    def release(self) -> None:
+        with self._lock:
+            waiter = self._waiters.popleft() if self._waiters else None
+            if waiter is None:
+                self.active -= 1
+                return
+        # The slot moves to the waiter; self.active is unchanged
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: "asyncio.Future[bool]") -> None:
+        if waiter.done():
+            self.release()  # Waiter was cancelled meanwhile; pass the slot on
+        else:
+            waiter.set_result(True)
+
+
+class ToolExecutionEngine:
+    """Shared executor for registry and analytics-wrapped tool calls."""
+
+    def __init__(
+        self,
+        workers: int = TOOL_EXECUTOR_WORKERS,
+        default_concurrency: int = TOOL_DEFAULT_CONCURRENCY,
+        default_timeout: float = TOOL_DEFAULT_TIMEOUT_SECONDS,
+    ):
+        self.workers = max(1, workers)
+        self.default_concurrency = max(1, default_concurrency)
+        self.default_timeout = default_timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_threads = threading.local()
+        self._specs: "weakref.WeakKeyDictionary[Callable, ToolSpec]" = weakref.WeakKeyDictionary()
+        self._gates: Dict[str, _ToolGate] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, int] = {"calls": 0, "async_calls": 0, "sync_calls": 0, "timeouts": 0, "errors": 0}
+
+    # ── Introspection ────────────────────────────────────────────────
+
+    def spec_for(self, fn: Callable) -> ToolSpec:
+        """Cached signature facts for *fn* (recomputed only for a new function)."""
+        try:
+            spec = self._specs.get(fn)
+        except TypeError:  # Not weak-referenceable
+            return _build_spec(fn)
+        if spec is None:
+            spec = _build_spec(fn)
+            try:
+                self._specs[fn] = spec
+            except TypeError:
+                pass
+        return spec
+
+    def _gate(self, name: str, tool: Optional[Dict[str, Any]]) -> _ToolGate:
+        limit = (tool or {}).get("max_concurrency") or self.default_concurrency
+        gate = self._gates.get(name)
+        if gate is None or gate.limit != limit:
+            with self._lock:
+                gate = self._gates.get(name)
+                if gate is None:
+                    gate = self._gates[name] = _ToolGate(limit)
+                elif gate.limit != limit:
+                    gate.limit = limit
+        return gate
+
+    def _timeout(self, tool: Optional[Dict[str, Any]], timeout: Optional[float]) -> Optional[float]:
+        if timeout is not None:
+            return timeout
+        return (tool or {}).get("timeout_seconds") or self.default_timeout
+
+    # ── Thread pool / engine loop ────────────────────────────────────
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="tool-exec",
+                        initializer=self._mark_pool_thread,
+                    )
+        return self._pool
+
+    def _mark_pool_thread(self) -> None:
+        self._pool_threads.inside = True
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Long-lived loop for async tools called from sync code."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever,
+                        name="tool-exec-loop",
+                        daemon=True,
+                    ).start()
+                    self._loop = loop
+        return self._loop
+
+    def _submit_sync(self, gate: _ToolGate, fn: Callable, kwargs: Dict[str, Any]) -> Future:
+        # The gate slot is held until the function really returns, so a
+        # timed-out sync tool that keeps running still counts against its limit.
+        try:
+            future = self._get_pool().submit(lambda: fn(**kwargs))
+        except BaseException:
+            gate.release()  # Never submitted (pool shut down): give the slot back
+            raise
+        future.add_done_callback(lambda _: gate.release())
+        return future
+
+    # ── Execution ────────────────────────────────────────────────────
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable,
+        kwargs: Dict[str, Any],
+        tool: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Execute *fn* from async code; raises :class:`ToolTimeoutError` on timeout."""
+        spec = self.spec_for(fn)
+        gate = self._gate(name, tool)
+        limit = self._timeout(tool, timeout)
+        self.stats["calls"] += 1
+
+        await gate.acquire()
+        try:
+            if spec.is_async:
+                self.stats["async_calls"] += 1
+                try:
+                    return await asyncio.wait_for(fn(**kwargs), limit)
+                finally:
+                    gate.release()
+            self.stats["sync_calls"] += 1
+            future = self._submit_sync(gate, fn, kwargs)
+            return await asyncio.wait_for(asyncio.wrap_future(future), limit)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise ToolTimeoutError(f"Tool '{name}' timed out after {limit}s") from None
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    def run_sync(
+        self,
+        name: str,
+        fn: Callable,
+        kwargs: Dict[str, Any],
+        tool: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Execute *fn* from sync code (blocks the calling thread)."""
+        spec = self.spec_for(fn)
+        limit = self._timeout(tool, timeout)
+
+        if spec.is_async:
+            future = asyncio.run_coroutine_threadsafe(
+                self.run(name, fn, kwargs, tool=tool, timeout=limit), self._get_loop()
+            )
+            return future.result()
+
+        gate = self._gate(name, tool)
+        self.stats["calls"] += 1
+        self.stats["sync_calls"] += 1
+        if not gate.acquire_blocking(limit):
+            self.stats["timeouts"] += 1
+            raise ToolTimeoutError(f"Tool '{name}' timed out waiting for a free slot")
+
+        if getattr(self._pool_threads, "inside", False):
+            # Already on a pool thread: queueing behind ourselves could deadlock
+            try:
+                return fn(**kwargs)
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                gate.release()
+
+        future = self._submit_sync(gate, fn, kwargs)
+        try:
+            return future.result(timeout=limit)
+        except TimeoutError:
+            self.stats["timeouts"] += 1
+            raise ToolTimeoutError(f"Tool '{name}' timed out after {limit}s") from None
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "busy_tools": {name: g.active for name, g in list(self._gates.items()) if g.active},
+        }
+
+
+# Global instance
+tool_execution_engine = ToolExecutionEngine()
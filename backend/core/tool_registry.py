@@ -1,10 +1,12 @@
 """
 Tool Registry
 """
-import asyncio
-import inspect
+import json
+import threading
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from backend.core.tool_execution import tool_execution_engine
+
 from backend.tools.nodriver_tool import nodriver_tool
 from backend.tools.browser_tool  import BrowserTool
 from backend.tools.file_tool     import FileSystemTool
@@ -31,6 +33,11 @@ class ToolRegistry:
 
     def __init__(self):
         self.tools: Dict[str, Dict[str, Any]] = {}
+        # Bumped by every change that can alter an export; exports are
+        # memoized per (tier, format, generation).
+        self._generation = 0
+        self._export_cache: Dict[Tuple[str, str, int], Tuple[List[Dict[str, Any]], bytes]] = {}
+        self._export_lock = threading.Lock()
         self._initialize_tools()
 
     # ── Initialisation ─────────────────────────────────────────────────────────
@@ -1109,6 +1116,8 @@ class ToolRegistry:
         function: Callable,
         parameters: Dict[str, Any],
         authorized_tiers: Optional[List[str]] = None,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
     ) -> None:
         self.tools[name] = {
             "name":             name,
@@ -1117,6 +1126,12 @@ class ToolRegistry:
             "parameters":       parameters,
             "authorized_tiers": authorized_tiers or [],
         }
+        # Optional per-tool execution limits (see core/tool_execution.py)
+        if max_concurrency:
+            self.tools[name]["max_concurrency"] = max_concurrency
+        if timeout_seconds:
+            self.tools[name]["timeout_seconds"] = timeout_seconds
+        self._bump_generation()
 
     # ── Queries ────────────────────────────────────────────────────────────────
 
@@ -1151,22 +1166,7 @@ class ToolRegistry:
         if not tool:
             return {"status": "error", "error": f"Tool '{name}' not found"}
         try:
-            fn = tool["function"]
-            if inspect.iscoroutinefunction(fn):
-                try:
-                    loop = asyncio.get_running_loop()
-                except RuntimeError:
-                    loop = None
-                if loop and loop.is_running():
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                        future = pool.submit(asyncio.run, fn(**kwargs))
-                        result = future.result(timeout=60)
-                else:
-                    result = asyncio.run(fn(**kwargs))
-            else:
-                result = fn(**kwargs)
-            return result
+            return tool_execution_engine.run_sync(name, tool["function"], kwargs, tool=tool)
         except Exception as exc:
             return {"status": "error", "error": str(exc)}
 
@@ -1175,13 +1175,7 @@ class ToolRegistry:
         if not tool:
             return {"status": "error", "error": f"Tool '{name}' not found"}
         try:
-            fn = tool["function"]
-            if inspect.iscoroutinefunction(fn):
-                result = await fn(**kwargs)
-            else:
-                loop   = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, lambda: fn(**kwargs))
-            return result
+            return await tool_execution_engine.run(name, tool["function"], kwargs, tool=tool)
         except Exception as exc:
             return {"status": "error", "error": str(exc)}
 
@@ -1195,6 +1189,7 @@ class ToolRegistry:
         if name not in self.tools:
             return False
         self.tools[name]["function"] = function
+        self._bump_generation()
         return True
 
     def mark_deprecated(self, name: str, reason: str,
@@ -1204,6 +1199,7 @@ class ToolRegistry:
         self.tools[name]["deprecated"]         = True
         self.tools[name]["deprecation_reason"] = reason
         self.tools[name]["replacement"]        = replacement
+        self._bump_generation()
         return True
 
     def unmark_deprecated(self, name: str) -> bool:
@@ -1212,14 +1208,26 @@ class ToolRegistry:
         self.tools[name].pop("deprecated", None)
         self.tools[name].pop("deprecation_reason", None)
         self.tools[name].pop("replacement", None)
+        self._bump_generation()
         return True
 
     def deregister_tool(self, name: str) -> bool:
         if name not in self.tools:
             return False
         del self.tools[name]
+        self._bump_generation()
         return True
 
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every registration change; part of export cache keys."""
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        with self._export_lock:
+            self._generation += 1
+            self._export_cache.clear()
+
     # ── API Schema Export ──────────────────────────────────────────────────────
 
     def _build_props(self, tool: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
@@ -1260,59 +1268,87 @@ class ToolRegistry:
 
         return props, required
 
+    def _openai_tool(self, name: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+        props, required = self._build_props(tool)
+        return {
+            "type": "function",
+            "function": {
+                "name":        name,
+                "description": tool.get("description", ""),
+                "parameters": {
+                    "type":       "object",
+                    "properties": props,
+                    "required":   required,
+                },
+            },
+        }
+
+    def _anthropic_tool(self, name: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+        props, required = self._build_props(tool)
+        return {
+            "name":        name,
+            "description": tool.get("description", ""),
+            "input_schema": {
+                "type":       "object",
+                "properties": props,
+                "required":   required,
+            },
+        }
+
+    def _export(self, tier: str, fmt: str) -> Tuple[List[Dict[str, Any]], bytes]:
+        """
+        Tier-filtered export in *fmt* ("openai" / "anthropic") plus its JSON bytes.
+
+        Built once per (tier, format, generation); any registration change
+        bumps the generation and drops every cached export.
+        """
+        generation = self._generation
+        key = (tier, fmt, generation)
+        cached = self._export_cache.get(key)
+        if cached is not None:
+            return cached
+
+        build = self._openai_tool if fmt == "openai" else self._anthropic_tool
+        tools = [
+            build(name, tool)
+            for name, tool in list(self.tools.items())
+            if tier in tool.get("authorized_tiers", []) and not tool.get("deprecated")
+        ]
+        cached = (tools, json.dumps(tools, separators=(",", ":")).encode("utf-8"))
+        with self._export_lock:
+            # Don't cache an export that raced with a registration change
+            if generation == self._generation:
+                self._export_cache[key] = cached
+        return cached
+
     def to_openai_tools(self, tier: str) -> List[Dict[str, Any]]:
         """
         Export tier-filtered tools in OpenAI function-calling format.
 
         Compatible with OpenAI, Groq, Mistral, Together, Fireworks, DeepSeek,
         Moonshot, Azure, Gemini (OpenAI-compat), Ollama, llama.cpp, LM Studio.
-        Deprecated tools are excluded.
+        Deprecated tools are excluded.  The tool dicts are shared between
+        callers - treat them as read-only.
         """
-        result: List[Dict[str, Any]] = []
-        for name, tool in self.tools.items():
-            if tier not in tool.get("authorized_tiers", []):
-                continue
-            if tool.get("deprecated"):
-                continue
-            props, required = self._build_props(tool)
-            result.append({
-                "type": "function",
-                "function": {
-                    "name":        name,
-                    "description": tool.get("description", ""),
-                    "parameters": {
-                        "type":       "object",
-                        "properties": props,
-                        "required":   required,
-                    },
-                },
-            })
-        return result
+        return list(self._export(tier, "openai")[0])
 
     def to_anthropic_tools(self, tier: str) -> List[Dict[str, Any]]:
         """
         Export tier-filtered tools in Anthropic input_schema format.
 
         Used exclusively by AnthropicProvider.generate_with_tools().
-        Deprecated tools are excluded.
+        Deprecated tools are excluded.  The tool dicts are shared between
+        callers - treat them as read-only.
         """
-        result: List[Dict[str, Any]] = []
-        for name, tool in self.tools.items():
-            if tier not in tool.get("authorized_tiers", []):
-                continue
-            if tool.get("deprecated"):
-                continue
-            props, required = self._build_props(tool)
-            result.append({
-                "name":        name,
-                "description": tool.get("description", ""),
-                "input_schema": {
-                    "type":       "object",
-                    "properties": props,
-                    "required":   required,
-                },
-            })
-        return result
+        return list(self._export(tier, "anthropic")[0])
+
+    def to_openai_tools_json(self, tier: str) -> bytes:
+        """:meth:`to_openai_tools` pre-serialized as compact JSON bytes."""
+        return self._export(tier, "openai")[1]
+
+    def to_anthropic_tools_json(self, tier: str) -> bytes:
+        """:meth:`to_anthropic_tools` pre-serialized as compact JSON bytes."""
+        return self._export(tier, "anthropic")[1]
 
 
 # Global registry instance
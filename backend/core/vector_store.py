@@ -3,16 +3,25 @@ Vector Store configuration for Agentium.
 ChromaDB-backed RAG infrastructure for collective agent memory.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Sequence
 
 import chromadb
+import numpy as np
 from chromadb.api.types import EmbeddingFunction, QueryResult
 from sentence_transformers import SentenceTransformer
 
+from backend.core.embedding_service import EmbeddingExecutor
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -25,6 +34,123 @@ EMBEDDING_MODEL: str = os.getenv(
 )
 CHROMA_HOST: Optional[str] = os.getenv("CHROMA_HOST")  # None → local mode
 CHROMA_PORT: int = int(os.getenv("CHROMA_PORT", "8000"))
+# Threads used to query several collections concurrently
+VECTOR_QUERY_WORKERS: int = int(os.getenv("VECTOR_QUERY_WORKERS", "8"))
+# Embedding cache: in-process LRU entries, and the optional shared Redis tier
+EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))
+EMBEDDING_CACHE_REDIS_URL: Optional[str] = os.getenv(
+    "EMBEDDING_CACHE_REDIS_URL", os.getenv("REDIS_URL")
+)
+EMBEDDING_CACHE_TTL_SECONDS: int = int(
+    os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 86400))
+)
+# Knowledge version: bumped on every write so readers can key caches on it.
+# Shared through Redis when REDIS_URL is set, process-local otherwise.
+KNOWLEDGE_VERSION_KEY = "agentium:knowledge:version"
+KNOWLEDGE_VERSION_REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
+KNOWLEDGE_VERSION_RETRY_SECONDS = 30  # Skip Redis this long after it failed
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by ``(model_name, sha256(text))``.
+
+    Two tiers: an in-process LRU of float32 vectors and, when a Redis URL
+    is configured, a shared Redis tier (raw float32 bytes with a TTL) so
+    every API pod and worker benefits from embeddings computed elsewhere.
+    Redis failures degrade silently to the LRU tier.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = EMBEDDING_CACHE_SIZE,
+        redis_url: Optional[str] = EMBEDDING_CACHE_REDIS_URL,
+    ) -> None:
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Embedding cache Redis tier disabled: %s", exc)
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0,
+        }
+
+    def key_for(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up *keys* in the LRU, then the missing ones in Redis (one MGET)."""
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[i] = vector
+                    self.stats["memory_hits"] += 1
+
+        missing = [i for i, vector in enumerate(found) if vector is None]
+        if missing and self._redis is not None:
+            try:
+                blobs = self._redis.mget([keys[i] for i in missing])
+            except Exception as exc:  # noqa: BLE001
+                self.stats["redis_errors"] += 1
+                logger.debug("Embedding cache Redis read failed: %s", exc)
+                blobs = [None] * len(missing)
+            promoted = {}
+            for i, blob in zip(missing, blobs):
+                if blob:
+                    found[i] = np.frombuffer(blob, dtype=np.float32)
+                    promoted[keys[i]] = found[i]
+                    self.stats["redis_hits"] += 1
+            if promoted:
+                self._remember(promoted)
+
+        self.stats["misses"] += sum(1 for vector in found if vector is None)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store freshly computed vectors in both tiers."""
+        if not items:
+            return
+        items = {k: np.asarray(v, dtype=np.float32) for k, v in items.items()}
+        self._remember(items)
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, vector in items.items():
+                    pipe.set(key, vector.tobytes(), ex=EMBEDDING_CACHE_TTL_SECONDS)
+                pipe.execute()
+            except Exception as exc:  # noqa: BLE001
+                self.stats["redis_errors"] += 1
+                logger.debug("Embedding cache Redis write failed: %s", exc)
+
+    def _remember(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "redis_tier": self._redis is not None,
+        }
 
 
 class AgentiumEmbeddingFunction(EmbeddingFunction):
@@ -32,12 +158,14 @@ class AgentiumEmbeddingFunction(EmbeddingFunction):
     Custom embedding function using sentence-transformers.
 
     Lazy-loads the model on first use to avoid initialization overhead
-    during module import.
+    during module import.  Embeddings are served from an
+    :class:`EmbeddingCache`; only cache misses are encoded.
     """
 
     def __init__(self, model_name: Optional[str] = None) -> None:
         self.model_name = model_name or EMBEDDING_MODEL
         self._model: Optional[SentenceTransformer] = None
+        self.cache = EmbeddingCache(self.model_name)
 
     @property
     def model(self) -> SentenceTransformer:
@@ -47,9 +175,22 @@ class AgentiumEmbeddingFunction(EmbeddingFunction):
         return self._model
 
     def __call__(self, input: List[str]) -> List[List[float]]:  # noqa: A002
-        """Generate embeddings for a list of texts."""
-        embeddings = self.model.encode(input, convert_to_numpy=True)
-        return embeddings.tolist()
+        """Generate embeddings for a list of texts (cache misses only)."""
+        keys = [self.cache.key_for(text) for text in input]
+        vectors = self.cache.get_many(keys)
+
+        # Encode each distinct missing text once, then reassemble in order
+        to_encode: Dict[str, str] = {}
+        for key, text, vector in zip(keys, input, vectors):
+            if vector is None:
+                to_encode.setdefault(key, text)
+        if to_encode:
+            encoded = self.model.encode(list(to_encode.values()), convert_to_numpy=True)
+            fresh = dict(zip(to_encode.keys(), encoded.astype(np.float32)))
+            self.cache.put_many(fresh)
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        return [vector.tolist() for vector in vectors]
 
 
 class VectorStore:
@@ -88,6 +229,12 @@ class VectorStore:
         self._client: Optional[chromadb.ClientAPI] = None
         self._embedding_fn = AgentiumEmbeddingFunction()
         self._collections: Dict[str, chromadb.Collection] = {}
+        self._query_pool: Optional[ThreadPoolExecutor] = None
+        # Micro-batches concurrent embed() / aembed() calls onto the model
+        self._embedding_executor = EmbeddingExecutor(self._embedding_fn)
+        self._knowledge_version = 0
+        self._version_redis = None
+        self._version_redis_failed_at: Optional[float] = None
 
     # ------------------------------------------------------------------
     # Initialisation
@@ -187,6 +334,7 @@ class VectorStore:
         collection = self.get_collection("constitution")
         collection.upsert(
             documents=[content],
+            embeddings=self.embed([content]),
             metadatas=[
                 {
                     **metadata,
@@ -198,6 +346,7 @@ class VectorStore:
             ],
             ids=[f"const_{article_id}"],
         )
+        self.bump_knowledge_version()
 
     def add_ethos(
         self,
@@ -210,6 +359,7 @@ class VectorStore:
         collection = self.get_collection("ethos")
         collection.upsert(
             documents=[ethos_content],
+            embeddings=self.embed([ethos_content]),
             metadatas=[
                 {
                     "agentium_id": agentium_id,
@@ -236,6 +386,7 @@ class VectorStore:
         collection = self.get_collection("task_patterns")
         collection.upsert(
             documents=[description],
+            embeddings=self.embed([description]),
             metadatas=[
                 {
                     "pattern_id": pattern_id,
@@ -248,11 +399,181 @@ class VectorStore:
             ],
             ids=[f"pattern_{pattern_id}"],
         )
+        self.bump_knowledge_version()
+
+    # ------------------------------------------------------------------
+    # Knowledge version
+    # ------------------------------------------------------------------
+
+    def _version_client(self):
+        if not KNOWLEDGE_VERSION_REDIS_URL:
+            return None
+        if self._version_redis_failed_at is not None:
+            if time.monotonic() - self._version_redis_failed_at < KNOWLEDGE_VERSION_RETRY_SECONDS:
+                return None
+            self._version_redis_failed_at = None
+        if self._version_redis is None:
+            import redis
+            self._version_redis = redis.Redis.from_url(
+                KNOWLEDGE_VERSION_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5,
+            )
+        return self._version_redis
+
+    def _version_redis_down(self, exc: Exception) -> None:
+        if self._version_redis_failed_at is None:
+            logger.warning("Knowledge version counter falling back to process-local: %s", exc)
+        self._version_redis_failed_at = time.monotonic()
+
+    def bump_knowledge_version(self) -> None:
+        """Record that stored knowledge changed (invalidates keyed caches)."""
+        self._knowledge_version += 1
+        client = self._version_client()
+        if client is not None:
+            try:
+                client.incr(KNOWLEDGE_VERSION_KEY)
+            except Exception as exc:  # noqa: BLE001
+                self._version_redis_down(exc)
+
+    def knowledge_version(self) -> str:
+        """
+        Current knowledge version: the shared counter (when reachable) plus
+        this process's own writes, so local writes are seen immediately.
+        """
+        shared = "-"
+        client = self._version_client()
+        if client is not None:
+            try:
+                value = client.get(KNOWLEDGE_VERSION_KEY)
+                shared = value.decode() if isinstance(value, bytes) else str(value or 0)
+            except Exception as exc:  # noqa: BLE001
+                self._version_redis_down(exc)
+        return f"{shared}.{self._knowledge_version}"
 
     # ------------------------------------------------------------------
     # Query helpers
     # ------------------------------------------------------------------
 
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed *texts* (one model pass, shared with concurrent callers)."""
+        return self._embedding_executor.embed_sync(texts)
+
+    async def aembed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Async :meth:`embed`; the event loop never blocks on the model."""
+        return await self._embedding_executor.embed(texts)
+
+    async def aquery_collections(
+        self,
+        queries: Sequence[str],
+        collection_keys: Sequence[str],
+        n_results: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, QueryResult]:
+        """Async :meth:`query_collections` (embedding batched, queries off-loop)."""
+        query_embeddings = await self.aembed(queries)
+        return await asyncio.to_thread(
+            self.query_collections,
+            queries,
+            collection_keys,
+            n_results,
+            filter_dict,
+            query_embeddings,
+        )
+
+    async def aquery_constitution(
+        self,
+        query: str,
+        n_results: int = 3,
+        query_embedding: Optional[List[float]] = None,
+    ) -> QueryResult:
+        """Async :meth:`query_constitution`."""
+        if query_embedding is None:
+            query_embedding = (await self.aembed([query]))[0]
+        return await asyncio.to_thread(
+            self.query_constitution, query, n_results, query_embedding
+        )
+
+    async def aquery_hierarchical_context(
+        self,
+        agent_type: str,
+        task_description: str,
+        n_results: int = 5,
+        query_embedding: Optional[List[float]] = None,
+    ) -> Dict[str, QueryResult]:
+        """Async :meth:`query_hierarchical_context`."""
+        if query_embedding is None:
+            query_embedding = (await self.aembed([task_description]))[0]
+        results = await asyncio.to_thread(
+            self.query_hierarchical_context_batch,
+            agent_type,
+            [task_description],
+            n_results,
+            [query_embedding],
+        )
+        return results[0]
+
+    def query_collections(
+        self,
+        queries: Sequence[str],
+        collection_keys: Sequence[str],
+        n_results: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+    ) -> Dict[str, QueryResult]:
+        """
+        Run many queries against many collections with one embedding pass.
+
+        The query texts are embedded once (unless ``query_embeddings`` is
+        supplied) and the embeddings are sent to every collection
+        concurrently.  Returns the raw ChromaDB result per collection key;
+        row ``i`` of each result belongs to ``queries[i]``.  Collections
+        that fail are logged and left out.
+        """
+        if query_embeddings is None:
+            query_embeddings = self.embed(queries)
+        specs = {
+            key: {"n_results": n_results, "where": filter_dict}
+            for key in collection_keys
+        }
+        return self._query_many(query_embeddings, specs, strict=False)
+
+    def query_many(
+        self,
+        query_embeddings: List[List[float]],
+        specs: Dict[str, Dict[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, QueryResult]:
+        """
+        Query several collections concurrently with per-collection settings.
+
+        ``specs`` maps collection key -> ``{"n_results": int, "where":
+        dict|None}`` plus optional ``"query_embeddings"`` overriding the
+        shared ones.  Collections that fail, or are still running after
+        ``timeout`` seconds, are logged and left out.
+        """
+        return self._query_many(query_embeddings, specs, strict=False, timeout=timeout)
+
+    def query_knowledge_batch(
+        self,
+        queries: Sequence[str],
+        collection_keys: Optional[List[str]] = None,
+        n_results: int = 5,
+        filter_dict: Optional[Dict[str, Any]] = None,
+    ) -> List[QueryResult]:
+        """
+        Batched :meth:`query_knowledge`: one merged result per query text.
+        """
+        keys = collection_keys or list(self.COLLECTIONS.keys())
+        by_collection = self.query_collections(
+            queries, keys, n_results=n_results, filter_dict=filter_dict
+        )
+        return [
+            self._merge_results(
+                [self._result_row(result, i) for result in by_collection.values()],
+                n_results,
+            )
+            for i in range(len(queries))
+        ]
+
     def query_knowledge(
         self,
         query: str,
@@ -267,32 +588,20 @@ class VectorStore:
         not supplied.  Results are deduplicated by ID and sorted by
         distance (ascending) before being truncated to ``n_results``.
         """
-        keys = collection_keys or list(self.COLLECTIONS.keys())
-
-        results: List[QueryResult] = []
-        for key in keys:
-            try:
-                collection = self.get_collection(key)
-                result = collection.query(
-                    query_texts=[query],
-                    n_results=n_results,
-                    where=filter_dict,
-                )
-                results.append(result)
-            except Exception:  # noqa: BLE001
-                logger.exception("Query failed for collection '%s'", key)
-
-        return self._merge_results(results, n_results)
+        return self.query_knowledge_batch(
+            [query], collection_keys, n_results=n_results, filter_dict=filter_dict
+        )[0]
 
     def query_constitution(
         self,
         query: str,
         n_results: int = 3,
+        query_embedding: Optional[List[float]] = None,
     ) -> QueryResult:
         """Query specifically constitutional content."""
         collection = self.get_collection("constitution")
         return collection.query(
-            query_texts=[query],
+            query_embeddings=[query_embedding or self.embed([query])[0]],
             n_results=n_results,
             where={"document_type": "supreme_law"},
         )
@@ -313,42 +622,127 @@ class VectorStore:
         lead_agent      : constitution + task patterns
         task_agent      : constitution + execution patterns (filtered)
         """
-        context: Dict[str, QueryResult] = {}
+        return self.query_hierarchical_context_batch(
+            agent_type, [task_description], n_results=n_results
+        )[0]
 
-        # All tiers are grounded in the Constitution
-        context["constitution"] = self.query_constitution(
-            task_description, n_results=2
-        )
+    def query_hierarchical_context_batch(
+        self,
+        agent_type: str,
+        task_descriptions: Sequence[str],
+        n_results: int = 5,
+        query_embeddings: Optional[List[List[float]]] = None,
+    ) -> List[Dict[str, QueryResult]]:
+        """
+        Hierarchical context for many task descriptions in one call.
 
+        All descriptions are embedded in a single pass and each collection
+        is queried once for the whole batch (collections concurrently).
+        Returns one context dict per description, in order.
+        """
+        # All tiers are grounded in the Constitution
+        specs: Dict[str, Dict[str, Any]] = {
+            "constitution": {
+                "n_results": 2,
+                "where": {"document_type": "supreme_law"},
+            },
+        }
         if agent_type == "council_member":
-            context["council_memory"] = self.get_collection(
-                "council_memory"
-            ).query(
-                query_texts=[task_description],
-                n_results=n_results,
-            )
+            specs["council_memory"] = {"n_results": n_results, "where": None}
         elif agent_type == "lead_agent":
-            context["task_patterns"] = self.get_collection(
-                "task_patterns"
-            ).query(
-                query_texts=[task_description],
-                n_results=n_results,
-            )
+            specs["task_patterns"] = {"n_results": n_results, "where": None}
         elif agent_type == "task_agent":
-            context["task_patterns"] = self.get_collection(
-                "task_patterns"
-            ).query(
-                query_texts=[task_description],
-                n_results=n_results,
-                where={"type": "execution_pattern"},
-            )
+            specs["task_patterns"] = {
+                "n_results": n_results,
+                "where": {"type": "execution_pattern"},
+            }
 
-        return context
+        if query_embeddings is None:
+            query_embeddings = self.embed(task_descriptions)
+        by_collection = self._query_many(query_embeddings, specs, strict=True)
+        return [
+            {
+                key: self._result_row(result, i)
+                for key, result in by_collection.items()
+            }
+            for i in range(len(task_descriptions))
+        ]
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _query_many(
+        self,
+        query_embeddings: List[List[float]],
+        specs: Dict[str, Dict[str, Any]],
+        strict: bool,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, QueryResult]:
+        """
+        Query each collection in *specs* with the same embeddings, concurrently.
+
+        ``specs`` maps collection key -> ``{"n_results": int, "where": dict|None}``;
+        a spec may carry its own ``"query_embeddings"``.  With ``strict`` the
+        first failure is re-raised; otherwise failing collections are logged
+        and skipped.  With ``timeout`` (seconds, non-strict only) collections
+        that have not answered by then are left out of the result.
+        """
+        def _run(key: str) -> QueryResult:
+            spec = specs[key]
+            return self.get_collection(key).query(
+                query_embeddings=spec.get("query_embeddings") or query_embeddings,
+                n_results=spec["n_results"],
+                where=spec.get("where"),
+            )
+
+        if len(specs) == 1 and timeout is None:
+            key = next(iter(specs))
+            try:
+                return {key: _run(key)}
+            except Exception:  # noqa: BLE001
+                if strict:
+                    raise
+                logger.exception("Query failed for collection '%s'", key)
+                return {}
+
+        if self._query_pool is None:
+            self._query_pool = ThreadPoolExecutor(
+                max_workers=VECTOR_QUERY_WORKERS,
+                thread_name_prefix="vector-query",
+            )
+        futures = {key: self._query_pool.submit(_run, key) for key in specs}
+        if timeout is not None and not strict:
+            _, late = wait(futures.values(), timeout=max(0.0, timeout))
+            for key in [key for key, future in futures.items() if future in late]:
+                # Still running in the pool; its result is simply dropped
+                futures.pop(key).cancel()
+                logger.warning("Query for collection '%s' missed its deadline", key)
+
+        results: Dict[str, QueryResult] = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception:  # noqa: BLE001
+                if strict:
+                    raise
+                logger.exception("Query failed for collection '%s'", key)
+        return results
+
+    _PER_QUERY_FIELDS = (
+        "ids", "documents", "metadatas", "distances", "embeddings", "uris", "data",
+    )
+
+    @classmethod
+    def _result_row(cls, result: QueryResult, row: int) -> QueryResult:
+        """Extract the single-query result for query ``row`` of a batched result."""
+        sliced: Dict[str, Any] = dict(result)
+        for field in cls._PER_QUERY_FIELDS:
+            values = result.get(field)
+            if values is not None:
+                sliced[field] = [values[row]]
+        return sliced
+
     def _merge_results(
         self,
         results: List[QueryResult],
@@ -495,6 +889,7 @@ class VectorStore:
                 )
 
         if decayed > 0 or pruned > 0:
+            self.bump_knowledge_version()
             logger.info(
                 "Confidence decay: decayed %d entries, pruned %d entries",
                 decayed, pruned,
@@ -517,6 +912,8 @@ class VectorStore:
                 "persist_directory": CHROMA_PERSIST_DIR,
                 "collections": list(self._collections.keys()),
                 "heartbeat": heartbeat,
+                "embedding_cache": self._embedding_fn.cache.get_stats(),
+                "embedding_executor": self._embedding_executor.get_stats(),
             }
         except Exception as exc:  # noqa: BLE001
             return {
@@ -524,6 +921,7 @@ class VectorStore:
                 "error": str(exc),
                 "mode": "http" if CHROMA_HOST else "local",
                 "persist_directory": CHROMA_PERSIST_DIR,
+                "embedding_cache": self._embedding_fn.cache.get_stats(),
             }
 
 
@@ -4,6 +4,7 @@ FastAPI backend with eternal idle council + capability registry + lifecycle mana
 
 """
 import os
+import asyncio
 from datetime import datetime
 import json
 import logging
@@ -405,6 +406,67 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("❌ Knowledge base bootstrap failed: %s", e)
 
+    # ─────────────────────────────────────────────────────────────
+    # 10. Agent Hierarchy Index
+    #     In-process agent tree used by routing and delegation so the
+    #     hot path never queries PostgreSQL for parents / children.
+    # ─────────────────────────────────────────────────────────────
+    try:
+        from backend.services.agent_hierarchy_index import agent_hierarchy_index
+        await asyncio.to_thread(agent_hierarchy_index.reload)
+        await agent_hierarchy_index.start_listener()
+        logger.info("✅ Agent hierarchy index loaded (%d agents)", agent_hierarchy_index.stats()["agents"])
+    except Exception as e:
+        logger.error("⚠️ Agent hierarchy index load failed (will load lazily): %s", e)
+
+    # ─────────────────────────────────────────────────────────────
+    # 10b. Constitution Amendment Listener
+    #      Invalidates the shared constitution snapshot as soon as any
+    #      worker announces an amendment.
+    # ─────────────────────────────────────────────────────────────
+    try:
+        from backend.core.constitutional_guard import start_amendment_listener
+        await start_amendment_listener()
+        logger.info("✅ Constitution amendment listener started")
+    except Exception as e:
+        logger.error("⚠️ Constitution amendment listener failed to start (version polling only): %s", e)
+
+    # ─────────────────────────────────────────────────────────────
+    # 11. Active Tool Version Map
+    #     tool_name -> active version, so tool calls skip the
+    #     ToolVersion lookup before executing.
+    # ─────────────────────────────────────────────────────────────
+    try:
+        from backend.services.tool_version_map import active_tool_versions
+        await asyncio.to_thread(active_tool_versions.reload)
+        await active_tool_versions.start_listener()
+        logger.info("✅ Active tool version map loaded (%d tools)", active_tool_versions.stats()["tools"])
+    except Exception as e:
+        logger.error("⚠️ Active tool version map load failed (will load lazily): %s", e)
+
+    # ─────────────────────────────────────────────────────────────
+    # 12. Audit Writer
+    #     Bulk-inserts audit entries queued on the audit stream.
+    # ─────────────────────────────────────────────────────────────
+    try:
+        from backend.services.audit.audit_pipeline import audit_pipeline
+        audit_pipeline.start_consumer()
+        logger.info("✅ Audit writer started")
+    except Exception as e:
+        logger.error("⚠️ Audit writer failed to start (Celery will drain the stream): %s", e)
+
+    # ─────────────────────────────────────────────────────────────
+    # 13. WebSocket Relay
+    #     Delivers broadcasts emitted by other workers and Celery
+    #     to the clients connected to this worker.
+    # ─────────────────────────────────────────────────────────────
+    try:
+        from backend.api.routes.websocket import manager as ws_manager
+        await ws_manager.start_relay()
+        logger.info("✅ WebSocket relay listening")
+    except Exception as e:
+        logger.error("⚠️ WebSocket relay failed to start (broadcasts stay worker-local): %s", e)
+
     logger.info("🎉 Agentium startup complete!")
 
     yield  # ── Application runs here ──────────────────────────────
@@ -420,6 +482,61 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Error stopping Idle Governance: {e}")
 
+    try:
+        from backend.services.agent_hierarchy_index import agent_hierarchy_index
+        await agent_hierarchy_index.stop_listener()
+    except Exception as e:
+        logger.error(f"❌ Error stopping agent hierarchy listener: {e}")
+
+    try:
+        from backend.core.constitutional_guard import stop_amendment_listener
+        await stop_amendment_listener()
+    except Exception as e:
+        logger.error(f"❌ Error stopping constitution amendment listener: {e}")
+
+    try:
+        from backend.services.tool_version_map import active_tool_versions
+        await active_tool_versions.stop_listener()
+    except Exception as e:
+        logger.error(f"❌ Error stopping tool version listener: {e}")
+
+    try:
+        from backend.api.routes.websocket import manager as ws_manager
+        await ws_manager.stop_relay()
+    except Exception as e:
+        logger.error(f"❌ Error stopping WebSocket relay: {e}")
+
+    try:
+        from backend.services.provider_registry import provider_registry
+        await provider_registry.aclose()
+    except Exception as e:
+        logger.error(f"❌ Error closing model provider clients: {e}")
+
+    try:
+        from backend.services.webhook_delivery_engine import webhook_delivery_engine
+        await webhook_delivery_engine.aclose()
+    except Exception as e:
+        logger.error(f"❌ Error closing webhook HTTP client: {e}")
+
+    try:
+        from backend.services.remote_executor.sandbox import sandbox_pool
+        await sandbox_pool.shutdown()
+    except Exception as e:
+        logger.error(f"❌ Error draining sandbox warm pool: {e}")
+
+    try:
+        from backend.services.audit.audit_pipeline import audit_pipeline
+        await asyncio.to_thread(audit_pipeline.stop_consumer)
+    except Exception as e:
+        logger.error(f"❌ Error stopping audit writer: {e}")
+
+    try:
+        from backend.services.usage_log_writer import usage_log_writer
+        await asyncio.to_thread(usage_log_writer.shutdown)
+        logger.info("✅ Usage logs flushed")
+    except Exception as e:
+        logger.error(f"❌ Error flushing usage logs: {e}")
+
     # Final statistics
     try:
         db = next(get_db())
@@ -529,10 +646,16 @@ app.include_router(wait_poll_routes.router,          prefix="/api/v1")  # Phase
 @app.get("/api/health")
 async def health_check_api():
     """Health check endpoint."""
+    from backend.services.usage_log_writer import usage_log_writer
+    from backend.services.audit.audit_pipeline import audit_pipeline
+    from backend.api.routes.websocket import manager as ws_manager
     db_status = check_health()
     return {
         "status": "healthy" if db_status["status"] == "healthy" else "unhealthy",
         "database": db_status,
+        "usage_logs": usage_log_writer.get_stats(),
+        "audit_pipeline": await asyncio.to_thread(audit_pipeline.get_stats),
+        "websocket": ws_manager.get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -731,6 +854,9 @@ async def update_constitution(
     db.commit()
     db.refresh(new_version)
 
+    from backend.core.constitutional_guard import notify_constitution_amended
+    await notify_constitution_amended(new_version.version_number)
+
     return {
         "status": "success",
         "message": f"Constitution updated to version {new_version.version}",
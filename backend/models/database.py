@@ -304,7 +304,7 @@ def init_db():
     # ── Phase 6.1: Tool Management ───────────────────────────────────────────
     from backend.models.entities.tool_staging import ToolStaging  # noqa: F401
     from backend.models.entities.tool_version import ToolVersion  # noqa: F401
-    from backend.models.entities.tool_usage_log import ToolUsageLog  # noqa: F401
+    from backend.models.entities.tool_usage_log import ToolUsageLog, ToolUsageHourlyRollup  # noqa: F401
     from backend.models.entities.tool_marketplace_listing import (  # noqa: F401
         ToolMarketplaceListing
     )
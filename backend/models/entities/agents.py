@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any, Type, Union
 from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Enum, Boolean, event, select, Index
 from sqlalchemy.orm import relationship, validates, Session
-from backend.models.entities.base import BaseEntity
+from backend.models.entities.base import BaseEntity, stage_after_commit
 from backend.models.entities.constitution import Ethos
 import enum
 
@@ -1490,4 +1490,51 @@ def set_constitution_version(mapper, connection, target):
 @event.listens_for(TaskAgent, 'after_insert')
 def notify_lead_of_spawn(mapper, connection, target):
     if target.parent and isinstance(target.parent, LeadAgent):
-        target.parent.update_team_size()
\ No newline at end of file
+        target.parent.update_team_size()
+
+
+
+# ── Agent hierarchy index hooks ──────────────────────────────────────
+# Spawns, terminations and status changes reach the in-process
+# AgentHierarchyIndex only after commit, so rolled-back spawns never
+# become routable.
+
+def _stage_hierarchy_change(target, removed: bool = False):
+    from sqlalchemy.orm import object_session
+    session = object_session(target)
+    if session is None:
+        return
+    if removed:
+        node = None
+    else:
+        from backend.services.agent_hierarchy_index import AgentNode
+        node = AgentNode.from_entity(target)
+    stage_after_commit(session, "agent_hierarchy", (target.agentium_id, node), _apply_hierarchy_changes)
+
+
+def _apply_hierarchy_changes(changes):
+    from backend.services.agent_hierarchy_index import agent_hierarchy_index
+    latest = dict(changes)  # Last change per agent wins
+    agent_hierarchy_index.apply(
+        nodes=[node for node in latest.values() if node is not None],
+        removed=[aid for aid, node in latest.items() if node is None],
+    )
+
+
+@event.listens_for(Agent, 'after_insert', propagate=True)
+def index_agent_on_spawn(mapper, connection, target):
+    _stage_hierarchy_change(target)
+
+
+@event.listens_for(Agent, 'after_update', propagate=True)
+def index_agent_on_update(mapper, connection, target):
+    from sqlalchemy import inspect as sa_inspect
+    from backend.services.agent_hierarchy_index import TRACKED_ATTRIBUTES
+    state = sa_inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRIBUTES):
+        _stage_hierarchy_change(target)
+
+
+@event.listens_for(Agent, 'after_delete', propagate=True)
+def index_agent_on_delete(mapper, connection, target):
+    _stage_hierarchy_change(target, removed=True)
@@ -3,13 +3,16 @@ Base entity model for all Agentium database models.
 Provides common functionality like timestamps, UUIDs, and serialization.
 """
 
+import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 from sqlalchemy import Column, String, DateTime, event, Boolean
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session, SessionTransaction, declarative_base
 import uuid
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 class BaseEntity(Base):
@@ -64,4 +67,76 @@ class BaseEntity(Base):
 @event.listens_for(BaseEntity, 'before_update', propagate=True)
 def receive_before_update(mapper, connection, target):
     """Automatically update the updated_at timestamp."""
-    target.updated_at = datetime.utcnow()
\ No newline at end of file
+    target.updated_at = datetime.utcnow()
+
+
+# ── Post-commit hooks ─────────────────────────────────────────────────────
+# In-process indexes and caches (agent hierarchy, provider registry, webhook
+# subscriptions, dependency scheduler, dashboard counters) must only see
+# changes that actually committed.  Entity hooks stage what changed with
+# stage_after_commit(); the work runs once the outermost transaction commits.
+
+_AFTER_COMMIT_STAGED = "after_commit_staged"
+
+
+def stage_after_commit(
+    session: Session,
+    key: str,
+    payload: Any,
+    apply_fn: Callable[[List[Any]], None],
+) -> None:
+    """
+    Stage *payload* under *key* until *session* commits.
+
+    Once the outermost transaction commits, ``apply_fn`` is called once per
+    key with every payload staged under it, in staging order.  Payloads
+    staged inside a SAVEPOINT that is rolled back are dropped; everything is
+    dropped if the transaction ends without committing.
+    """
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    staged = session.info.setdefault(_AFTER_COMMIT_STAGED, {})
+    _, entries = staged.setdefault(key, (apply_fn, []))
+    entries.append((transaction, payload))
+
+
+def _staged_within(transaction: Optional[SessionTransaction], boundary: SessionTransaction) -> bool:
+    while transaction is not None:
+        if transaction is boundary:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, 'after_commit')
+def run_after_commit_hooks(session):
+    if session.in_nested_transaction():
+        return  # SAVEPOINT released; wait for the outer commit
+    staged = session.info.pop(_AFTER_COMMIT_STAGED, None)
+    for key, (apply_fn, entries) in (staged or {}).items():
+        try:
+            apply_fn([payload for _, payload in entries])
+        except Exception as e:
+            logger.debug("After-commit hook '%s' failed: %s", key, e)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_rolled_back_hooks(session, previous_transaction):
+    staged = session.info.get(_AFTER_COMMIT_STAGED)
+    if not staged:
+        return
+    for key in list(staged):
+        apply_fn, entries = staged[key]
+        entries[:] = [
+            (transaction, payload) for transaction, payload in entries
+            if not _staged_within(transaction, previous_transaction)
+        ]
+        if not entries:
+            del staged[key]
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def discard_uncommitted_hooks(session, transaction):
+    # A committed root transaction has already run its hooks; anything left
+    # when the root ends (rollback, close) never committed.
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_STAGED, None)
@@ -5,9 +5,9 @@ Higher-tier agents actively monitor lower-tier agents for compliance and perform
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Enum, Boolean, JSON, Float
-from sqlalchemy.orm import relationship, validates
-from backend.models.entities.base import BaseEntity
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Enum, Boolean, JSON, Float, event
+from sqlalchemy.orm import Session, relationship, validates
+from backend.models.entities.base import BaseEntity, stage_after_commit
 import enum
 
 class MonitoringStatus(str, enum.Enum):
@@ -339,4 +339,32 @@ class MonitoringAlert(BaseEntity):
             'detected_by': self.detected_by_agentium_id,
             'acknowledged': self.acknowledged_by is not None,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+# ── Dashboard metric counters ─────────────────────────────────────────────
+# Task, agent, workflow, event, audit and violation changes are turned into
+# counter increments / gauge deltas on every flush and handed to the metrics
+# counters once the transaction commits.
+
+@event.listens_for(Session, 'after_flush')
+def collect_metric_changes(session, flush_context):
+    try:
+        from backend.services.metrics_counters import metrics_counters
+        counts, gauges = metrics_counters.collect_flush(session)
+    except Exception:
+        return
+    if counts or gauges:
+        stage_after_commit(session, "metrics_counters", (counts, gauges), _apply_metric_changes)
+
+
+def _apply_metric_changes(flushes):
+    from backend.services.metrics_counters import metrics_counters
+    counts: Dict[str, float] = {}
+    gauges: Dict[str, int] = {}
+    for flush_counts, flush_gauges in flushes:
+        for name, amount in flush_counts.items():
+            counts[name] = counts.get(name, 0) + amount
+        for name, delta in flush_gauges.items():
+            gauges[name] = gauges.get(name, 0) + delta
+    metrics_counters.apply(counts, gauges)
@@ -6,9 +6,9 @@ Updated for Task Execution Architecture: Governance Alignment
 
 from datetime import datetime
 from typing import List, Dict, Any
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Enum, Boolean, JSON
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Enum, Boolean, JSON, event
 from sqlalchemy.orm import relationship, validates
-from backend.models.entities.base import BaseEntity
+from backend.models.entities.base import BaseEntity, stage_after_commit
 from backend.models.entities.agents import Agent  
 import enum
 
@@ -708,6 +708,8 @@ class TaskDependency(BaseEntity):
     child_task_id = Column(String(36), ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False, index=True)
     dependency_order = Column(Integer, default=0, nullable=False)
     status = Column(String(20), default="pending", nullable=False)
+    # Lower-order siblings not yet completed; NULL until the scheduler sweep sets it
+    pending_predecessors = Column(Integer, nullable=True)
 
     # Relationships
     parent_task = relationship("Task", foreign_keys=[parent_task_id])
@@ -720,5 +722,45 @@ class TaskDependency(BaseEntity):
             'child_task_id': self.child_task_id,
             'dependency_order': self.dependency_order,
             'status': self.status,
+            'pending_predecessors': self.pending_predecessors,
         })
-        return base
\ No newline at end of file
+        return base
+
+
+# ── Dependency scheduling ─────────────────────────────────────────────────
+# Child tasks reaching a releasing state and dependency rows created ready
+# are handed to the dependency scheduler only after commit, so rolled-back
+# work never dispatches anything.
+
+_DAG_FINISHED = "finished"
+_DAG_READY = "ready"
+
+
+def _stage_dag_event(target, kind: str, task_id: str):
+    from sqlalchemy.orm import object_session
+    session = object_session(target)
+    if session is not None and task_id:
+        stage_after_commit(session, "dependency_dag", (kind, task_id), _apply_dag_events)
+
+
+def _apply_dag_events(events):
+    finished = sorted({task_id for kind, task_id in events if kind == _DAG_FINISHED})
+    ready = sorted({task_id for kind, task_id in events if kind == _DAG_READY})
+    from backend.services.dag_scheduler import dependency_scheduler
+    dependency_scheduler.queue_events(finished, ready)
+
+
+@event.listens_for(Task, 'after_update', propagate=True)
+def stage_dag_release_on_status_change(mapper, connection, target):
+    from sqlalchemy import inspect as sa_inspect
+    from backend.services.task_state_machine import TaskStateMachine
+    if not target.parent_task_id or not sa_inspect(target).attrs.status.history.has_changes():
+        return  # Only sub-tasks can be DAG dependencies
+    if TaskStateMachine.releases_dependents(target.status):
+        _stage_dag_event(target, _DAG_FINISHED, target.id)
+
+
+@event.listens_for(TaskDependency, 'after_insert')
+def stage_dag_dispatch_on_insert(mapper, connection, target):
+    if target.pending_predecessors == 0 and target.status == "pending":
+        _stage_dag_event(target, _DAG_READY, target.child_task_id)
@@ -3,8 +3,9 @@ Tool Usage Log Entity
 Persistent analytics table recording every tool invocation.
 Queryable for dashboards, rate limiting, and per-tool performance reports.
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Index
-from backend.models.entities.base import BaseEntity
+import uuid
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Index, UniqueConstraint
+from backend.models.entities.base import Base, BaseEntity
 from datetime import datetime
 
 
@@ -54,4 +55,39 @@ class ToolUsageLog(BaseEntity):
             "input_hash": self.input_hash,
             "output_size_bytes": self.output_size_bytes,
             "invoked_at": self.invoked_at.isoformat() if self.invoked_at else None,
-        }
\ No newline at end of file
+        }
+
+
+class ToolUsageHourlyRollup(Base):
+    """
+    One row per (tool, hour) summarising that hour's ToolUsageLog rows.
+
+    Maintained by the rollup_tool_usage Celery task; read by
+    ToolAnalyticsService so dashboards never load raw log rows.  All
+    aggregates are mergeable: counts add up, and latency_histogram holds
+    sparse log-scale bucket counts (see services/tool_analytics.py) from
+    which p50/p95/p99 are estimated across any range of hours.
+    """
+    __tablename__ = 'tool_usage_hourly_rollups'
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tool_name = Column(String(100), nullable=False)
+    hour_start = Column(DateTime, nullable=False, index=True)
+
+    call_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(Float, nullable=False, default=0.0)
+    latency_min_ms = Column(Float, nullable=True)
+    latency_max_ms = Column(Float, nullable=True)
+    latency_histogram = Column(JSON, nullable=False, default=dict)   # {bucket index: count}
+
+    caller_counts = Column(JSON, nullable=False, default=dict)       # {agentium_id: count}
+    error_counts = Column(JSON, nullable=False, default=dict)        # {error message[:80]: count}
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('tool_name', 'hour_start', name='uq_tool_usage_rollup_tool_hour'),
+    )
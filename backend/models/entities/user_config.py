@@ -6,10 +6,10 @@ import enum
 import random
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Enum, JSON, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Enum, JSON, Text, ForeignKey, event
 from sqlalchemy.orm import validates
-from sqlalchemy.orm import relationship
-from backend.models.entities.base import BaseEntity
+from sqlalchemy.orm import relationship, object_session
+from backend.models.entities.base import BaseEntity, stage_after_commit
 
 
 class ProviderType(str, enum.Enum):
@@ -285,4 +285,38 @@ class ModelUsageLog(BaseEntity):
     request_metadata = Column(JSON, default=dict)
 
     # Relationships
-    config = relationship("UserModelConfig", back_populates="usage_logs")
\ No newline at end of file
+    config = relationship("UserModelConfig", back_populates="usage_logs")
+
+# ── Provider registry invalidation ────────────────────────────────────────
+# ModelService keeps providers (decrypted key, pooled HTTP client) per config;
+# they are evicted only after commit, so a rolled-back edit never evicts a
+# healthy provider.
+
+def _stage_config_change(target):
+    session = object_session(target)
+    if session is not None:
+        stage_after_commit(session, "provider_configs", target.id, _apply_provider_invalidations)
+
+
+def _apply_provider_invalidations(config_ids):
+    from backend.services.provider_registry import provider_registry
+    provider_registry.invalidate(set(config_ids))
+
+
+@event.listens_for(UserModelConfig, 'after_insert')
+def invalidate_providers_on_insert(mapper, connection, target):
+    _stage_config_change(target)
+
+
+@event.listens_for(UserModelConfig, 'after_update')
+def invalidate_providers_on_update(mapper, connection, target):
+    from sqlalchemy import inspect as sa_inspect
+    from backend.services.provider_registry import FINGERPRINT_ATTRIBUTES
+    state = sa_inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in FINGERPRINT_ATTRIBUTES):
+        _stage_config_change(target)
+
+
+@event.listens_for(UserModelConfig, 'after_delete')
+def invalidate_providers_on_delete(mapper, connection, target):
+    _stage_config_change(target)
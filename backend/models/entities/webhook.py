@@ -6,8 +6,9 @@ Entities for managing outbound event webhook subscriptions and delivery logs.
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, JSON, Integer, Text, func
-from backend.models.entities.base import Base
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, JSON, Integer, Text, func, event
+from sqlalchemy.orm import object_session
+from backend.models.entities.base import Base, stage_after_commit
 
 
 def _new_uuid() -> str:
@@ -105,3 +106,33 @@ class WebhookDeliveryLog(Base):
             "error": self.error,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+# ── Subscription index invalidation ───────────────────────────────────────
+# WebhookDispatchService looks subscriptions up by event type in an
+# in-process index, refreshed once subscription changes commit.
+
+def _stage_subscription_change(target):
+    session = object_session(target)
+    if session is not None:
+        stage_after_commit(session, "webhook_subscriptions", None, _apply_subscription_changes)
+
+
+def _apply_subscription_changes(_changes):
+    from backend.services.webhook_dispatch_service import webhook_subscription_index
+    webhook_subscription_index.invalidate()
+
+
+@event.listens_for(WebhookSubscription, 'after_insert')
+def invalidate_webhook_index_on_insert(mapper, connection, target):
+    _stage_subscription_change(target)
+
+
+@event.listens_for(WebhookSubscription, 'after_update')
+def invalidate_webhook_index_on_update(mapper, connection, target):
+    _stage_subscription_change(target)
+
+
+@event.listens_for(WebhookSubscription, 'after_delete')
+def invalidate_webhook_index_on_delete(mapper, connection, target):
+    _stage_subscription_change(target)
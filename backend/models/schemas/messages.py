@@ -182,6 +182,7 @@ class MessageReceipt(BaseModel):
     received_at: datetime = Field(default_factory=datetime.utcnow)
     status: Literal["delivered", "processing", "failed", "rejected"] = "delivered"
     error_message: Optional[str] = None
+    stream_id: Optional[str] = None  # Redis Stream entry ID to XACK (optional)
 
 
 class RouteResult(BaseModel):
@@ -192,4 +193,17 @@ class RouteResult(BaseModel):
     latency_ms: float = 0.0
     error: Optional[str] = None
     vector_context_injected: bool = False
-    constitutional_articles: List[str] = Field(default_factory=list)
\ No newline at end of file
+    constitutional_articles: List[str] = Field(default_factory=list)
+
+class BroadcastResult(BaseModel):
+    """Aggregate outcome of a Head-of-Council broadcast."""
+    success: bool
+    message_id: str
+    mode: Literal["fanout", "shared"] = "fanout"
+    recipients: int = 0
+    delivered: int = 0
+    failed: int = 0
+    per_tier: Dict[str, int] = Field(default_factory=dict)  # tier prefix -> recipients
+    stream_entry_id: Optional[str] = None  # Shared-stream mode only
+    latency_ms: float = 0.0
+    error: Optional[str] = None
@@ -0,0 +1,355 @@
+"""
+Agent Hierarchy Index - in-process map of the agent tree.
+
+Keeps agentium_id -> parent / children / tier / status in memory so that
+routing (MessageBus.route_up, broadcasts) and delegation
+(AgentOrchestrator) never touch PostgreSQL on the hot path.
+
+The index is loaded once from the ``agents`` table, then kept current by:
+  * the SQLAlchemy hooks in ``models/entities/agents.py`` (applied after
+    the spawning / terminating transaction commits), and
+  * the ``agent:hierarchy:changes`` Redis channel, which tells every other
+    worker to refresh the agents another process changed.
+A periodic full reload (``INDEX_MAX_AGE_SECONDS``) is the safety net for
+processes that do not run the Redis listener (e.g. Celery workers).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+CHANGES_CHANNEL = "agent:hierarchy:changes"
+INDEX_MAX_AGE_SECONDS = 300
+PUBLISH_QUEUE_SIZE = 1000
+PUBLISH_SOCKET_TIMEOUT = 1.0
+
+# Attributes whose change affects routing / delegation decisions
+TRACKED_ATTRIBUTES = ("status", "parent_id", "idle_mode_enabled", "current_task_id", "is_active")
+
+
+@dataclass
+class AgentNode:
+    """Compact snapshot of one agent as seen by the index."""
+    id: str                    # Primary key (UUID) - parent_id references this
+    agentium_id: str
+    parent_uuid: Optional[str]
+    agent_type: str
+    status: str
+    idle_mode_enabled: bool = False
+    current_task_id: Optional[str] = None
+
+    @property
+    def tier(self) -> str:
+        return self.agentium_id[0]
+
+    @property
+    def is_live(self) -> bool:
+        return self.status != "terminated"
+
+    @classmethod
+    def from_entity(cls, agent: Any) -> "AgentNode":
+        return cls(
+            id=str(agent.id),
+            agentium_id=agent.agentium_id,
+            parent_uuid=str(agent.parent_id) if agent.parent_id else None,
+            agent_type=getattr(agent.agent_type, "value", agent.agent_type),
+            status=getattr(agent.status, "value", agent.status),
+            idle_mode_enabled=bool(agent.idle_mode_enabled),
+            current_task_id=agent.current_task_id,
+        )
+
+
+class AgentHierarchyIndex:
+    """
+    Thread-safe in-memory index of the agent hierarchy.
+
+    Queries are O(1) for parent lookups and O(children) for subtree and
+    "least-loaded available task agent" lookups.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._nodes: Dict[str, AgentNode] = {}          # agentium_id -> node
+        self._by_uuid: Dict[str, str] = {}              # uuid -> agentium_id
+        self._children: Dict[str, Set[str]] = {}        # parent uuid -> child agentium_ids
+        # Picks handed out since the agent's last status change, to spread
+        # consecutive delegations before the DB status update arrives.
+        self._pending_picks: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._origin = uuid.uuid4().hex                  # Ignore our own Redis notices
+        self._listener_task: Optional[asyncio.Task] = None
+        self._redis_sync = None
+        # Change notices are published from a daemon thread: apply() runs in
+        # the after_commit hook, often on the event loop, and must not block
+        # on Redis.
+        self._publish_queue: "queue.Queue[List[str]]" = queue.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self._publisher: Optional[threading.Thread] = None
+        self._publisher_lock = threading.Lock()
+
+    # ── Loading ──────────────────────────────────────────────────────
+
+    def ensure_loaded(self) -> None:
+        """Load (or periodically reload) the index from the database."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < INDEX_MAX_AGE_SECONDS:
+            return
+        self.reload()
+
+    async def ensure_loaded_async(self) -> None:
+        """Async variant of :meth:`ensure_loaded`; the DB load runs off the event loop."""
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < INDEX_MAX_AGE_SECONDS:
+            return
+        await asyncio.to_thread(self.reload)
+
+    def reload(self) -> None:
+        """Rebuild the whole index from the ``agents`` table."""
+        from backend.models.database import get_db_context
+        from backend.models.entities.agents import Agent
+
+        with get_db_context() as session:
+            nodes = [AgentNode.from_entity(agent) for agent in session.query(Agent).all()]
+
+        with self._lock:
+            self._nodes.clear()
+            self._by_uuid.clear()
+            self._children.clear()
+            self._pending_picks.clear()
+            for node in nodes:
+                self._put(node)
+            self._loaded_at = time.monotonic()
+        logger.info("Agent hierarchy index loaded: %d agents", len(nodes))
+
+    def refresh_agents(self, agentium_ids: Iterable[str]) -> None:
+        """Re-read specific agents from the database (remote change notices)."""
+        from backend.models.database import get_db_context
+        from backend.models.entities.agents import Agent
+
+        ids = list(agentium_ids)
+        if not ids:
+            return
+        with get_db_context() as session:
+            rows = session.query(Agent).filter(Agent.agentium_id.in_(ids)).all()
+            nodes = [AgentNode.from_entity(agent) for agent in rows]
+        with self._lock:
+            found = {node.agentium_id for node in nodes}
+            for agentium_id in ids:
+                if agentium_id not in found:
+                    self._remove(agentium_id)
+            for node in nodes:
+                self._put(node)
+
+    # ── Mutation (called from the entity hooks) ──────────────────────
+
+    def apply(self, nodes: Iterable[AgentNode], removed: Iterable[str] = (), publish: bool = True) -> None:
+        """Apply committed agent changes locally and announce them to other workers."""
+        nodes = list(nodes)
+        removed = list(removed)
+        with self._lock:
+            for agentium_id in removed:
+                self._remove(agentium_id)
+            for node in nodes:
+                self._put(node)
+        if publish:
+            self._publish([n.agentium_id for n in nodes] + removed)
+
+    def _put(self, node: AgentNode) -> None:
+        previous = self._nodes.get(node.agentium_id)
+        if previous is not None:
+            if previous.parent_uuid and previous.parent_uuid != node.parent_uuid:
+                self._children.get(previous.parent_uuid, set()).discard(node.agentium_id)
+            if previous.status != node.status:
+                self._pending_picks.pop(node.agentium_id, None)
+        self._nodes[node.agentium_id] = node
+        self._by_uuid[node.id] = node.agentium_id
+        if node.parent_uuid:
+            self._children.setdefault(node.parent_uuid, set()).add(node.agentium_id)
+
+    def _remove(self, agentium_id: str) -> None:
+        node = self._nodes.pop(agentium_id, None)
+        if node is None:
+            return
+        self._by_uuid.pop(node.id, None)
+        self._pending_picks.pop(agentium_id, None)
+        if node.parent_uuid:
+            self._children.get(node.parent_uuid, set()).discard(agentium_id)
+
+    # ── Queries ──────────────────────────────────────────────────────
+
+    def get(self, agentium_id: str) -> Optional[AgentNode]:
+        return self._nodes.get(agentium_id)
+
+    def get_parent_id(self, agentium_id: str) -> Optional[str]:
+        """agentium_id of the agent's parent, or ``None`` if unknown / root."""
+        node = self._nodes.get(agentium_id)
+        if node is None or not node.parent_uuid:
+            return None
+        return self._by_uuid.get(node.parent_uuid)
+
+    def get_children(self, agentium_id: str, live_only: bool = True) -> List[str]:
+        with self._lock:
+            node = self._nodes.get(agentium_id)
+            if node is None:
+                return []
+            children = list(self._children.get(node.id, ()))
+            if live_only:
+                children = [c for c in children if self._nodes[c].is_live]
+        return children
+
+    def get_subtree(self, agentium_id: str, live_only: bool = True) -> List[str]:
+        """All descendants of *agentium_id* (breadth-first, excluding itself)."""
+        result: List[str] = []
+        frontier = [agentium_id]
+        while frontier:
+            next_frontier: List[str] = []
+            for current in frontier:
+                for child in self.get_children(current, live_only=live_only):
+                    result.append(child)
+                    next_frontier.append(child)
+            frontier = next_frontier
+        return result
+
+    def agents_by_tier(self, tiers: Iterable[str], live_only: bool = True) -> Dict[str, List[str]]:
+        """agentium_ids grouped by tier prefix ('1', '2', '3', ...)."""
+        by_tier: Dict[str, List[str]] = {tier: [] for tier in tiers}
+        with self._lock:
+            nodes = list(self._nodes.values())
+        for node in nodes:
+            if node.tier in by_tier and (node.is_live or not live_only):
+                by_tier[node.tier].append(node.agentium_id)
+        return by_tier
+
+    def find_available_task_agent(self, lead_id: str, prefer_idle_mode: bool = False) -> Optional[str]:
+        """
+        Least-loaded ACTIVE task agent under *lead_id*.
+
+        With *prefer_idle_mode* (token optimizer idle mode) agents with
+        ``idle_mode_enabled`` win over the others.
+        """
+        with self._lock:
+            candidates = [
+                self._nodes[c] for c in self.get_children(lead_id)
+                if self._nodes[c].agent_type == "task_agent" and self._nodes[c].status == "active"
+            ]
+            if not candidates:
+                return None
+            best = min(
+                candidates,
+                key=lambda n: (
+                    not (prefer_idle_mode and n.idle_mode_enabled),
+                    n.current_task_id is not None,
+                    self._pending_picks.get(n.agentium_id, 0),
+                ),
+            )
+            self._pending_picks[best.agentium_id] = self._pending_picks.get(best.agentium_id, 0) + 1
+            return best.agentium_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "agents": len(self._nodes),
+            "loaded": self._loaded_at is not None,
+            "age_seconds": (time.monotonic() - self._loaded_at) if self._loaded_at else None,
+            "listening": bool(self._listener_task and not self._listener_task.done()),
+        }
+
+    # ── Cross-worker invalidation ────────────────────────────────────
+
+    def _publish(self, agentium_ids: List[str]) -> None:
+        """Queue a change notice for the publisher thread; never blocks."""
+        if not agentium_ids:
+            return
+        self._ensure_publisher()
+        try:
+            self._publish_queue.put_nowait(list(agentium_ids))
+        except queue.Full:
+            # Other workers fall back to the periodic full reload
+            logger.debug("Agent hierarchy change notice dropped: publish queue full")
+
+    def _ensure_publisher(self) -> None:
+        if self._publisher is not None:
+            return
+        with self._publisher_lock:
+            if self._publisher is not None:
+                return
+            self._publisher = threading.Thread(
+                target=self._publish_loop,
+                name="agent-hierarchy-publisher",
+                daemon=True,
+            )
+            self._publisher.start()
+
+    def _publish_loop(self) -> None:
+        while True:
+            agentium_ids = self._publish_queue.get()
+            # Coalesce whatever else queued up into a single notice
+            while True:
+                try:
+                    agentium_ids.extend(self._publish_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if self._redis_sync is None:
+                    import redis
+                    url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                    self._redis_sync = redis.Redis.from_url(
+                        url,
+                        decode_responses=True,
+                        socket_timeout=PUBLISH_SOCKET_TIMEOUT,
+                        socket_connect_timeout=PUBLISH_SOCKET_TIMEOUT,
+                    )
+                self._redis_sync.publish(
+                    CHANGES_CHANNEL,
+                    json.dumps({"origin": self._origin, "agents": list(dict.fromkeys(agentium_ids))}),
+                )
+            except Exception as e:
+                logger.debug("Agent hierarchy change publish skipped: %s", e)
+
+    async def start_listener(self, redis_url: Optional[str] = None) -> None:
+        """Subscribe to hierarchy change notices published by other workers."""
+        if self._listener_task and not self._listener_task.done():
+            return
+        self._listener_task = asyncio.create_task(self._listen(redis_url))
+
+    async def stop_listener(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+
+    async def _listen(self, redis_url: Optional[str]) -> None:
+        import redis.asyncio as aioredis
+
+        url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        client = aioredis.from_url(url, decode_responses=True)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(CHANGES_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                if data.get("origin") == self._origin or self._loaded_at is None:
+                    continue
+                await asyncio.to_thread(self.refresh_agents, data.get("agents", []))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Agent hierarchy listener stopped: %s", e)
+        finally:
+            await pubsub.close()
+            await client.close()
+
+
+# Global instance
+agent_hierarchy_index = AgentHierarchyIndex()
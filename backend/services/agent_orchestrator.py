@@ -12,9 +12,11 @@ from sqlalchemy.orm import Session
 
 from backend.models.schemas.messages import AgentMessage, RouteResult
 from backend.services.message_bus import MessageBus, get_message_bus, HierarchyValidator
+from backend.services.agent_hierarchy_index import agent_hierarchy_index
 from backend.core.vector_store import get_vector_store, VectorStore
-from backend.models.entities.agents import Agent, AgentType, AgentStatus
+from backend.models.entities.agents import Agent, AgentStatus
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
+from backend.services.audit.audit_pipeline import audit_pipeline
 from backend.models.entities.task import TaskStatus, Task
 from backend.core.tool_registry import tool_registry
 from backend.services.idle_governance import idle_budget, token_optimizer
@@ -404,7 +406,7 @@ class AgentOrchestrator:
         params = tool_detection["parameters"]
 
         tool_svc = ToolCreationService(self.db)
-        result = tool_svc.execute_tool(
+        result = await tool_svc.execute_tool_async(
             tool_name=tool_name,
             called_by=agent_id,
             kwargs=params,
@@ -429,7 +431,7 @@ class AgentOrchestrator:
                         "registered as stealth domain, retrying with nodriver",
                         hostname
                     )
-                    result = tool_svc.execute_tool(
+                    result = await tool_svc.execute_tool_async(
                         tool_name="nodriver_navigate",
                         called_by=agent_id,
                         kwargs=params,
@@ -563,7 +565,7 @@ class AgentOrchestrator:
         )
 
         if self.vector_store:
-            articles = self.vector_store.query_constitution(issue, n_results=3)
+            articles = await self.vector_store.aquery_constitution(issue, n_results=3)
             msg.constitutional_basis = articles.get("documents", [[]])[0]
 
         resolution_tools = self._suggest_tools_for_issue(issue)
@@ -674,11 +676,12 @@ class AgentOrchestrator:
         )
 
         if self.vector_store:
-            patterns = self.vector_store.get_collection("task_patterns").query(
-                query_texts=[task.get("description", "")],
+            patterns = await self.vector_store.aquery_collections(
+                [task.get("description", "")],
+                ["task_patterns"],
                 n_results=3,
             )
-            msg.rag_context = {"patterns": patterns}
+            msg.rag_context = {"patterns": patterns.get("task_patterns")}
 
         result = await self.message_bus.route_down(msg)
 
@@ -787,17 +790,23 @@ class AgentOrchestrator:
             return msg
 
         agent_type = self._get_type(msg.sender_id)
-        ctx = self.vector_store.query_hierarchical_context(
+        # One embedding pass (off the event loop) shared by all three queries
+        query_embedding = (await self.vector_store.aembed([msg.content]))[0]
+        ctx = await self.vector_store.aquery_hierarchical_context(
             agent_type=agent_type,
             task_description=msg.content,
-            n_results=5
+            n_results=5,
+            query_embedding=query_embedding,
         )
 
-        const = self.vector_store.query_constitution(msg.content, n_results=2)
+        const = await self.vector_store.aquery_constitution(
+            msg.content, n_results=2, query_embedding=query_embedding
+        )
 
-        tool_ctx = self.vector_store.get_collection("tool_usage").query(
-            query_texts=[msg.content],
-            n_results=3
+        tool_ctx = await asyncio.to_thread(
+            self.vector_store.get_collection("tool_usage").query,
+            query_embeddings=[query_embedding],
+            n_results=3,
         ) if self.vector_store.has_collection("tool_usage") else None
 
         msg.rag_context = {
@@ -1056,9 +1065,10 @@ class AgentOrchestrator:
         return self.db.query(Agent).filter_by(agentium_id=agent_id, is_active=True).first()
 
     def _get_parent_id(self, agent_id: str) -> str:
-        agent = self._get_agent(agent_id)
-        if agent and agent.parent:
-            return agent.parent.agentium_id
+        agent_hierarchy_index.ensure_loaded()
+        parent_id = agent_hierarchy_index.get_parent_id(agent_id)
+        if parent_id:
+            return parent_id
         tier = HierarchyValidator.get_tier(agent_id)
         parents = {3: "2xxxx", 2: "1xxxx", 1: "00001"}
         return parents.get(tier, "00001")
@@ -1090,22 +1100,10 @@ class AgentOrchestrator:
         return {'0': 'head', '1': 'council', '2': 'lead', '3': 'task'}.get(agent_id[0], 'task')
 
     async def _find_available_task(self, lead_id: str) -> Optional[str]:
-        lead = self._get_agent(lead_id)
-        if not lead:
-            return None
-
-        if token_optimizer.idle_mode_active:
-            for sub in lead.subordinates:
-                if (sub.agent_type == AgentType.TASK_AGENT and
-                        sub.status.value == 'active' and
-                        sub.idle_mode_enabled):
-                    return sub.agentium_id
-
-        for sub in lead.subordinates:
-            if sub.agent_type == AgentType.TASK_AGENT and sub.status.value == 'active':
-                return sub.agentium_id
-
-        return None
+        await agent_hierarchy_index.ensure_loaded_async()
+        return agent_hierarchy_index.find_available_task_agent(
+            lead_id, prefer_idle_mode=token_optimizer.idle_mode_active
+        )
 
     async def _log(self, actor: str, action: str, desc: str, level=AuditLevel.INFO, target=None):
         audit = AuditLog(
@@ -1115,9 +1113,9 @@ class AgentOrchestrator:
             actor_id=actor,
             action=action,
             description=desc,
-            agentium_id=f"L{datetime.utcnow().strftime('%H%M%S')}",
             target_type="agent",
             target_id=target or "",
         )
-        self.db.add(audit)
+        audit_pipeline.submit(audit)
+        # Callers have relied on _log to commit the work that preceded it
         self.db.commit()
\ No newline at end of file
@@ -412,6 +412,11 @@ class AmendmentService:
         )
 
         self.db.commit()
+
+        if result["status"] == "ratified":
+            from backend.core.constitutional_guard import notify_constitution_amended
+            await notify_constitution_amended(result["new_version_number"])
+
         return result
 
     # ------------------------------------------------------------------
@@ -521,6 +526,7 @@ class AmendmentService:
         return {
             "new_constitution_id": new_constitution.id,
             "new_version": new_version,
+            "new_version_number": new_version_number,
             "vector_db_updated": vector_updated,
             "broadcast_sent": broadcast_sent,
         }
@@ -476,6 +476,10 @@ class APIKeyManager:
             
             db_session.commit()
             logger.info(f"🔄 Key rotated: {old_key_id} → {new_key.id}")
+
+            # Cached providers still hold the old key; rebuild on next use
+            from backend.services.provider_registry import provider_registry
+            provider_registry.invalidate([old_key_id, new_key.id], drop_clients=True)
             
             return new_key
         
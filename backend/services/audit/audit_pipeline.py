@@ -0,0 +1,405 @@
+"""
+Audit ingestion pipeline.
+
+Hot paths (agent orchestration, constitutional checks, channel routing,
+critic reviews, chat) used to ``db.add(AuditLog(...))`` and commit inside the
+request transaction, one INSERT per action.  They now hand the entry to
+``audit_pipeline.submit(entry)``, which serializes it and appends it to the
+``audit:ingest`` Redis stream (one XADD, no database round trip).
+
+Batch writers read the stream through the ``audit-writers`` consumer group
+and bulk-insert up to ``AUDIT_BATCH_SIZE`` rows per multi-row INSERT, waiting
+at most ``AUDIT_FLUSH_MS`` for a batch to fill:
+
+  * a writer thread in every API process (``start_consumer``), and
+  * the ``process_audit_batch`` Celery task, which also claims entries left
+    pending by dead consumers.
+
+Entries are acknowledged only after their INSERT commits, so a crash
+between read and write loses nothing: the entry stays pending and is
+claimed again.  Rows carry their own primary key and the INSERT ignores
+conflicts, so a replayed entry is written once.  Entries that keep failing
+(``AUDIT_MAX_DELIVERIES``) move to ``audit:ingest:dead`` instead of blocking
+the stream.
+
+When Redis is unreachable, entries fall back to the in-process batched
+writer (``usage_log_writer``).
+
+``audit_logs`` may be range-partitioned by month (migration
+``008_audit_partitions`` with ``AUDIT_LOG_PARTITIONING=true``);
+``ensure_partitions`` then keeps the upcoming months' partitions in place.
+"""
+
+import enum
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+AUDIT_STREAM = "audit:ingest"
+AUDIT_DEAD_STREAM = "audit:ingest:dead"
+AUDIT_GROUP = "audit-writers"
+
+AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_MS: float = float(os.getenv("AUDIT_FLUSH_MS", "250"))
+AUDIT_CLAIM_IDLE_MS: int = int(os.getenv("AUDIT_CLAIM_IDLE_MS", "60000"))
+AUDIT_MAX_DELIVERIES: int = int(os.getenv("AUDIT_MAX_DELIVERIES", "5"))
+AUDIT_STREAM_MAXLEN: int = int(os.getenv("AUDIT_STREAM_MAXLEN", "1000000"))
+AUDIT_REDIS_RETRY_SECONDS = 30      # Skip Redis this long after it failed
+AUDIT_PARTITION_MONTHS_AHEAD = 2
+
+# (stream entry id, fields)
+_Entry = Tuple[str, Dict[str, str]]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class AuditPipeline:
+    """Redis-stream-backed audit log buffer with batch writers."""
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_ms: float = AUDIT_FLUSH_MS):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_ms) / 1000.0
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._redis = None
+        self._redis_failed_at: Optional[float] = None
+        self._group_ready = False
+        self._lock = threading.Lock()
+        self._consumer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "fallback": 0,
+            "written": 0,
+            "batches": 0,
+            "claimed": 0,
+            "dead_lettered": 0,
+            "errors": 0,
+        }
+
+    # ── Producers ────────────────────────────────────────────────────
+
+    def submit(self, entry: Any) -> None:
+        """
+        Queue an ``AuditLog`` built with ``AuditLog(...)`` / ``AuditLog.log(...)``.
+
+        The entry must not be added to a session.  Never raises: audit
+        trouble must not fail the action being audited.
+        """
+        try:
+            row = self._row_from_entry(entry)
+        except Exception as e:
+            logger.error("Audit entry could not be serialized: %s", e)
+            return
+        self.stats["submitted"] += 1
+
+        client = self._client()
+        if client is not None:
+            try:
+                client.xadd(
+                    AUDIT_STREAM,
+                    {"row": json.dumps(row, default=_json_default)},
+                    maxlen=AUDIT_STREAM_MAXLEN,
+                    approximate=True,
+                )
+                return
+            except Exception as e:
+                self._redis_down(e)
+
+        from backend.models.entities.audit import AuditLog
+        from backend.services.usage_log_writer import usage_log_writer
+
+        self.stats["fallback"] += 1
+        if not usage_log_writer.submit(AuditLog, row):
+            logger.warning("Audit entry dropped (%s by %s)", row.get("action"), row.get("actor_id"))
+
+    @staticmethod
+    def _row_from_entry(entry: Any) -> Dict[str, Any]:
+        from backend.models.entities.audit import AuditLog, AuditLevel
+
+        now = datetime.utcnow()
+        row: Dict[str, Any] = {}
+        for column in AuditLog.__table__.columns:
+            value = getattr(entry, column.key, None)
+            # Several callers hand dicts straight to the Text state columns
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str)
+            row[column.key] = value
+
+        row["id"] = row.get("id") or str(uuid.uuid4())
+        # Callers' time-based ids (e.g. "L" + HHMMSS) collide within a second;
+        # one collision would fail a whole batch, so every row gets its own
+        row["agentium_id"] = f"A{uuid.uuid4().hex[:19]}"
+        row["level"] = row.get("level") or AuditLevel.INFO
+        row["actor_id"] = str(row.get("actor_id") or "unknown")[:100]
+        row["success"] = row.get("success") or "Y"
+        row["created_at"] = row.get("created_at") or now
+        row["updated_at"] = row.get("updated_at") or row["created_at"]
+        row["is_active"] = True if row.get("is_active") is None else row["is_active"]
+        return row
+
+    @staticmethod
+    def _row_from_json(raw: str) -> Dict[str, Any]:
+        from backend.models.entities.audit import AuditLevel, AuditCategory
+
+        row = json.loads(raw)
+        row["level"] = AuditLevel(row["level"])
+        row["category"] = AuditCategory(row["category"])
+        for key in ("created_at", "updated_at", "deleted_at"):
+            if row.get(key):
+                row[key] = datetime.fromisoformat(row[key])
+        return row
+
+    # ── Redis ────────────────────────────────────────────────────────
+
+    def _client(self):
+        if self._redis_failed_at is not None:
+            if time.monotonic() - self._redis_failed_at < AUDIT_REDIS_RETRY_SECONDS:
+                return None
+            self._redis_failed_at = None
+        if self._redis is None:
+            with self._lock:
+                if self._redis is None:
+                    try:
+                        import redis
+                        url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                        self._redis = redis.Redis.from_url(
+                            url, decode_responses=True, socket_connect_timeout=2,
+                        )
+                    except Exception as e:
+                        self._redis_down(e)
+                        return None
+        return self._redis
+
+    def _redis_down(self, exc: Exception) -> None:
+        if self._redis_failed_at is None:
+            logger.warning("Audit stream unavailable, using local buffer: %s", exc)
+        self._redis_failed_at = time.monotonic()
+        self._group_ready = False
+
+    def _ensure_group(self, client) -> None:
+        if self._group_ready:
+            return
+        try:
+            client.xgroup_create(AUDIT_STREAM, AUDIT_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    # ── Batch writer ─────────────────────────────────────────────────
+
+    def process_batch(self, block_ms: Optional[int] = None) -> int:
+        """
+        Read one batch of new entries and write it; returns rows written.
+
+        With *block_ms* the read waits that long for the first entry, then
+        up to ``AUDIT_FLUSH_MS`` for the batch to fill.
+        """
+        client = self._client()
+        if client is None:
+            return 0
+        self._ensure_group(client)
+
+        entries = self._read(client, self.batch_size, block_ms)
+        if entries and block_ms is not None and len(entries) < self.batch_size and self.flush_interval:
+            time.sleep(self.flush_interval)
+            entries += self._read(client, self.batch_size - len(entries), None)
+        return self._write(client, entries)
+
+    def drain(self, max_batches: int = 20) -> int:
+        """Write whatever is queued now (bounded); returns rows written."""
+        written = 0
+        for _ in range(max_batches):
+            count = self.process_batch()
+            written += count
+            if count < self.batch_size:
+                break
+        return written
+
+    def claim_stale(self) -> int:
+        """
+        Take over entries another consumer read but never acknowledged.
+
+        Entries delivered ``AUDIT_MAX_DELIVERIES`` times are moved to the
+        dead-letter stream.  Returns rows written.
+        """
+        client = self._client()
+        if client is None:
+            return 0
+        self._ensure_group(client)
+
+        pending = client.xpending_range(
+            AUDIT_STREAM, AUDIT_GROUP, min="-", max="+",
+            count=self.batch_size, idle=AUDIT_CLAIM_IDLE_MS,
+        )
+        if not pending:
+            return 0
+
+        dead = [p["message_id"] for p in pending if p["times_delivered"] >= AUDIT_MAX_DELIVERIES]
+        retry = [p["message_id"] for p in pending if p["times_delivered"] < AUDIT_MAX_DELIVERIES]
+
+        if dead:
+            for entry_id, fields in client.xclaim(
+                AUDIT_STREAM, AUDIT_GROUP, self.consumer_name, AUDIT_CLAIM_IDLE_MS, dead,
+            ):
+                client.xadd(AUDIT_DEAD_STREAM, fields)
+            client.xack(AUDIT_STREAM, AUDIT_GROUP, *dead)
+            client.xdel(AUDIT_STREAM, *dead)
+            self.stats["dead_lettered"] += len(dead)
+            logger.error("%d audit entries moved to %s after repeated failures", len(dead), AUDIT_DEAD_STREAM)
+
+        if not retry:
+            return 0
+        entries = client.xclaim(
+            AUDIT_STREAM, AUDIT_GROUP, self.consumer_name, AUDIT_CLAIM_IDLE_MS, retry,
+        )
+        self.stats["claimed"] += len(entries)
+        # Row by row: one bad row must not keep the rest of its batch pending
+        return sum(self._write(client, [entry]) for entry in entries)
+
+    def _read(self, client, count: int, block_ms: Optional[int]) -> List[_Entry]:
+        response = client.xreadgroup(
+            AUDIT_GROUP, self.consumer_name, {AUDIT_STREAM: ">"}, count=count, block=block_ms,
+        )
+        return list(response[0][1]) if response else []
+
+    def _write(self, client, entries: Sequence[_Entry]) -> int:
+        if not entries:
+            return 0
+
+        from sqlalchemy.dialects.postgresql import insert
+        from backend.models.database import get_db_context
+        from backend.models.entities.audit import AuditLog
+
+        ids, rows = [], []
+        for entry_id, fields in entries:
+            try:
+                rows.append(self._row_from_json(fields["row"]))
+                ids.append(entry_id)
+            except Exception as e:
+                # Unreadable entries are left pending and dead-lettered later
+                logger.error("Malformed audit entry %s: %s", entry_id, e)
+
+        if rows:
+            try:
+                with get_db_context() as db:
+                    db.execute(insert(AuditLog).on_conflict_do_nothing(), rows)
+            except Exception as e:
+                # Not acknowledged: the entries are retried by claim_stale
+                self.stats["errors"] += 1
+                logger.error("Audit batch of %d rows failed: %s", len(rows), e)
+                return 0
+
+        if ids:
+            client.xack(AUDIT_STREAM, AUDIT_GROUP, *ids)
+            client.xdel(AUDIT_STREAM, *ids)
+        self.stats["batches"] += 1
+        self.stats["written"] += len(rows)
+        try:
+            from backend.services.metrics_counters import metrics_counters
+            metrics_counters.record_audit_actions(row.get("action") for row in rows)
+        except Exception:
+            pass
+        return len(rows)
+
+    # ── Writer thread ────────────────────────────────────────────────
+
+    def start_consumer(self) -> None:
+        """Run a batch writer thread in this process."""
+        if self._consumer is not None and self._consumer.is_alive():
+            return
+        self._stop.clear()
+        self._consumer = threading.Thread(target=self._consume_loop, name="audit-writer", daemon=True)
+        self._consumer.start()
+
+    def stop_consumer(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._consumer is not None:
+            self._consumer.join(timeout)
+            self._consumer = None
+
+    def _consume_loop(self) -> None:
+        block_ms = max(1, int(self.flush_interval * 1000)) * 4
+        while not self._stop.is_set():
+            try:
+                if self._client() is None:
+                    self._stop.wait(AUDIT_REDIS_RETRY_SECONDS)
+                    continue
+                self.process_batch(block_ms=block_ms)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._redis_down(e)
+                self._stop.wait(1.0)
+
+    # ── Partitions ───────────────────────────────────────────────────
+
+    def ensure_partitions(self, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD) -> List[str]:
+        """
+        Create monthly ``audit_logs`` partitions up to *months_ahead*.
+
+        No-op unless ``audit_logs`` is a partitioned table.  Returns the
+        partitions that were created.
+        """
+        from sqlalchemy import text
+        from backend.models.database import get_db_context
+
+        created: List[str] = []
+        with get_db_context() as db:
+            partitioned = db.execute(text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'audit_logs'"
+            )).first()
+            if not partitioned:
+                return created
+
+            today = datetime.utcnow()
+            year, month = today.year, today.month
+            for _ in range(months_ahead + 1):
+                next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+                name = f"audit_logs_{year:04d}_{month:02d}"
+                exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+                if not exists:
+                    db.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF audit_logs "
+                        f"FOR VALUES FROM ('{year:04d}-{month:02d}-01') "
+                        f"TO ('{next_year:04d}-{next_month:02d}-01')"
+                    ))
+                    created.append(name)
+                year, month = next_year, next_month
+        if created:
+            logger.info("Created audit_logs partitions: %s", ", ".join(created))
+        return created
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            **self.stats,
+            "redis_available": self._redis_failed_at is None,
+            "consumer_running": bool(self._consumer and self._consumer.is_alive()),
+        }
+        client = self._client()
+        if client is not None:
+            try:
+                stats["stream_length"] = client.xlen(AUDIT_STREAM)
+            except Exception:
+                pass
+        return stats
+
+
+# Global instance
+audit_pipeline = AuditPipeline()
@@ -268,6 +268,7 @@ class SubTaskBreaker:
                     parent_task_id=task.id,
                     child_task_id=child.id,
                     dependency_order=i,
+                    pending_predecessors=i,  # Every earlier sub-task is still open
                     status="pending",
                 )
                 db.add(dep)
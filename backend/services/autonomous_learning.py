@@ -393,6 +393,7 @@ class AutonomousLearningEngine:
                     fed_coll.upsert(
                         ids=[shared_id],
                         documents=[doc_text],
+                        embeddings=vs.embed([doc_text]),
                         metadatas=[{
                             **meta,
                             "shared_from": "task_patterns",
@@ -43,6 +43,7 @@ from backend.models.entities.channels import ExternalChannel, ExternalMessage, C
 from backend.services.channels.whatsapp_unified import UnifiedWhatsAppAdapter
 from backend.models.entities import Agent, HeadOfCouncil, Task, TaskType, TaskPriority
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
+from backend.services.audit.audit_pipeline import audit_pipeline
 from backend.models.entities.chat_message import ChatMessage, Conversation
 from backend.models.entities.user import User
 from backend.services.model_provider import ModelService
@@ -1019,7 +1020,7 @@ class ChannelManager:
             metrics = circuit_breaker._metrics[channel_id]
             metrics.rate_limit_hits += 1
             
-            AuditLog.log(
+            audit_pipeline.submit(AuditLog.log(
                 level=AuditLevel.WARNING,
                 category=AuditCategory.COMMUNICATION,
                 actor_type="system",
@@ -1028,8 +1029,8 @@ class ChannelManager:
                 target_type="external_channel",
                 target_id=channel_id,
                 description=f"Rate limit exceeded for {channel.channel_type.value}",
-                metadata={'retry_after': retry_after}
-            )
+                meta_data={'retry_after': retry_after}
+            ))
             db.commit()
             
             raise Exception(f"Rate limit exceeded. Retry after {retry_after}s")
@@ -1147,7 +1148,7 @@ class ChannelManager:
             circuit_breaker.record_success(channel_id)
 
             # Audit log
-            AuditLog.log(
+            audit_pipeline.submit(AuditLog.log(
                 level=AuditLevel.INFO,
                 category=AuditCategory.COMMUNICATION,
                 actor_type="system",
@@ -1156,14 +1157,14 @@ class ChannelManager:
                 target_type="external_message",
                 target_id=message.id,
                 description=f"Received {channel.channel_type.value} message from {sender_id}",
-                metadata={
+                meta_data={
                     'channel_type': channel.channel_type.value,
                     'channel_name': channel.name,
                     'sender': sender_id,
                     'has_attachments': len(rich_media.attachments) if rich_media else 0,
                     'rate_limit_status': rate_limiter.get_status(channel_id)
                 }
-            )
+            ))
             db.commit()
 
             # Auto-create task if enabled
@@ -1389,7 +1390,7 @@ class ChannelManager:
                             conversation.last_message_at = datetime.utcnow()
                     # -------------------------------------
                     
-                    AuditLog.log(
+                    audit_pipeline.submit(AuditLog.log(
                         level=AuditLevel.INFO,
                         category=AuditCategory.COMMUNICATION,
                         actor_type="agent",
@@ -1398,14 +1399,14 @@ class ChannelManager:
                         target_type="external_message",
                         target_id=message_id,
                         description=f"Response sent via {channel.channel_type.value}",
-                        metadata={
+                        meta_data={
                             'channel': channel.name,
                             'recipient': message.sender_id,
                             'response_length': len(response_content),
                             'rich_media': rich_media is not None,
                             'retry_count': retry_count
                         }
-                    )
+                    ))
                     db.commit()
                     break
 
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from backend.models.entities import Agent, HeadOfCouncil, Task, TaskPriority, TaskType, UserModelConfig
 from backend.models.entities.agents import AgentType
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
+from backend.services.audit.audit_pipeline import audit_pipeline
 from backend.services.context_manager import context_manager
 from backend.services.reincarnation_service import reincarnation_service
 from backend.services.clarification_service import clarification_service
@@ -491,11 +492,11 @@ Progress: {task_progress or 'N/A'}%"""
             description="Head of Council responded to Sovereign",
             before_state={"prompt": prompt[:500]},
             after_state={"response": response[:1000]},
-            metadata={
+            meta_data={
                 "config_id": config_id,
                 "full_prompt_length": len(prompt),
                 "full_response_length": len(response)
             }
         )
-        db.add(log)
+        audit_pipeline.submit(log)
         db.commit()
\ No newline at end of file
@@ -32,6 +32,7 @@ from backend.models.entities.critics import (
 )
 from backend.models.entities.task import Task, TaskStatus
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
+from backend.services.audit.audit_pipeline import audit_pipeline
 from backend.services.acceptance_criteria import (
     AcceptanceCriteriaService, AcceptanceCriterion, CriterionResult
 )
@@ -767,7 +768,7 @@ Respond ONLY with a JSON object — no markdown, no preamble:
             ),
             created_at=datetime.utcnow(),
         )
-        db.add(audit)
+        audit_pipeline.submit(audit)
 
     # -------------------------------------------------------------------------
     # Statistics
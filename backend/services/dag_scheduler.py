@@ -0,0 +1,262 @@
+"""
+Dependency Scheduler - event-driven dispatch of sub-task DAGs.
+
+A ``TaskDependency`` child may start once every sibling with a lower
+``dependency_order`` (same parent) has completed.  Instead of re-checking
+every pending dependency on a timer, each row carries
+``pending_predecessors`` - the number of lower-order siblings still open:
+
+  * rows are created with their counter set (``SubTaskBreaker``),
+  * when a child task reaches a releasing state
+    (``TaskStateMachine.DEPENDENCY_RELEASING_STATES``) its dependency row is
+    marked completed and the counters of its higher-order siblings are
+    decremented in one UPDATE,
+  * children whose counter reaches zero are claimed and dispatched at once.
+
+Task and dependency changes are picked up by mapper hooks
+(``models/entities/task.py``) and handed to the
+``advance_dependency_graph`` Celery task after commit.  Every transition is
+a conditional UPDATE, so replays and concurrent workers cannot dispatch a
+child twice.  ``sweep`` recomputes all counters in set-based SQL and is
+run by ``process_dependency_graph`` as a low-frequency safety net.
+"""
+
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from backend.models.entities.task import Task, TaskDependency, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+DAG_EVENT_QUEUE_SIZE = 10000
+
+# (child agentium_id, assigned agent agentium_id or None)
+DispatchedChild = Tuple[str, Any]
+
+
+class DependencyScheduler:
+    """Counter-based readiness tracking for TaskDependency DAGs."""
+
+    def __init__(self):
+        self.stats: Dict[str, int] = {
+            "released": 0, "dispatched": 0, "sweeps": 0, "sweep_dispatched": 0,
+            "events_dropped": 0, "events_failed": 0,
+        }
+        # Committed events are sent to Celery from a daemon thread so a slow
+        # or unreachable broker never blocks the committing request.
+        self._events: "queue.Queue[Tuple[List[str], List[str]]]" = queue.Queue(maxsize=DAG_EVENT_QUEUE_SIZE)
+        self._sender: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
+
+    @staticmethod
+    def _releasing_states() -> List[TaskStatus]:
+        from backend.services.task_state_machine import TaskStateMachine
+        return list(TaskStateMachine.DEPENDENCY_RELEASING_STATES)
+
+    # ── Events ───────────────────────────────────────────────────────
+
+    def release(self, db: Session, task_ids: Iterable[str]) -> List[str]:
+        """
+        Mark the dependencies of finished *task_ids* completed and decrement
+        their later siblings.  Returns the child ids that became ready.
+        """
+        task_ids = list(set(task_ids))
+        if not task_ids:
+            return []
+
+        # Only rows that actually change state release their siblings, so a
+        # replayed event cannot decrement twice
+        released = db.execute(
+            update(TaskDependency)
+            .where(
+                TaskDependency.child_task_id.in_(task_ids),
+                TaskDependency.status != "completed",
+            )
+            .values(status="completed")
+            .returning(TaskDependency.parent_task_id, TaskDependency.dependency_order)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.stats["released"] += len(released)
+
+        ready: List[str] = []
+        for parent_id, order in released:
+            rows = db.execute(
+                update(TaskDependency)
+                .where(
+                    TaskDependency.parent_task_id == parent_id,
+                    TaskDependency.dependency_order > order,
+                    TaskDependency.status == "pending",
+                    TaskDependency.pending_predecessors > 0,
+                )
+                .values(pending_predecessors=TaskDependency.pending_predecessors - 1)
+                .returning(TaskDependency.child_task_id, TaskDependency.pending_predecessors)
+                .execution_options(synchronize_session=False)
+            ).all()
+            ready.extend(child_id for child_id, remaining in rows if remaining == 0)
+        return ready
+
+    def dispatch(self, db: Session, child_ids: Iterable[str]) -> List[DispatchedChild]:
+        """
+        Claim ready, still-pending children and mark them IN_PROGRESS.
+
+        The caller queues the returned tasks for execution after committing.
+        """
+        child_ids = list(set(child_ids))
+        if not child_ids:
+            return []
+
+        pending_children = select(Task.id).where(
+            Task.id.in_(child_ids),
+            Task.is_active == True,
+            Task.status == TaskStatus.PENDING,
+        )
+        claimed = db.execute(
+            update(TaskDependency)
+            .where(
+                TaskDependency.child_task_id.in_(pending_children),
+                TaskDependency.status == "pending",
+            )
+            .values(status="dispatched")
+            .returning(TaskDependency.child_task_id, TaskDependency.parent_task_id,
+                       TaskDependency.dependency_order)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not claimed:
+            return []
+
+        children = db.query(Task).filter(Task.id.in_({row[0] for row in claimed})).all()
+        now = datetime.utcnow()
+        for child in children:
+            child.status = TaskStatus.IN_PROGRESS
+            child.started_at = now
+
+        orders = {child_id: (parent_id, order) for child_id, parent_id, order in claimed}
+        dispatched: List[DispatchedChild] = []
+        for child in children:
+            parent_id, order = orders[child.id]
+            agent_id = getattr(child, 'assigned_agent_id', None)
+            if agent_id:
+                logger.info(
+                    f"📊 DAG: dispatched child task {child.agentium_id} "
+                    f"(order={order}) for parent {parent_id}"
+                )
+            else:
+                logger.warning(
+                    f"📊 DAG: child task {child.agentium_id} has no assigned_agent_id "
+                    f"— marked IN_PROGRESS but not queued for execution"
+                )
+            dispatched.append((child.agentium_id, agent_id))
+
+        self.stats["dispatched"] += len(dispatched)
+        return dispatched
+
+    def advance(self, db: Session, finished_ids: Iterable[str], ready_ids: Iterable[str]) -> List[DispatchedChild]:
+        """Apply finished tasks and newly created ready rows in one go."""
+        ready = self.release(db, finished_ids)
+        return self.dispatch(db, [*ready, *ready_ids])
+
+    # ── Event hand-off (after-commit hook) ───────────────────────────
+
+    def queue_events(self, finished_ids: Iterable[str], ready_ids: Iterable[str]) -> None:
+        """Queue committed events for ``advance_dependency_graph``; never blocks."""
+        self._ensure_sender()
+        try:
+            self._events.put_nowait((list(finished_ids), list(ready_ids)))
+        except queue.Full:
+            self.stats["events_dropped"] += 1  # The sweep picks these up
+
+    def _ensure_sender(self) -> None:
+        if self._sender is not None:
+            return
+        with self._sender_lock:
+            if self._sender is not None:
+                return
+            self._sender = threading.Thread(target=self._send_loop, name="dag-event-sender", daemon=True)
+            self._sender.start()
+
+    def _send_loop(self) -> None:
+        while True:
+            finished, ready = self._events.get()
+            # Coalesce everything queued meanwhile into one Celery message
+            while True:
+                try:
+                    more_finished, more_ready = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                finished.extend(more_finished)
+                ready.extend(more_ready)
+            try:
+                from backend.services.tasks.task_executor import advance_dependency_graph
+                advance_dependency_graph.delay(sorted(set(finished)), sorted(set(ready)))
+            except Exception as e:
+                self.stats["events_failed"] += 1
+                logger.warning(f"DAG event hand-off failed, left to the sweep: {e}")
+
+    # ── Safety net ───────────────────────────────────────────────────
+
+    def sweep(self, db: Session) -> Dict[str, Any]:
+        """
+        Reconcile the whole graph in set-based SQL: release dependencies of
+        finished children, recompute every pending counter, then dispatch
+        whatever is ready.  Covers lost events and rows created without a
+        counter.
+        """
+        finished = db.execute(
+            update(TaskDependency)
+            .where(
+                TaskDependency.status != "completed",
+                TaskDependency.child_task_id.in_(
+                    select(Task.id).where(Task.status.in_(self._releasing_states()))
+                ),
+            )
+            .values(status="completed")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        sibling = aliased(TaskDependency)
+        open_predecessors = (
+            select(func.count(sibling.id))
+            .where(
+                sibling.parent_task_id == TaskDependency.parent_task_id,
+                sibling.dependency_order < TaskDependency.dependency_order,
+                sibling.status != "completed",
+            )
+            .scalar_subquery()
+        )
+        db.execute(
+            update(TaskDependency)
+            .where(TaskDependency.status == "pending")
+            .values(pending_predecessors=open_predecessors)
+            .execution_options(synchronize_session=False)
+        )
+
+        ready = db.execute(
+            select(TaskDependency.child_task_id)
+            .join(Task, Task.id == TaskDependency.child_task_id)
+            .where(and_(
+                TaskDependency.status == "pending",
+                TaskDependency.pending_predecessors == 0,
+                Task.is_active == True,
+                Task.status == TaskStatus.PENDING,
+            ))
+        ).scalars().all()
+
+        dispatched = self.dispatch(db, ready)
+        self.stats["sweeps"] += 1
+        self.stats["sweep_dispatched"] += len(dispatched)
+        if dispatched:
+            logger.warning(f"📊 DAG sweep dispatched {len(dispatched)} children missed by the event path")
+        return {"released": finished, "dispatched": dispatched}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+# Global instance
+dependency_scheduler = DependencyScheduler()
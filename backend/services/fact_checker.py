@@ -159,10 +159,13 @@ class FactChecker:
             "council_memory",
         ]
 
+        claim_embeddings: Optional[List[List[float]]] = None
         for coll_key in target_collections:
             try:
                 coll = self._vs.get_collection(coll_key)
-                results = coll.query(query_texts=[claim], n_results=3)
+                if claim_embeddings is None:
+                    claim_embeddings = self._vs.embed([claim])
+                results = coll.query(query_embeddings=claim_embeddings, n_results=3)
 
                 if not results.get("documents") or not results["documents"][0]:
                     continue
@@ -273,10 +276,13 @@ class FactChecker:
             r"\bprohibit\b", r"\bforbid\b", r"\bban\b",
         ]
 
+        claim_embeddings: Optional[List[List[float]]] = None
         for coll_key in target_collections:
             try:
                 coll = self._vs.get_collection(coll_key)
-                results = coll.query(query_texts=[claim], n_results=5)
+                if claim_embeddings is None:
+                    claim_embeddings = self._vs.embed([claim])
+                results = coll.query(query_embeddings=claim_embeddings, n_results=5)
 
                 if not results.get("documents") or not results["documents"][0]:
                     continue
@@ -422,11 +428,16 @@ class FactChecker:
 
         # Build edges via cross-document similarity
         EDGE_THRESHOLD = 0.6
-        for doc_info in all_docs:
+        try:
+            doc_embeddings = self._vs.embed([d["text"][:500] for d in all_docs]) if all_docs else []
+        except Exception as exc:
+            logger.debug("Citation graph: embedding failed, no edges built: %s", exc)
+            return graph
+        for doc_info, doc_embedding in zip(all_docs, doc_embeddings):
             for coll_key in target:
                 try:
                     coll = self._vs.get_collection(coll_key)
-                    results = coll.query(query_texts=[doc_info["text"][:500]], n_results=3)
+                    results = coll.query(query_embeddings=[doc_embedding], n_results=3)
                     if not results.get("ids") or not results["ids"][0]:
                         continue
                     for j, related_id in enumerate(results["ids"][0]):
@@ -420,6 +420,7 @@ class KnowledgeGovernanceService:
         doc_id = f"{submission.category.value}_{submission.id}"
         collection.add(
             documents=[submission.content],
+            embeddings=await self.vector_store.aembed([submission.content]),
             metadatas=[{
                 "submission_id": submission.id,
                 "submitter": submission.submitter_agentium_id,
@@ -429,6 +430,7 @@ class KnowledgeGovernanceService:
             }],
             ids=[doc_id]
         )
+        self.vector_store.bump_knowledge_version()
     
     async def _notify_council(self, submission: KnowledgeSubmission):
         """Notify Council members of new submission."""
@@ -3,10 +3,15 @@ Knowledge Service for Agentium.
 RAG pipeline and semantic memory management.
 """
 
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -20,6 +25,40 @@ logger = logging.getLogger(__name__)
 # Similarity distance below which an entry is considered a duplicate
 _DEFAULT_SIMILARITY_THRESHOLD: float = 0.15
 
+# get_agent_context: latency budget for vector retrieval, and the cache of
+# assembled contexts (keyed by the knowledge version, so writes invalidate)
+AGENT_CONTEXT_BUDGET_MS: float = float(os.getenv("AGENT_CONTEXT_BUDGET_MS", "1500"))
+AGENT_CONTEXT_CACHE_TTL_SECONDS: float = float(os.getenv("AGENT_CONTEXT_CACHE_TTL_SECONDS", "30"))
+AGENT_CONTEXT_CACHE_SIZE: int = int(os.getenv("AGENT_CONTEXT_CACHE_SIZE", "512"))
+
+
+class _TierQuery(NamedTuple):
+    """Tier-specific retrieval for get_agent_context."""
+    collection: str
+    default_query: str      # Used when there is no task description
+    n_results: int
+    where: Optional[Dict[str, Any]]
+    keep: int               # Segments kept out of n_results
+    segment_type: str
+    relevance: float
+    metadata_field: str
+
+
+_TIER_QUERIES: Dict[AgentType, _TierQuery] = {
+    AgentType.COUNCIL_MEMBER: _TierQuery(
+        "council_memory", "recent deliberations precedent", 3, None, 2,
+        "precedent", 0.9, "source",
+    ),
+    AgentType.LEAD_AGENT: _TierQuery(
+        "task_patterns", "team coordination", 3, None, 2,
+        "coordination_pattern", 0.85, "metadata",
+    ),
+    AgentType.TASK_AGENT: _TierQuery(
+        "task_patterns", "execution best practices", 4, {"type": "execution_pattern"}, 3,
+        "execution_pattern", 0.8, "metadata",
+    ),
+}
+
 
 class KnowledgeService:
     """
@@ -30,6 +69,11 @@ class KnowledgeService:
 
     def __init__(self, vector_store: Optional[VectorStore] = None) -> None:
         self.vector_store: VectorStore = vector_store or get_vector_store()
+        # (tier, include_constitution, task hash, knowledge version)
+        #   -> (expires_at, (grounding, retrieved))
+        self._context_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Tuple[List, List]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"cache_hits": 0, "cache_misses": 0, "partial": 0}
 
     # ------------------------------------------------------------------
     # Embedding
@@ -104,7 +148,10 @@ class KnowledgeService:
         """
         Build RAG context for an agent based on its tier.
 
-        Returns a structured dict ready for LLM prompt injection.
+        Returns a structured dict ready for LLM prompt injection.  The
+        vector retrieval is bounded by ``AGENT_CONTEXT_BUDGET_MS``; when a
+        collection misses the deadline the context is built from the
+        others and ``partial`` is set.
         """
         context: Dict[str, Any] = {
             "agent_tier": agent.agent_type.value,
@@ -113,32 +160,13 @@ class KnowledgeService:
             "knowledge_segments": [],
         }
 
-        query_text: str = task_description or agent.agent_type.value
+        grounding, retrieved, partial = self._retrieve_context(
+            agent.agent_type, task_description, include_constitution
+        )
+        context["partial"] = partial
 
         # 1. Constitution grounding (all tiers)
-        if include_constitution:
-            const_results = self.vector_store.query_constitution(
-                query_text, n_results=3
-            )
-            if const_results["documents"] and const_results["documents"][0]:
-                for i, doc in enumerate(const_results["documents"][0]):
-                    distance = (
-                        const_results["distances"][0][i]
-                        if const_results.get("distances")
-                        else 0.5
-                    )
-                    context["knowledge_segments"].append(
-                        {
-                            "type": "constitution",
-                            "content": doc,
-                            "relevance": max(0.0, 1.0 - distance),
-                            "source": (
-                                const_results["metadatas"][0][i]
-                                if const_results.get("metadatas")
-                                else {}
-                            ),
-                        }
-                    )
+        context["knowledge_segments"].extend(grounding)
 
         # 2. Agent's own Ethos (from DB object — avoids redundant vector query)
         if agent.ethos:
@@ -158,121 +186,181 @@ class KnowledgeService:
                 }
             )
 
-        # 3. Tier-specific knowledge
-        if agent.agent_type == AgentType.COUNCIL_MEMBER:
-            council_ctx = self.vector_store.query_knowledge(
-                query=task_description or "recent deliberations precedent",
-                collection_keys=["council_memory"],
-                n_results=3,
-            )
-            if council_ctx["documents"] and council_ctx["documents"][0]:
-                for i, doc in enumerate(council_ctx["documents"][0][:2]):
-                    context["knowledge_segments"].append(
-                        {
-                            "type": "precedent",
-                            "content": doc,
-                            "relevance": 0.9,
-                            "source": (
-                                council_ctx["metadatas"][0][i]
-                                if council_ctx.get("metadatas")
-                                else {}
-                            ),
-                        }
-                    )
+        # 3-5. Tier-specific knowledge, critic case law, sovereign preferences
+        context["knowledge_segments"].extend(retrieved)
+        return context
 
-        elif agent.agent_type == AgentType.LEAD_AGENT:
-            # FIX: use canonical key "task_patterns"
-            patterns = self.vector_store.get_collection("task_patterns").query(
-                query_texts=[task_description or "team coordination"],
-                n_results=3,
-            )
-            if patterns["documents"] and patterns["documents"][0]:
-                for i, doc in enumerate(patterns["documents"][0][:2]):
-                    context["knowledge_segments"].append(
-                        {
-                            "type": "coordination_pattern",
-                            "content": doc,
-                            "relevance": 0.85,
-                            "metadata": (
-                                patterns["metadatas"][0][i]
-                                if patterns.get("metadatas")
-                                else {}
-                            ),
-                        }
-                    )
+    def _retrieve_context(
+        self,
+        agent_type: AgentType,
+        task_description: Optional[str],
+        include_constitution: bool,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], bool]:
+        """
+        Vector-retrieved segments for :meth:`get_agent_context`.
 
-        elif agent.agent_type == AgentType.TASK_AGENT:
-            # FIX: use canonical key "task_patterns"
-            patterns = self.vector_store.get_collection("task_patterns").query(
-                query_texts=[task_description or "execution best practices"],
-                n_results=4,
-                where={"type": "execution_pattern"},
-            )
-            if patterns["documents"] and patterns["documents"][0]:
-                for i, doc in enumerate(patterns["documents"][0][:3]):
-                    context["knowledge_segments"].append(
+        Returns ``(grounding, retrieved, partial)``.  Every query text is
+        embedded in one pass and all collections are queried concurrently
+        under one deadline.  Complete results are cached for
+        ``AGENT_CONTEXT_CACHE_TTL_SECONDS`` per (tier, normalized task,
+        knowledge version).
+        """
+        deadline = time.monotonic() + AGENT_CONTEXT_BUDGET_MS / 1000.0
+        normalized = " ".join((task_description or "").lower().split())
+        cache_key = (
+            agent_type.value,
+            include_constitution,
+            hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+            self.vector_store.knowledge_version(),
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            grounding, retrieved = cached
+            return [dict(s) for s in grounding], [dict(s) for s in retrieved], False
+        self.stats["cache_misses"] += 1
+
+        query_text: str = task_description or agent_type.value
+        tier_query = _TIER_QUERIES.get(agent_type)
+        texts = [query_text]
+        if tier_query and not task_description:
+            texts.append(tier_query.default_query)
+        embeddings = self.vector_store.embed(texts)
+
+        specs: Dict[str, Dict[str, Any]] = {}
+        if include_constitution:
+            specs["constitution"] = {
+                "n_results": 3,
+                "where": {"document_type": "supreme_law"},
+            }
+        if tier_query:
+            specs[tier_query.collection] = {
+                "n_results": tier_query.n_results,
+                "where": tier_query.where,
+                "query_embeddings": [embeddings[-1]],
+            }
+        for key in ("critic_case_law", "sovereign_prefs"):
+            # critic_case_law may not exist yet on fresh deploy
+            if key in self.vector_store.COLLECTIONS:
+                specs[key] = {"n_results": 2, "where": None}
+
+        results = self.vector_store.query_many(
+            [embeddings[0]], specs, timeout=deadline - time.monotonic()
+        )
+        partial = len(results) < len(specs)
+
+        grounding: List[Dict[str, Any]] = []
+        retrieved: List[Dict[str, Any]] = []
+
+        # Constitution grounding
+        const_results = results.get("constitution")
+        if const_results and const_results["documents"] and const_results["documents"][0]:
+            for i, doc in enumerate(const_results["documents"][0]):
+                distance = (
+                    const_results["distances"][0][i]
+                    if const_results.get("distances")
+                    else 0.5
+                )
+                grounding.append(
+                    {
+                        "type": "constitution",
+                        "content": doc,
+                        "relevance": max(0.0, 1.0 - distance),
+                        "source": (
+                            const_results["metadatas"][0][i]
+                            if const_results.get("metadatas")
+                            else {}
+                        ),
+                    }
+                )
+
+        # Tier-specific knowledge
+        tier_results = results.get(tier_query.collection) if tier_query else None
+        if tier_results and tier_results["documents"] and tier_results["documents"][0]:
+            for i, doc in enumerate(tier_results["documents"][0][:tier_query.keep]):
+                retrieved.append(
+                    {
+                        "type": tier_query.segment_type,
+                        "content": doc,
+                        "relevance": tier_query.relevance,
+                        tier_query.metadata_field: (
+                            tier_results["metadatas"][0][i]
+                            if tier_results.get("metadatas")
+                            else {}
+                        ),
+                    }
+                )
+
+        # Critic Case Law (historical failures to avoid)
+        case_law = results.get("critic_case_law")
+        if case_law and case_law.get("documents") and case_law["documents"][0]:
+            for i, doc in enumerate(case_law["documents"][0]):
+                distance = case_law["distances"][0][i] if case_law.get("distances") else 0.5
+                # Only include highly relevant case law to avoid polluting context
+                if distance < 0.4:
+                    retrieved.append(
                         {
-                            "type": "execution_pattern",
+                            "type": "case_law_warning",
                             "content": doc,
-                            "relevance": 0.8,
+                            "relevance": max(0.0, 1.0 - distance),
                             "metadata": (
-                                patterns["metadatas"][0][i]
-                                if patterns.get("metadatas")
+                                case_law["metadatas"][0][i]
+                                if case_law.get("metadatas")
                                 else {}
                             ),
                         }
                     )
 
-        # 4. Critic Case Law (historical failures to avoid)
-        try:
-            case_law = self.vector_store.get_collection("critic_case_law").query(
-                query_texts=[query_text],
-                n_results=2,
-            )
-            if case_law.get("documents") and case_law["documents"][0]:
-                for i, doc in enumerate(case_law["documents"][0]):
-                    distance = case_law["distances"][0][i] if case_law.get("distances") else 0.5
-                    # Only include highly relevant case law to avoid polluting context
-                    if distance < 0.4:  
-                        context["knowledge_segments"].append(
-                            {
-                                "type": "case_law_warning",
-                                "content": doc,
-                                "relevance": max(0.0, 1.0 - distance),
-                                "metadata": (
-                                    case_law["metadatas"][0][i]
-                                    if case_law.get("metadatas")
-                                    else {}
-                                ),
-                            }
-                        )
-        except ValueError:
-            # Collection may not exist yet on fresh deploy
-            pass
-
-        # 5. Sovereign preferences (all tiers)
-        try:
-            prefs = self.vector_store.get_collection("sovereign_prefs").query(
-                query_texts=[query_text],
-                n_results=2,
+        # Sovereign preferences (all tiers)
+        prefs = results.get("sovereign_prefs")
+        if prefs and prefs.get("documents") and prefs["documents"][0]:
+            retrieved.append(
+                {
+                    "type": "sovereign_preference",
+                    "content": prefs["documents"][0][0],
+                    "relevance": 0.95,
+                    "source": (
+                        prefs["metadatas"][0][0]
+                        if prefs.get("metadatas")
+                        else {}
+                    ),
+                }
             )
-            if prefs.get("documents") and prefs["documents"][0]:
-                context["knowledge_segments"].append(
-                    {
-                        "type": "sovereign_preference",
-                        "content": prefs["documents"][0][0],
-                        "relevance": 0.95,
-                        "source": (
-                            prefs["metadatas"][0][0]
-                            if prefs.get("metadatas")
-                            else {}
-                        ),
-                    }
-                )
-        except ValueError:
-            pass
 
-        return context
+        if partial:
+            # Never cache a context that is missing collections
+            self.stats["partial"] += 1
+        else:
+            self._cache_put(cache_key, (grounding, retrieved))
+            grounding = [dict(s) for s in grounding]
+            retrieved = [dict(s) for s in retrieved]
+        return grounding, retrieved, partial
+
+    def _cache_get(self, key: Tuple[Any, ...]) -> Optional[Tuple[List, List]]:
+        with self._cache_lock:
+            entry = self._context_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._context_cache[key]
+                return None
+            self._context_cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: Tuple[Any, ...], value: Tuple[List, List]) -> None:
+        if AGENT_CONTEXT_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._cache_lock:
+            self._context_cache[key] = (time.monotonic() + AGENT_CONTEXT_CACHE_TTL_SECONDS, value)
+            self._context_cache.move_to_end(key)
+            while len(self._context_cache) > AGENT_CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            cached = len(self._context_cache)
+        return {**self.stats, "cached_contexts": cached}
 
     # ------------------------------------------------------------------
     # Knowledge storage
@@ -311,8 +399,9 @@ class KnowledgeService:
 
         # Step 1: search for semantically similar entries
         # FIX: exception is now logged instead of silently swallowed
+        embeddings = self.vector_store.embed([content])
         try:
-            existing = collection.query(query_texts=[content], n_results=1)
+            existing = collection.query(query_embeddings=embeddings, n_results=1)
 
             if (
                 existing.get("ids")
@@ -340,9 +429,11 @@ class KnowledgeService:
                 collection.delete(ids=[existing_id])
                 collection.add(
                     documents=[content],
+                    embeddings=embeddings,
                     metadatas=[merged_metadata],
                     ids=[existing_id],
                 )
+                self.vector_store.bump_knowledge_version()
                 return {
                     "action": "revised",
                     "doc_id": existing_id,
@@ -365,9 +456,11 @@ class KnowledgeService:
         }
         collection.add(
             documents=[content],
+            embeddings=embeddings,
             metadatas=[final_metadata],
             ids=[doc_id],
         )
+        self.vector_store.bump_knowledge_version()
         return {"action": "created", "doc_id": doc_id}
 
     def record_execution_pattern(
@@ -6,6 +6,8 @@ Enforces: Task(3xxxx) -> Lead(2xxxx) -> Council(1xxxx) -> Head(0xxxx)
 
 import os
 import json
+import socket
+import time
 import asyncio
 import fnmatch
 import redis.asyncio as redis
@@ -14,17 +16,67 @@ from datetime import datetime
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 
-from backend.models.schemas.messages import AgentMessage, MessageReceipt, RouteResult
+from backend.models.schemas.messages import AgentMessage, MessageReceipt, RouteResult, BroadcastResult
 from backend.core.vector_store import vector_store, get_vector_store
+from backend.services.agent_hierarchy_index import agent_hierarchy_index
+
+# Consumer-group tuning for agent inboxes
+DLQ_MAX_FAILURES = 3                 # Entries failing more often go to the DLQ
+PENDING_RECLAIM_IDLE_MS = 60_000     # Reclaim entries a dead consumer held this long
+MAX_TRACKED_DELIVERIES = 10_000      # message_id -> stream entry id map for XACK
+
+# Pub/Sub dispatcher tuning
+PUBSUB_PATTERN = "channel:*"         # One pattern subscription per process
+SUBSCRIBER_QUEUE_SIZE = 100          # Pending notifications per subscribed agent
+PUBSUB_LATE_THRESHOLD_MS = 1_000     # Deliveries slower than this count as late
+
+
+# Broadcast fan-out tuning
+BROADCAST_TIERS = ('1', '2', '3')    # Council, Lead, Task
+BROADCAST_CHUNK_SIZE = 250           # XADDs per pipeline round trip
+BROADCAST_STREAM_KEY = "agent:broadcast:stream"
+BROADCAST_STREAM_MAXLEN = 1000
+
+# Rate limiting tuning
+RATE_LIMIT_DENY_CACHE_MS = 50        # Reject locally (no Redis call) while a bucket is empty
+MAX_LOCAL_BUCKETS = 10_000           # Bound on the in-memory fallback buckets
+
+# Atomic token bucket: KEYS[1]=bucket key, ARGV[1]=refill rate (tokens/sec),
+# ARGV[2]=burst capacity.  Returns {allowed (0/1), retry_after_ms}.
+TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local allowed = 0
+local retry_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, retry_ms}
+"""
 
 
 @dataclass
 class RateLimitConfig:
-    """Rate limiting per agent tier."""
+    """Rate limiting per agent tier (refill rate in msg/sec plus burst capacity)."""
     HEAD: int = 100     # 0xxxx - Unlimited practically
     COUNCIL: int = 20   # 1xxxx - 20 msg/sec
     LEAD: int = 10      # 2xxxx - 10 msg/sec
     TASK: int = 5       # 3xxxx - 5 msg/sec
+    HEAD_BURST: int = 200
+    COUNCIL_BURST: int = 40
+    LEAD_BURST: int = 20
+    TASK_BURST: int = 10
 
 
 class HierarchyValidator:
@@ -288,47 +340,107 @@ class MessageBus:
         self._pubsub: Optional[redis.client.PubSub] = None
         self._subscribers: Dict[str, Set[Callable]] = {}
         self._rate_limits: RateLimitConfig = RateLimitConfig()
-        self._last_message_time: Dict[str, float] = {}
+        self._token_bucket = None  # Registered Lua script (EVALSHA)
+        # agent_id -> monotonic deadline; rejects locally while a bucket is empty
+        self._rate_denied_until: Dict[str, float] = {}
+        # In-memory fallback buckets when Redis is unreachable: agent_id -> (tokens, ts)
+        self._local_buckets: Dict[str, tuple] = {}
         self._running = False
+        # Consumer groups already created by this process
+        self._groups_ready: Set[str] = set()
+        # (recipient_id, message_id) -> stream entry id, for XACK on acknowledge()
+        self._delivered: Dict[tuple, str] = {}
+        self._consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        # Multiplexed Pub/Sub: one reader task, bounded queue + worker per agent
+        self._reader_task: Optional[asyncio.Task] = None
+        self._reader_lock = asyncio.Lock()
+        self._agent_queues: Dict[str, asyncio.Queue] = {}
+        self._agent_workers: Dict[str, asyncio.Task] = {}
+        self._pubsub_stats: Dict[str, int] = {
+            'received': 0, 'dispatched': 0, 'dropped': 0, 'late': 0, 'undecodable': 0,
+        }
     
     async def connect(self, redis_url: Optional[str] = None):
         """Initialize Redis connection."""
         url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self._redis = await redis.from_url(url, decode_responses=True)
         self._pubsub = self._redis.pubsub()
+        self._token_bucket = self._redis.register_script(TOKEN_BUCKET_LUA)
         self._running = True
         print(f"MessageBus connected to {url}")
     
     async def disconnect(self):
         """Cleanup Redis connections."""
         self._running = False
+        for task in [self._reader_task, *self._agent_workers.values()]:
+            if task:
+                task.cancel()
+        self._reader_task = None
+        self._agent_workers.clear()
+        self._agent_queues.clear()
         if self._pubsub:
             await self._pubsub.close()
         if self._redis:
             await self._redis.close()
     
-    def _get_rate_limit(self, agent_id: str) -> int:
-        """Get rate limit for agent tier."""
+    def _get_rate_limit(self, agent_id: str) -> tuple:
+        """Get (refill rate, burst capacity) for agent tier."""
         tier = agent_id[0] if agent_id else "3"
         limiter = {
-            '0': self._rate_limits.HEAD,
-            '1': self._rate_limits.COUNCIL,
-            '2': self._rate_limits.LEAD,
-            '3': self._rate_limits.TASK,
+            '0': (self._rate_limits.HEAD, self._rate_limits.HEAD_BURST),
+            '1': (self._rate_limits.COUNCIL, self._rate_limits.COUNCIL_BURST),
+            '2': (self._rate_limits.LEAD, self._rate_limits.LEAD_BURST),
+            '3': (self._rate_limits.TASK, self._rate_limits.TASK_BURST),
         }
-        return limiter.get(tier, 5)
+        return limiter.get(tier, (self._rate_limits.TASK, self._rate_limits.TASK_BURST))
     
     async def _check_rate_limit(self, agent_id: str) -> bool:
-        """Check if agent has exceeded rate limit."""
-        now = datetime.utcnow().timestamp()
-        last_time = self._last_message_time.get(agent_id, 0)
-        limit = self._get_rate_limit(agent_id)
-        
-        if now - last_time < (1.0 / limit):
+        """
+        Check if agent has exceeded rate limit.
+
+        Uses a token bucket shared by every worker (one atomic EVALSHA per
+        publish).  While a bucket is known to be empty the rejection is
+        answered locally without a Redis call; if Redis is unreachable a
+        per-process bucket is used instead.
+        """
+        now = time.monotonic()
+        denied_until = self._rate_denied_until.get(agent_id)
+        if denied_until is not None:
+            if now < denied_until:
+                return False
+            del self._rate_denied_until[agent_id]
+
+        rate, burst = self._get_rate_limit(agent_id)
+        try:
+            allowed, retry_ms = await self._token_bucket(
+                keys=[f"ratelimit:agent:{agent_id}"], args=[rate, burst]
+            )
+        except Exception as e:
+            print(f"[MessageBus] Rate limit Redis error, using local bucket: {e}")
+            return self._check_local_bucket(agent_id, rate, burst, now)
+
+        if not int(allowed):
+            wait_ms = min(int(retry_ms), RATE_LIMIT_DENY_CACHE_MS)
+            if len(self._rate_denied_until) >= MAX_LOCAL_BUCKETS:
+                self._rate_denied_until = {
+                    k: v for k, v in self._rate_denied_until.items() if v > now
+                }
+            self._rate_denied_until[agent_id] = now + wait_ms / 1000.0
             return False
-        
-        self._last_message_time[agent_id] = now
         return True
+
+    def _check_local_bucket(self, agent_id: str, rate: int, burst: int, now: float) -> bool:
+        """In-memory token bucket used only while Redis is unavailable."""
+        tokens, ts = self._local_buckets.get(agent_id, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - ts) * rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+
+        if agent_id not in self._local_buckets and len(self._local_buckets) >= MAX_LOCAL_BUCKETS:
+            self._local_buckets.pop(next(iter(self._local_buckets)))
+        self._local_buckets[agent_id] = (tokens, now)
+        return allowed
     
     async def publish(self, message: AgentMessage, persistent: bool = True) -> RouteResult:
         """
@@ -431,111 +543,350 @@ class MessageBus:
         message.route_direction = "down"
         return await self.publish(message)
     
-    async def broadcast_from_head(self, message: AgentMessage) -> List[RouteResult]:
+    async def broadcast_from_head(
+        self,
+        message: AgentMessage,
+        mode: str = "fanout",
+    ) -> BroadcastResult:
         """
-        Broadcast to all agents (Head 0xxxx only).
-        Returns list of results for each recipient.
+        Broadcast to all live agents (Head 0xxxx only).
+
+        ``fanout`` (default) resolves the live Council/Lead/Task agent IDs
+        and writes one inbox entry per agent, sending one Redis pipeline per
+        chunk of ``BROADCAST_CHUNK_SIZE`` XADDs.  ``shared`` writes a single
+        entry to ``agent:broadcast:stream`` that agents read by cursor via
+        :meth:`consume_broadcasts`.  Returns aggregate delivery stats.
         """
-        if message.sender_id != "00001":
-            return [RouteResult(
-                success=False,
+        start_time = time.monotonic()
+
+        def _result(**kwargs) -> BroadcastResult:
+            return BroadcastResult(
                 message_id=message.message_id,
-                error="Only Head of Council (00001) can broadcast"
-            )]
-        
-        # Get all active agents from Redis or DB (simplified - in production use agent registry)
-        results = []
-        tiers = ['1', '2', '3']  # Broadcast to all subordinate tiers
-        
-        for tier in tiers:
-            # In production, query actual agent IDs from PostgreSQL
-            # For now, send to tier channels
-            msg_copy = message.copy()
-            msg_copy.recipient_id = f"{tier}xxxx"  # Broadcast channel pattern
-            result = await self.publish(msg_copy)
-            results.append(result)
-        
-        return results
+                mode=mode,
+                latency_ms=(time.monotonic() - start_time) * 1000,
+                **kwargs,
+            )
+
+        if message.sender_id != "00001":
+            return _result(success=False, error="Only Head of Council (00001) can broadcast")
+        if mode not in ("fanout", "shared"):
+            return _result(success=False, error=f"Unknown broadcast mode: {mode}")
+        if not await self._check_rate_limit(message.sender_id):
+            return _result(success=False, error=f"Rate limit exceeded for agent {message.sender_id}")
+
+        message.route_direction = "broadcast"
+        notice = json.dumps({"message_id": message.message_id, "type": message.message_type})
+
+        try:
+            if mode == "shared":
+                entry = message.to_redis_stream()
+                entry["recipient_id"] = "broadcast"
+                pipe = self._redis.pipeline(transaction=False)
+                pipe.xadd(BROADCAST_STREAM_KEY, entry, maxlen=BROADCAST_STREAM_MAXLEN, approximate=True)
+                pipe.publish("channel:broadcast", notice)
+                entry_id, _ = await pipe.execute()
+                return _result(success=True, delivered=1, stream_entry_id=entry_id)
+
+            by_tier = await self._get_broadcast_recipients()
+            recipients = [agent_id for tier in BROADCAST_TIERS for agent_id in by_tier.get(tier, [])]
+            base_entry = message.to_redis_stream()
+
+            delivered = failed = 0
+            for i in range(0, len(recipients), BROADCAST_CHUNK_SIZE):
+                chunk = recipients[i:i + BROADCAST_CHUNK_SIZE]
+                pipe = self._redis.pipeline(transaction=False)
+                for agent_id in chunk:
+                    pipe.xadd(
+                        f"agent:{agent_id}:inbox",
+                        {**base_entry, "recipient_id": agent_id},
+                        maxlen=1000,
+                        approximate=True,
+                    )
+                    pipe.publish(f"channel:{agent_id}", notice)
+                replies = await pipe.execute(raise_on_error=False)
+                # Replies alternate XADD / PUBLISH; only the XADD decides delivery
+                for reply in replies[::2]:
+                    if isinstance(reply, Exception):
+                        failed += 1
+                    else:
+                        delivered += 1
+
+            return _result(
+                success=failed == 0,
+                recipients=len(recipients),
+                delivered=delivered,
+                failed=failed,
+                per_tier={tier: len(by_tier.get(tier, [])) for tier in BROADCAST_TIERS},
+                error=f"{failed} deliveries failed" if failed else None,
+            )
+        except Exception as e:
+            return _result(success=False, error=str(e))
+
+    async def consume_broadcasts(self, agent_id: str, count: int = 10) -> List[AgentMessage]:
+        """
+        Read shared-stream broadcasts *agent_id* has not seen yet.
+
+        The agent's read position is kept in ``agent:{agent_id}:broadcast_cursor``.
+        """
+        cursor_key = f"agent:{agent_id}:broadcast_cursor"
+        try:
+            cursor = await self._redis.get(cursor_key) or "0-0"
+            messages = await self._redis.xread({BROADCAST_STREAM_KEY: cursor}, count=count)
+            results = []
+            last_id = cursor
+            for _stream, entries in messages or []:
+                for msg_id, fields in entries:
+                    last_id = msg_id
+                    msg_data = dict(fields)
+                    if isinstance(msg_data.get('visible_to'), str):
+                        try:
+                            msg_data['visible_to'] = json.loads(msg_data['visible_to'])
+                        except (json.JSONDecodeError, TypeError):
+                            msg_data['visible_to'] = ['*']
+                    results.append(AgentMessage(**msg_data))
+            if last_id != cursor:
+                await self._redis.set(cursor_key, last_id, ex=86400 * 7)
+            return results
+        except Exception as e:
+            print(f"Broadcast consume error: {e}")
+            return []
+
+    async def _get_broadcast_recipients(self) -> Dict[str, List[str]]:
+        """Live agent IDs per tier prefix, from the in-process hierarchy index."""
+        await agent_hierarchy_index.ensure_loaded_async()
+        return agent_hierarchy_index.agents_by_tier(BROADCAST_TIERS)
     
     async def subscribe(self, agent_id: str, callback: Callable[[AgentMessage], Any]):
         """
         Subscribe agent to incoming messages.
-        Sets up both Stream consumer and Pub/Sub listener.
+
+        All subscriptions in the process share one pattern subscription
+        (``channel:*``) and one reader task; messages are decoded once and
+        fanned out through the ``agent_id -> callbacks`` table into a bounded
+        per-agent queue, so a slow agent cannot stall the others.
         """
         if agent_id not in self._subscribers:
             self._subscribers[agent_id] = set()
         self._subscribers[agent_id].add(callback)
-        
-        # Subscribe to Pub/Sub channel
-        await self._pubsub.subscribe(f"channel:{agent_id}")
-        
-        # Start listening
-        asyncio.create_task(self._listen_pubsub(agent_id, callback))
-    
-    async def _listen_pubsub(self, agent_id: str, callback: Callable):
-        """Background task to listen for Pub/Sub messages."""
+
+        if agent_id not in self._agent_queues:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+            self._agent_queues[agent_id] = queue
+            self._agent_workers[agent_id] = asyncio.create_task(
+                self._drain_agent_queue(agent_id, queue)
+            )
+
+        await self._ensure_pubsub_reader()
+
+    async def unsubscribe(self, agent_id: str, callback: Optional[Callable] = None):
+        """Remove one callback (or all callbacks) registered for *agent_id*."""
+        callbacks = self._subscribers.get(agent_id)
+        if callbacks is None:
+            return
+        if callback is not None:
+            callbacks.discard(callback)
+        if callback is None or not callbacks:
+            self._subscribers.pop(agent_id, None)
+            self._agent_queues.pop(agent_id, None)
+            worker = self._agent_workers.pop(agent_id, None)
+            if worker:
+                worker.cancel()
+
+    async def _ensure_pubsub_reader(self):
+        """Start the single process-wide Pub/Sub reader on first use."""
+        async with self._reader_lock:
+            if self._reader_task and not self._reader_task.done():
+                return
+            await self._pubsub.psubscribe(PUBSUB_PATTERN)
+            self._reader_task = asyncio.create_task(self._listen_pubsub())
+
+    async def _listen_pubsub(self):
+        """Background task: read the shared Pub/Sub connection and dispatch."""
+        prefix_len = len("channel:")
         try:
             async for message in self._pubsub.listen():
-                if message['type'] == 'message':
+                if message['type'] not in ('message', 'pmessage'):
+                    continue
+                self._pubsub_stats['received'] += 1
+
+                # Cheap dispatch-table lookup before paying for decoding
+                agent_id = message['channel'][prefix_len:]
+                queue = self._agent_queues.get(agent_id)
+                if queue is None:
+                    continue
+
+                try:
                     data = json.loads(message['data'])
-                    # Only notify, actual message fetched from Stream
-                    if data.get('type') == 'notification':
-                        await callback(AgentMessage(**data))
+                except (json.JSONDecodeError, TypeError):
+                    self._pubsub_stats['undecodable'] += 1
+                    continue
+                # Stream arrival notices only carry a pointer; the
+                # actual message is fetched from the Stream by consume_stream().
+                if 'sender_id' not in data:
+                    continue
+                try:
+                    agent_msg = AgentMessage(**data)
+                except Exception:
+                    self._pubsub_stats['undecodable'] += 1
+                    continue
+
+                item = (time.monotonic(), agent_msg)
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    # Backpressure: shed the oldest pending notification
+                    queue.get_nowait()
+                    queue.put_nowait(item)
+                    self._pubsub_stats['dropped'] += 1
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"Pub/Sub listen error for {agent_id}: {e}")
-    
+            print(f"Pub/Sub listen error: {e}")
+
+    async def _drain_agent_queue(self, agent_id: str, queue: asyncio.Queue):
+        """Per-agent worker delivering queued messages to its callbacks."""
+        while True:
+            enqueued_at, agent_msg = await queue.get()
+            if (time.monotonic() - enqueued_at) * 1000 > PUBSUB_LATE_THRESHOLD_MS:
+                self._pubsub_stats['late'] += 1
+            for callback in list(self._subscribers.get(agent_id, ())):
+                try:
+                    result = callback(agent_msg)
+                    if asyncio.iscoroutine(result):
+                        await result
+                    self._pubsub_stats['dispatched'] += 1
+                except Exception as e:
+                    print(f"Pub/Sub callback error for {agent_id}: {e}")
+
+    async def _ensure_group(self, stream_key: str, group_name: str) -> None:
+        """Create the consumer group for an inbox once per process (idempotent)."""
+        if group_name in self._groups_ready:
+            return
+        try:
+            await self._redis.xgroup_create(stream_key, group_name, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            # BUSYGROUP: another worker already created it
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_ready.add(group_name)
+
     async def consume_stream(
         self,
         agent_id: str,
         count: int = 1,
         apply_ray_tracing: bool = True,
+        block_ms: Optional[int] = None,
+        reclaim_idle_ms: int = PENDING_RECLAIM_IDLE_MS,
     ) -> List[AgentMessage]:
         """
-        Consume messages from agent's inbox (non-blocking).
+        Consume messages from agent's inbox via its consumer group.
         Used for polling pattern or batch processing.
 
+        Entries are read with ``XREADGROUP`` on ``group:{agent_id}``; entries
+        left pending by a crashed worker for longer than *reclaim_idle_ms*
+        are taken over with ``XAUTOCLAIM`` first.  Fail counters for the
+        whole batch are fetched with one ``MGET`` and DLQ moves are sent in
+        one pipeline, so a batch of N entries costs a constant number of
+        round trips.  Delivered entries stay pending until
+        :meth:`acknowledge` issues the ``XACK``.
+
         Section 6.4: When *apply_ray_tracing* is ``True`` (default),
         the returned list is filtered through :class:`ContextRayTracer`
         so that only messages the agent's role is permitted to see are
         included, and each message's ``context_scope`` is applied.
+        Entries filtered out this way are acknowledged immediately.
         """
         stream_key = f"agent:{agent_id}:inbox"
         group_name = f"group:{agent_id}"
         
         try:
-            # Try to read new messages
-            messages = await self._redis.xread(
-                {stream_key: '>'},  # Read from last point
-                count=count,
-                block=1000
-            )
-            
-            results = []
-            if messages:
-                for stream, entries in messages:
-                    for msg_id, fields in entries:
-                        # Convert back to AgentMessage
-                        msg_data = dict(fields)
-                        msg_data['message_id'] = msg_data.get('message_id', msg_id)
-                        
-                        # ── DLQ Threshold Check ──
-                        fail_key = f"message:fails:{msg_id}"
-                        fails = int(await self._redis.get(fail_key) or 0)
-                        if fails > 3:
-                            # Route to Dead-Letter Queue
-                            await self._redis.xadd("agent:dlq:stream", fields)
-                            await self._redis.xdel(stream_key, msg_id)
-                            await self._redis.delete(fail_key)
-                            print(f"[DLQ] Moved message {msg_id} to DLQ stream after {fails} failures.")
-                            continue
-
-                        # Deserialise visible_to from JSON string
-                        if 'visible_to' in msg_data and isinstance(msg_data['visible_to'], str):
-                            try:
-                                msg_data['visible_to'] = json.loads(msg_data['visible_to'])
-                            except (json.JSONDecodeError, TypeError):
-                                msg_data['visible_to'] = ['*']
-                        results.append(AgentMessage(**msg_data))
+            await self._ensure_group(stream_key, group_name)
+
+            entries: List[tuple] = []
+
+            # Take over entries whose consumer died before acknowledging
+            if reclaim_idle_ms > 0:
+                claimed = await self._redis.xautoclaim(
+                    stream_key,
+                    group_name,
+                    self._consumer_name,
+                    min_idle_time=reclaim_idle_ms,
+                    start_id="0-0",
+                    count=count,
+                )
+                # [next_start_id, entries, (deleted_ids on Redis >= 7)]
+                entries.extend(e for e in claimed[1] if e and e[1])
+
+            remaining = count - len(entries)
+            if remaining > 0:
+                messages = await self._redis.xreadgroup(
+                    group_name,
+                    self._consumer_name,
+                    {stream_key: '>'},
+                    count=remaining,
+                    block=block_ms,
+                )
+                for _stream, stream_entries in messages or []:
+                    entries.extend(stream_entries)
+
+            if not entries:
+                return []
+
+            # ── DLQ Threshold Check (one MGET for the whole batch) ──
+            fail_keys = [f"message:fails:{msg_id}" for msg_id, _ in entries]
+            fail_counts = await self._redis.mget(fail_keys)
+
+            parsed: List[tuple] = []
+            dead: List[tuple] = []
+            for (msg_id, fields), fails in zip(entries, fail_counts):
+                fails = int(fails or 0)
+                if fails > DLQ_MAX_FAILURES:
+                    dead.append((msg_id, fields, fails))
+                    continue
+
+                # Convert back to AgentMessage
+                msg_data = dict(fields)
+                msg_data['message_id'] = msg_data.get('message_id', msg_id)
+
+                # Deserialise visible_to from JSON string
+                if 'visible_to' in msg_data and isinstance(msg_data['visible_to'], str):
+                    try:
+                        msg_data['visible_to'] = json.loads(msg_data['visible_to'])
+                    except (json.JSONDecodeError, TypeError):
+                        msg_data['visible_to'] = ['*']
+                parsed.append((msg_id, AgentMessage(**msg_data)))
+
+            # Section 6.4: entries this agent may not see are never handed to
+            # a caller, so nobody could acknowledge them; XACK them here
+            # instead of leaving them in the pending list forever.
+            hidden: List[str] = []
+            if apply_ray_tracing:
+                hidden = [
+                    msg_id for msg_id, message in parsed
+                    if not ContextRayTracer.is_visible_to(message, agent_id)
+                ]
+                hidden_ids = set(hidden)
+                visible = [(msg_id, m) for msg_id, m in parsed if msg_id not in hidden_ids]
+            else:
+                visible = parsed
+
+            if dead or hidden:
+                # DLQ moves and hidden-entry acks in a single round trip
+                pipe = self._redis.pipeline(transaction=False)
+                for msg_id, fields, _ in dead:
+                    pipe.xadd("agent:dlq:stream", fields)
+                    pipe.xack(stream_key, group_name, msg_id)
+                    pipe.xdel(stream_key, msg_id)
+                    pipe.delete(f"message:fails:{msg_id}")
+                if hidden:
+                    pipe.xack(stream_key, group_name, *hidden)
+                await pipe.execute()
+                for msg_id, _, fails in dead:
+                    print(f"[DLQ] Moved message {msg_id} to DLQ stream after {fails} failures.")
+
+            for msg_id, message in visible:
+                self._remember_delivery(agent_id, message.message_id, msg_id)
+            results = [message for _, message in parsed]
 
             # Section 6.4: apply role-based context filtering
             if apply_ray_tracing and results:
@@ -545,13 +896,37 @@ class MessageBus:
         except Exception as e:
             print(f"Stream consume error: {e}")
             return []
+
+    def _remember_delivery(self, agent_id: str, message_id: str, stream_id: str) -> None:
+        """Remember which stream entry carried *message_id* so it can be XACKed."""
+        self._delivered[(agent_id, message_id)] = stream_id
+        # Bounded: oldest deliveries are forgotten first; they will be
+        # reclaimed by XAUTOCLAIM if nobody acknowledges them.
+        while len(self._delivered) > MAX_TRACKED_DELIVERIES:
+            self._delivered.pop(next(iter(self._delivered)))
     
     async def acknowledge(self, receipt: MessageReceipt):
-        """Acknowledge message processing."""
-        # Store in processed set
+        """Acknowledge message processing.
+
+        Issues ``XACK`` against the recipient's consumer group so the entry
+        leaves the pending list, and records the message in the processed set.
+        """
+        stream_id = receipt.stream_id or self._delivered.pop(
+            (receipt.recipient_id, receipt.message_id), None
+        )
         key = f"agent:{receipt.recipient_id}:processed"
-        await self._redis.sadd(key, receipt.message_id)
-        await self._redis.expire(key, 86400)  # Keep 24h
+
+        pipe = self._redis.pipeline(transaction=False)
+        if stream_id:
+            pipe.xack(
+                f"agent:{receipt.recipient_id}:inbox",
+                f"group:{receipt.recipient_id}",
+                stream_id,
+            )
+        # Store in processed set
+        pipe.sadd(key, receipt.message_id)
+        pipe.expire(key, 86400)  # Keep 24h
+        await pipe.execute()
 
     async def record_failure(self, message_id: str) -> int:
         """Record processing failure for a message. Returns current fail count."""
@@ -592,46 +967,15 @@ class MessageBus:
     
     async def _get_parent_id(self, agent_id: str) -> Optional[str]:
         """
-        Query database to find parent agent.
+        Look up the parent agent in the in-process hierarchy index.
         """
         try:
-            return await asyncio.to_thread(self._get_parent_id_sync, agent_id)
+            await agent_hierarchy_index.ensure_loaded_async()
+            return agent_hierarchy_index.get_parent_id(agent_id)
         except Exception as e:
             print(f"Parent lookup error for {agent_id}: {e}")
             return self._get_pattern_parent(agent_id)
 
-    def _get_parent_id_sync(self, agent_id: str) -> Optional[str]:
-        """Synchronous implementation of parent lookup."""
-        from backend.models.database import get_db_context
-        from backend.models.entities.agents import Agent
-        from sqlalchemy import select
-
-        try:
-            with get_db_context() as session:
-                # Find the agent
-                result = session.execute(
-                    select(Agent).where(Agent.agentium_id == agent_id)
-                )
-                agent = result.scalars().first()
-                
-                if not agent or not agent.parent_id:
-                    return None
-                
-                # Find the parent
-                parent_result = session.execute(
-                    select(Agent).where(Agent.id == agent.parent_id)
-                )
-                parent = parent_result.scalars().first()
-                
-                if parent:
-                    return parent.agentium_id
-        except ImportError:
-            pass
-        except Exception as e:
-            print(f"Sync parent lookup error: {e}")
-            
-        return None
-
     def _get_pattern_parent(self, agent_id: str) -> str:
         """Fallback to pattern-based parent ID."""
         return HierarchyValidator.get_parent_tier_id(agent_id)
@@ -640,10 +984,14 @@ class MessageBus:
         """Enrich message with Vector DB context for escalations."""
         try:
             store = get_vector_store()
+            # Embed once (micro-batched off the event loop), reuse for both queries
+            query_embedding = (await store.aembed([message.content]))[0]
+
             # Query constitution for relevant articles
-            constitution_results = store.query_constitution(
+            constitution_results = await store.aquery_constitution(
                 query=message.content,
-                n_results=3
+                n_results=3,
+                query_embedding=query_embedding,
             )
             
             # Get hierarchical context based on sender tier
@@ -653,10 +1001,11 @@ class MessageBus:
             }
             agent_type = tier_map.get(message.sender_id[0], 'task')
             
-            context = store.query_hierarchical_context(
+            context = await store.aquery_hierarchical_context(
                 agent_type=agent_type,
                 task_description=message.content,
-                n_results=5
+                n_results=5,
+                query_embedding=query_embedding,
             )
             
             return {
@@ -676,7 +1025,12 @@ class MessageBus:
                 'status': 'healthy',
                 'redis_version': info.get('redis_version'),
                 'connected_clients': info.get('connected_clients'),
-                'used_memory_human': info.get('used_memory_human')
+                'used_memory_human': info.get('used_memory_human'),
+                'pubsub': {
+                    **self._pubsub_stats,
+                    'subscribed_agents': len(self._subscribers),
+                    'queued': sum(q.qsize() for q in self._agent_queues.values()),
+                },
             }
         except Exception as e:
             return {'status': 'unhealthy', 'error': str(e)}
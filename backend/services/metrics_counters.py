@@ -0,0 +1,352 @@
+"""
+System Metrics Counters - rolling 24h activity counts and live gauges.
+
+``MonitoringService.get_aggregated_metrics`` used to run ~15 COUNT/AVG
+queries on every cache miss.  The dashboard figures are now maintained as
+things happen:
+
+  * counters (tasks created/completed/failed, workflow runs, events, dead
+    letters, health reports, scaling actions, frontend errors) are added to
+    Redis hashes of ``METRICS_BUCKET_SECONDS`` each; a 24h figure is the sum
+    of the buckets in the window, read in one pipeline,
+  * gauges (agents by status, queued tasks, open anomalies) are adjusted on
+    each state transition and reset from the database by ``reconcile``
+    (every ``metrics_snapshot`` run), so drift cannot accumulate.
+
+Transitions are collected by the session hooks in
+``models/entities/monitoring.py`` and applied after commit.  They are
+buffered in-process and flushed by a background thread every
+``METRICS_FLUSH_SECONDS``, so the request path never waits on Redis.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from backend.models.entities.agents import Agent, AgentStatus
+from backend.models.entities.audit import AuditLog
+from backend.models.entities.event_trigger import EventLog, EventLogStatus
+from backend.models.entities.monitoring import AgentHealthReport, ViolationReport
+from backend.models.entities.task import Task, TaskStatus
+from backend.models.entities.workflow import WorkflowExecution, WorkflowExecutionStatus
+
+logger = logging.getLogger(__name__)
+
+METRICS_BUCKET_SECONDS: int = int(os.getenv("METRICS_BUCKET_SECONDS", "300"))
+METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "2"))
+METRICS_WINDOW_SECONDS = 86400
+
+BUCKET_KEY_PREFIX = "agentium:metrics:bucket:"
+GAUGES_KEY = "agentium:metrics:gauges"
+COUNTERS_SINCE_FIELD = "_counters_since"
+RECONCILED_AT_FIELD = "_reconciled_at"
+
+AGENT_ACTIVE_STATUSES = frozenset({AgentStatus.ACTIVE, AgentStatus.WORKING, AgentStatus.IDLE_WORKING})
+AGENT_SCALING_STATUSES = frozenset({AgentStatus.ACTIVE, AgentStatus.WORKING})
+TASK_PENDING_STATUSES = frozenset({TaskStatus.PENDING, TaskStatus.ASSIGNED, TaskStatus.APPROVED})
+TASK_QUEUED_STATUSES = TASK_PENDING_STATUSES | {TaskStatus.DELIBERATING}
+SCALING_ACTIONS = frozenset({
+    "auto_scale_predictive_spawn",
+    "auto_scale_predictive_liquidate",
+    "manual_scale_override",
+})
+
+# Gauges reported by get_aggregated_metrics / snapshot_metrics
+GAUGES = (
+    "agents_total", "agents_active", "agents_suspended", "agents_scaling_active",
+    "tasks_pending", "tasks_queued", "anomalies_open",
+)
+
+
+def _agent_gauges(status, is_active) -> Tuple[str, ...]:
+    # Predictive scaling has always counted ACTIVE/WORKING agents regardless
+    # of is_active; the dashboard only counts active rows
+    scaling = ("agents_scaling_active",) if status in AGENT_SCALING_STATUSES else ()
+    if not is_active:
+        return scaling
+    return ("agents_total",) + scaling + (
+        ("agents_active",) if status in AGENT_ACTIVE_STATUSES else ()
+    ) + (
+        ("agents_suspended",) if status == AgentStatus.SUSPENDED else ()
+    )
+
+
+def _task_gauges(status, is_active) -> Tuple[str, ...]:
+    if not is_active:
+        return ()
+    return (
+        ("tasks_pending",) if status in TASK_PENDING_STATUSES else ()
+    ) + (
+        ("tasks_queued",) if status in TASK_QUEUED_STATUSES else ()
+    )
+
+
+def _violation_gauges(status, violation_type) -> Tuple[str, ...]:
+    return ("anomalies_open",) if status == "open" and violation_type == "anomaly_detected" else ()
+
+
+_GAUGE_RULES = (
+    (Agent, ("status", "is_active"), _agent_gauges),
+    (Task, ("status", "is_active"), _task_gauges),
+    (ViolationReport, ("status", "violation_type"), _violation_gauges),
+)
+
+
+def _previous(state, attr: str, current: Any) -> Any:
+    history = state.attrs[attr].history
+    return history.deleted[0] if history.deleted else current
+
+
+class MetricsCounters:
+    """Process-local buffer in front of the Redis bucket counters and gauges."""
+
+    def __init__(self, bucket_seconds: int = METRICS_BUCKET_SECONDS):
+        self.bucket_seconds = max(60, bucket_seconds)
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()          # (bucket_start, name) -> amount
+        self._gauge_deltas: Counter = Counter()
+        self._redis = None
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        self.stats: Dict[str, int] = {"flushes": 0, "flush_errors": 0, "reconciles": 0}
+
+    def client(self):
+        """Shared synchronous Redis client."""
+        if self._redis is None:
+            import redis
+            url = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+            self._redis = redis.Redis.from_url(url, decode_responses=True)
+        return self._redis
+
+    def _bucket(self, at: Optional[float] = None) -> int:
+        return int((at or time.time()) // self.bucket_seconds) * self.bucket_seconds
+
+    # ── Recording ────────────────────────────────────────────────────
+
+    def apply(self, counts: Dict[str, float], gauge_deltas: Dict[str, int]) -> None:
+        """Buffer counter increments (current bucket) and gauge deltas."""
+        bucket = self._bucket()
+        with self._lock:
+            for name, amount in counts.items():
+                if amount:
+                    self._counts[(bucket, name)] += amount
+            for name, delta in gauge_deltas.items():
+                if delta:
+                    self._gauge_deltas[name] += delta
+        self._ensure_flusher()
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        self.apply({name: amount}, {})
+
+    def collect_flush(self, session: Session) -> Tuple[Counter, Counter]:
+        """
+        Counter increments and gauge deltas for one flush.  Must run in
+        ``after_flush``, while ``session.new``/``dirty`` and attribute history
+        still describe the pre-flush state.
+        """
+        counts: Counter = Counter()
+        gauges: Counter = Counter()
+
+        for obj in session.new:
+            self._observe(obj, None, counts, gauges)
+        for obj in session.dirty:
+            self._observe(obj, sa_inspect(obj), counts, gauges)
+        for obj in session.deleted:
+            for cls, attrs, rule in _GAUGE_RULES:
+                if isinstance(obj, cls):
+                    gauges.subtract(rule(*(getattr(obj, a) for a in attrs)))
+        return counts, gauges
+
+    def _observe(self, obj: Any, state, counts: Counter, gauges: Counter) -> None:
+        inserted = state is None
+
+        for cls, attrs, rule in _GAUGE_RULES:
+            if isinstance(obj, cls):
+                current = [getattr(obj, a) for a in attrs]
+                gauges.update(rule(*current))
+                if not inserted:
+                    gauges.subtract(rule(*(_previous(state, a, v) for a, v in zip(attrs, current))))
+
+        def entered(status) -> bool:
+            return obj.status == status and (inserted or _previous(state, "status", obj.status) != status)
+
+        if isinstance(obj, Task):
+            if inserted and obj.is_active is not False:
+                counts["tasks_created"] += 1
+            if entered(TaskStatus.COMPLETED):
+                counts["tasks_completed"] += 1
+                if obj.completed_at and obj.created_at:
+                    counts["tasks_completed_duration_s"] += (obj.completed_at - obj.created_at).total_seconds()
+            elif entered(TaskStatus.FAILED):
+                counts["tasks_failed"] += 1
+        elif isinstance(obj, WorkflowExecution):
+            if inserted:
+                counts["workflows_started"] += 1
+            if entered(WorkflowExecutionStatus.COMPLETED):
+                counts["workflows_completed"] += 1
+        elif isinstance(obj, EventLog):
+            if inserted:
+                counts["events_total"] += 1
+            if entered(EventLogStatus.DEAD_LETTER):
+                counts["events_dead"] += 1
+        elif isinstance(obj, AgentHealthReport) and inserted:
+            counts["health_reports"] += 1
+            counts["health_score_sum"] += obj.overall_health_score if obj.overall_health_score is not None else 100.0
+        elif isinstance(obj, AuditLog) and inserted:
+            self._count_audit_action(obj.action, counts)
+
+    @staticmethod
+    def _count_audit_action(action: Optional[str], counts: Counter) -> None:
+        if action in SCALING_ACTIONS:
+            counts["scaling_events"] += 1
+        elif action == "frontend_error":
+            counts["frontend_errors"] += 1
+
+    def record_audit_actions(self, actions: Iterable[Optional[str]]) -> None:
+        """Count audit rows written outside the ORM (bulk audit pipeline)."""
+        counts: Counter = Counter()
+        for action in actions:
+            self._count_audit_action(action, counts)
+        if counts:
+            self.apply(counts, {})
+
+    # ── Flushing ─────────────────────────────────────────────────────
+
+    def flush(self) -> bool:
+        """Push buffered increments to Redis; kept for the next try on failure."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            deltas, self._gauge_deltas = self._gauge_deltas, Counter()
+        if not counts and not deltas:
+            return True
+
+        ttl = METRICS_WINDOW_SECONDS + 2 * self.bucket_seconds
+        try:
+            pipe = self.client().pipeline(transaction=False)
+            for (bucket, name), amount in counts.items():
+                key = f"{BUCKET_KEY_PREFIX}{bucket}"
+                if float(amount).is_integer():
+                    pipe.hincrby(key, name, int(amount))
+                else:
+                    pipe.hincrbyfloat(key, name, amount)
+            for bucket in {bucket for bucket, _ in counts}:
+                pipe.expire(f"{BUCKET_KEY_PREFIX}{bucket}", ttl)
+            for name, delta in deltas.items():
+                if delta:
+                    pipe.hincrby(GAUGES_KEY, name, delta)
+            pipe.hsetnx(GAUGES_KEY, COUNTERS_SINCE_FIELD, int(time.time()))
+            pipe.execute()
+            self.stats["flushes"] += 1
+            return True
+        except Exception as e:
+            self.stats["flush_errors"] += 1
+            logger.debug("Metrics counter flush failed: %s", e)
+            oldest = self._bucket() - METRICS_WINDOW_SECONDS
+            with self._lock:
+                for key, amount in counts.items():
+                    if key[0] >= oldest:  # Beyond the window it no longer matters
+                        self._counts[key] += amount
+                self._gauge_deltas.update(deltas)
+            return False
+
+    def _ensure_flusher(self) -> None:
+        # Forked Celery workers inherit the object but not the thread
+        if self._flusher is not None and self._flusher_pid == os.getpid() and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == os.getpid() and self._flusher.is_alive():
+                return
+            self._flusher_pid = os.getpid()
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-counters", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            self.flush()
+
+    # ── Reading ──────────────────────────────────────────────────────
+
+    def window_totals(self, window_seconds: int = METRICS_WINDOW_SECONDS) -> Optional[Dict[str, float]]:
+        """
+        Summed counters over the trailing window, or ``None`` when Redis is
+        unavailable or the counters do not yet cover the whole window.
+        """
+        now = time.time()
+        first = self._bucket(now - window_seconds)
+        try:
+            client = self.client()
+            since = client.hget(GAUGES_KEY, COUNTERS_SINCE_FIELD)
+            if since is None or int(since) > first:
+                return None
+            pipe = client.pipeline(transaction=False)
+            for bucket in range(first, self._bucket(now) + 1, self.bucket_seconds):
+                pipe.hgetall(f"{BUCKET_KEY_PREFIX}{bucket}")
+            totals: Counter = Counter()
+            for fields in pipe.execute():
+                for name, value in fields.items():
+                    totals[name] += float(value)
+            return dict(totals)
+        except Exception as e:
+            logger.debug("Metrics window read failed: %s", e)
+            return None
+
+    def gauges(self) -> Optional[Dict[str, int]]:
+        """Current gauges, or ``None`` if they have never been reconciled."""
+        try:
+            fields = self.client().hgetall(GAUGES_KEY)
+        except Exception as e:
+            logger.debug("Metrics gauge read failed: %s", e)
+            return None
+        if RECONCILED_AT_FIELD not in fields:
+            return None
+        return {name: max(0, int(fields.get(name, 0))) for name in GAUGES}
+
+    def reconcile(self, db: Session) -> Dict[str, int]:
+        """Reset the gauges from the database (a handful of GROUP BY counts)."""
+        values = dict.fromkeys(GAUGES, 0)
+
+        rows = db.query(Agent.status, Agent.is_active, func.count(Agent.id)).group_by(
+            Agent.status, Agent.is_active,
+        ).all()
+        for status, is_active, count in rows:
+            for name in _agent_gauges(status, is_active):
+                values[name] += count
+
+        rows = db.query(Task.status, func.count(Task.id)).filter(
+            Task.is_active == True,
+            Task.status.in_(TASK_QUEUED_STATUSES),
+        ).group_by(Task.status).all()
+        for status, count in rows:
+            for name in _task_gauges(status, True):
+                values[name] += count
+
+        values["anomalies_open"] = db.query(func.count(ViolationReport.id)).filter(
+            ViolationReport.status == "open",
+            ViolationReport.violation_type == "anomaly_detected",
+        ).scalar() or 0
+
+        try:
+            pipe = self.client().pipeline(transaction=True)
+            pipe.hset(GAUGES_KEY, mapping={**values, RECONCILED_AT_FIELD: int(time.time())})
+            pipe.hsetnx(GAUGES_KEY, COUNTERS_SINCE_FIELD, int(time.time()))
+            pipe.execute()
+            self.stats["reconciles"] += 1
+        except Exception as e:
+            logger.debug("Metrics gauge reconcile could not be stored: %s", e)
+        return values
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._counts) + len(self._gauge_deltas)
+        return {**self.stats, "buffered": buffered}
+
+
+# Global instance
+metrics_counters = MetricsCounters()
@@ -13,6 +13,10 @@ from datetime import datetime
 
 from backend.models.database import get_db_context
 from backend.models.entities.user_config import UserModelConfig, ProviderType, ModelUsageLog
+from backend.services.provider_registry import provider_registry
+from backend.services.usage_log_writer import usage_log_writer
+
+GEMINI_OPENAI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -205,10 +209,12 @@ class BaseModelProvider(ABC):
         request_type: str = "chat",
     ) -> None:
         """
-        Persist a ModelUsageLog row and update the config's rolling counters.
+        Queue a ModelUsageLog row and the config's rolling counters.
 
         Uses module-level calculate_cost() for accurate per-model pricing
-        based on the prompt/completion token split.
+        based on the prompt/completion token split.  The row is written by
+        the batched usage_log_writer, so the request path never waits on
+        the database.
         """
         total_tokens = prompt_tokens + completion_tokens
         cost = calculate_cost(
@@ -218,23 +224,21 @@ class BaseModelProvider(ABC):
             completion_tokens=completion_tokens,
         )
         try:
-            with get_db_context() as db:
-                self.config.increment_usage(total_tokens, cost_usd=cost)
-                db.add(ModelUsageLog(
-                    config_id=self.config.id,
-                    provider=self.config.provider,
-                    model_used=model_used,
-                    request_type=request_type,
-                    total_tokens=total_tokens,
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                    latency_ms=latency_ms,
-                    success=success,
-                    error_message=error,
-                    cost_usd=cost,
-                    request_metadata={"agentium_id": agentium_id},
-                ))
-                db.commit()
+            usage_log_writer.add_config_usage(self.config.id, total_tokens, cost_usd=cost)
+            usage_log_writer.submit(ModelUsageLog, {
+                "config_id": self.config.id,
+                "provider": self.config.provider,
+                "model_used": model_used,
+                "request_type": request_type,
+                "total_tokens": total_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": latency_ms,
+                "success": success,
+                "error_message": error,
+                "cost_usd": cost,
+                "request_metadata": {"agentium_id": agentium_id},
+            })
         except Exception as exc:
             # Logging must never crash the main request path
             print(f"⚠️  _log_usage failed: {exc}")
@@ -247,15 +251,17 @@ class OpenAICompatibleProvider(BaseModelProvider):
     GeminiProvider and LocalProvider inherit generate_with_tools() automatically.
     """
 
-    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
-        import openai
-
-        client = openai.AsyncOpenAI(
+    def _client(self):
+        """Pooled AsyncOpenAI client for this provider's endpoint and key."""
+        return provider_registry.openai_client(
             api_key=self.api_key or "not-needed",
             base_url=self.base_url,
-            timeout=self.config.timeout_seconds
+            timeout=self.config.timeout_seconds,
         )
 
+    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
+        client = self._client()
+
         start_time = time.time()
         try:
             response = await client.chat.completions.create(
@@ -311,13 +317,7 @@ class OpenAICompatibleProvider(BaseModelProvider):
             raise
 
     async def stream_generate(self, system_prompt: str, user_message: str, **kwargs):
-        import openai
-
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key or "not-needed",
-            base_url=self.base_url,
-            timeout=self.config.timeout_seconds
-        )
+        client = self._client()
 
         stream = await client.chat.completions.create(
             model=kwargs.get('model', self.config.default_model),
@@ -373,14 +373,8 @@ class OpenAICompatibleProvider(BaseModelProvider):
                 "messages":          full conversation history including tool turns,
             }
         """
-        import openai
-
         actual_model = kwargs.get("model", self.config.default_model)
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key or "not-needed",
-            base_url=self.base_url,
-            timeout=self.config.timeout_seconds,
-        )
+        client = self._client()
 
         conversation = list(messages)
         total_prompt_tokens = 0
@@ -498,10 +492,12 @@ class OpenAICompatibleProvider(BaseModelProvider):
 class AnthropicProvider(BaseModelProvider):
     """Anthropic Claude API."""
 
-    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
-        import anthropic
+    def _client(self):
+        """Pooled AsyncAnthropic client for this provider's key."""
+        return provider_registry.anthropic_client(api_key=self.api_key)
 
-        client = anthropic.AsyncAnthropic(api_key=self.api_key)
+    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
+        client = self._client()
 
         start_time = time.time()
         response = await client.messages.create(
@@ -541,9 +537,7 @@ class AnthropicProvider(BaseModelProvider):
         }
 
     async def stream_generate(self, system_prompt: str, user_message: str, **kwargs):
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=self.api_key)
+        client = self._client()
 
         async with client.messages.stream(
             model=kwargs.get('model', self.config.default_model),
@@ -583,10 +577,8 @@ class AnthropicProvider(BaseModelProvider):
         Returns:
             Same shape as OpenAICompatibleProvider.generate_with_tools().
         """
-        import anthropic
-
         actual_model = kwargs.get("model", self.config.default_model)
-        client = anthropic.AsyncAnthropic(api_key=self.api_key)
+        client = self._client()
         conversation = list(messages)
         total_prompt_tokens = 0
         total_completion_tokens = 0
@@ -694,15 +686,17 @@ class AnthropicProvider(BaseModelProvider):
 class GeminiProvider(BaseModelProvider):
     """Google Gemini API (via OpenAI compatibility layer)."""
 
-    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
-        import openai
-
-        client = openai.AsyncOpenAI(
+    def _client(self):
+        """Pooled AsyncOpenAI client for the Gemini OpenAI-compat endpoint."""
+        return provider_registry.openai_client(
             api_key=self.api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-            timeout=self.config.timeout_seconds
+            base_url=GEMINI_OPENAI_BASE_URL,
+            timeout=self.config.timeout_seconds,
         )
 
+    async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
+        client = self._client()
+
         start_time = time.time()
         response = await client.chat.completions.create(
             model=kwargs.get('model', self.config.default_model),
@@ -723,12 +717,7 @@ class GeminiProvider(BaseModelProvider):
         }
 
     async def stream_generate(self, system_prompt: str, user_message: str, **kwargs):
-        import openai
-
-        client = openai.AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-        )
+        client = self._client()
 
         stream = await client.chat.completions.create(
             model=kwargs.get('model', self.config.default_model),
@@ -744,9 +733,9 @@ class GeminiProvider(BaseModelProvider):
             if chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
-    # generate_with_tools() is inherited from OpenAICompatibleProvider
-    # once base_url is set to the Gemini OpenAI-compat endpoint.
-    # Override here so the correct base_url is used.
+    # Gemini shares the OpenAI-compatible tool loop; _client() already points
+    # it at the Gemini endpoint.  The provider instance is cached and shared
+    # by concurrent requests, so self.base_url must never be swapped here.
     async def generate_with_tools(
         self,
         system_prompt: str,
@@ -756,30 +745,24 @@ class GeminiProvider(BaseModelProvider):
         max_iterations: int = 10,
         **kwargs,
     ) -> Dict[str, Any]:
-        # Temporarily set base_url to Gemini endpoint, then delegate to the
-        # OpenAI-compatible implementation.
-        original_base_url = self.base_url
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/openai/"
-        try:
-            return await OpenAICompatibleProvider.generate_with_tools(
-                self, system_prompt, messages, tools, tool_executor, max_iterations, **kwargs
-            )
-        finally:
-            self.base_url = original_base_url
+        return await OpenAICompatibleProvider.generate_with_tools(
+            self, system_prompt, messages, tools, tool_executor, max_iterations, **kwargs
+        )
 
 
 class LocalProvider(OpenAICompatibleProvider):
     """Local models via Ollama, llama.cpp, LM Studio, etc."""
 
+    def _client(self):
+        return provider_registry.openai_client(
+            api_key="ollama",
+            base_url=self.base_url or "http://localhost:11434/v1",
+        )
+
     async def generate(self, system_prompt: str, user_message: str, **kwargs) -> Dict[str, Any]:
         combined_prompt = f"{system_prompt}\n\nUser: {user_message}"
 
-        import openai
-
-        client = openai.AsyncOpenAI(
-            base_url=self.base_url or "http://localhost:11434/v1",
-            api_key="ollama"
-        )
+        client = self._client()
 
         start_time = time.time()
         try:
@@ -857,7 +840,17 @@ class ModelService:
 
     @staticmethod
     async def get_provider(user_id: str, preferred_config_id: Optional[str] = None) -> Optional[BaseModelProvider]:
-        """Get provider instance for user."""
+        """
+        Get provider instance for user.
+
+        Served from the provider registry when the same lookup was resolved
+        recently; otherwise the config is loaded and the provider (decrypted
+        key, pooled client) is reused as long as the config is unchanged.
+        """
+        cached = provider_registry.get_cached_provider(user_id, preferred_config_id)
+        if cached is not None:
+            return cached
+
         with get_db_context() as db:
             if preferred_config_id:
                 config = db.query(UserModelConfig).filter_by(
@@ -879,7 +872,9 @@ class ModelService:
             if not provider_class:
                 raise ValueError(f"Unknown provider: {config.provider}")
 
-            return provider_class(config)
+            return provider_registry.provider_for_config(
+                config, provider_class, user_id=user_id, preferred_config_id=preferred_config_id,
+            )
 
     @staticmethod
     async def generate_with_agent(
@@ -990,17 +985,13 @@ class ModelService:
         agent_id = getattr(agent, "agentium_id", "system")
 
         async def tool_executor(name: str, args: Dict[str, Any]) -> str:
-            # execute_tool is synchronous; run in thread pool to avoid blocking
-            # the event loop during heavy tool calls.
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: svc.execute_tool(
-                    tool_name=name,
-                    called_by=agent_id,
-                    kwargs=args,
-                    task_id=task_id,
-                ),
+            # Async tools are awaited natively; sync tools run on the shared
+            # tool thread pool with per-tool concurrency limits and timeouts.
+            result = await svc.execute_tool_async(
+                tool_name=name,
+                called_by=agent_id,
+                kwargs=args,
+                task_id=task_id,
             )
             return json.dumps(result)
 
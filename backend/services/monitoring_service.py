@@ -5,6 +5,7 @@ Council Members monitor Lead Agents, Lead Agents monitor Task Agents.
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from backend.models.entities.agents import Agent, AgentType, LeadAgent, TaskAgent, CouncilMember
@@ -815,102 +816,67 @@ class MonitoringService:
         """
         Combine agent health, circuit breaker states, scaling events (24h),
         learning impact delta, workflow success rates, event trigger fire rates.
-        Cache in Redis for 10 seconds.
+
+        Gauges and rolling 24h counters come from ``metrics_counters``; the
+        tables are only scanned while the counters do not yet cover a full
+        day (or Redis is unavailable).  Cache in Redis for 10 seconds.
         """
         import json
         import os
-        import redis as _redis
-
-        redis_url = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+        from backend.services.metrics_counters import metrics_counters
 
         try:
-            r = _redis.Redis.from_url(redis_url, decode_responses=True)
+            r = metrics_counters.client()
             cached = r.get("agentium:monitoring:aggregated")
             if cached:
                 return json.loads(cached)
         except Exception:
             r = None
 
-        from backend.models.entities.agents import AgentStatus
-        from backend.models.entities.task import Task, TaskStatus
-
         now = datetime.utcnow()
-        day_ago = now - timedelta(hours=24)
+
+        gauges = metrics_counters.gauges()
+        if gauges is None:
+            gauges = metrics_counters.reconcile(db)
+        window = metrics_counters.window_totals()
+        if window is None:
+            window = MonitoringService._scan_window_metrics(db, now - timedelta(hours=24))
+
+        def counter(name: str) -> int:
+            return int(window.get(name, 0))
 
         # ── Agent Health ──────────────────────────────────────────────────
-        total_agents = db.query(Agent).filter(Agent.is_active == True).count()
-        agents_active = db.query(Agent).filter(
-            Agent.status.in_([AgentStatus.ACTIVE, AgentStatus.WORKING, AgentStatus.IDLE_WORKING]),
-            Agent.is_active == True,
-        ).count()
-        agents_suspended = db.query(Agent).filter(
-            Agent.status == AgentStatus.SUSPENDED,
-            Agent.is_active == True,
-        ).count()
+        total_agents = gauges["agents_total"]
+        agents_active = gauges["agents_active"]
+        agents_suspended = gauges["agents_suspended"]
 
-        avg_health_row = db.query(func.avg(AgentHealthReport.overall_health_score)).filter(
-            AgentHealthReport.created_at >= day_ago,
-        ).scalar()
-        avg_agent_health = round(float(avg_health_row), 1) if avg_health_row else 100.0
+        health_reports = counter("health_reports")
+        avg_agent_health = (
+            round(window["health_score_sum"] / health_reports, 1) if health_reports else 100.0
+        )
 
         agent_health_pct = round((agents_active / max(total_agents, 1)) * 100, 1)
 
         # ── Task Health ───────────────────────────────────────────────────
-        from sqlalchemy import func as sqla_func
-
-        tasks_24h = db.query(Task).filter(
-            Task.created_at >= day_ago, Task.is_active == True,
-        ).count()
-        tasks_completed = db.query(Task).filter(
-            Task.status == TaskStatus.COMPLETED,
-            Task.completed_at >= day_ago,
-            Task.is_active == True,
-        ).count()
-        tasks_failed = db.query(Task).filter(
-            Task.status == TaskStatus.FAILED,
-            Task.completed_at >= day_ago,
-            Task.is_active == True,
-        ).count()
-        tasks_pending = db.query(Task).filter(
-            Task.status.in_([TaskStatus.PENDING, TaskStatus.ASSIGNED, TaskStatus.APPROVED]),
-            Task.is_active == True,
-        ).count()
+        tasks_24h = counter("tasks_created")
+        tasks_completed = counter("tasks_completed")
+        tasks_failed = counter("tasks_failed")
+        tasks_pending = gauges["tasks_pending"]
 
         task_health_pct = round(
             (tasks_completed / max(tasks_completed + tasks_failed, 1)) * 100, 1,
         )
 
         # ── Workflow Health ───────────────────────────────────────────────
-        try:
-            from backend.models.entities.workflow import WorkflowExecution
-            wf_total = db.query(WorkflowExecution).filter(
-                WorkflowExecution.started_at >= day_ago,
-            ).count()
-            wf_completed = db.query(WorkflowExecution).filter(
-                WorkflowExecution.status == "completed",
-                WorkflowExecution.started_at >= day_ago,
-            ).count()
-            workflow_health_pct = round(
-                (wf_completed / max(wf_total, 1)) * 100, 1,
-            )
-        except Exception:
-            workflow_health_pct = 100.0
+        workflow_health_pct = round(
+            (counter("workflows_completed") / max(counter("workflows_started"), 1)) * 100, 1,
+        ) if counter("workflows_started") else 100.0
 
         # ── Event Health ──────────────────────────────────────────────────
-        try:
-            from backend.models.entities.event_trigger import EventLog, EventLogStatus
-            events_total = db.query(EventLog).filter(
-                EventLog.created_at >= day_ago,
-            ).count()
-            events_dead = db.query(EventLog).filter(
-                EventLog.status == EventLogStatus.DEAD_LETTER,
-                EventLog.created_at >= day_ago,
-            ).count()
-            event_health_pct = round(
-                ((events_total - events_dead) / max(events_total, 1)) * 100, 1,
-            )
-        except Exception:
-            event_health_pct = 100.0
+        events_total = counter("events_total")
+        event_health_pct = round(
+            ((events_total - counter("events_dead")) / max(events_total, 1)) * 100, 1,
+        )
 
         # ── Budget Health ─────────────────────────────────────────────────
         try:
@@ -931,30 +897,6 @@ class MonitoringService:
         except Exception:
             predictions = {"next_1h": 0, "next_6h": 0, "next_24h": 0, "current_capacity": 0, "recommendation": "neutral"}
 
-        # ── Scaling Events (24h) ──────────────────────────────────────────
-        from backend.models.entities.audit import AuditLog, AuditCategory
-        scaling_events_24h = db.query(AuditLog).filter(
-            AuditLog.action.in_([
-                "auto_scale_predictive_spawn",
-                "auto_scale_predictive_liquidate",
-                "manual_scale_override",
-            ]),
-            AuditLog.created_at >= day_ago,
-        ).count()
-
-        # ── Frontend Errors (24h) ─────────────────────────────────────────
-        frontend_errors_24h = db.query(AuditLog).filter(
-            AuditLog.action == "frontend_error",
-            AuditLog.created_at >= day_ago,
-        ).count()
-
-        # ── Active Anomalies ─────────────────────────────────────────────
-        active_anomalies = db.query(ViolationReport).filter(
-            ViolationReport.status == "open",
-            ViolationReport.violation_type == "anomaly_detected",
-            ViolationReport.created_at >= day_ago,
-        ).count()
-
         result = {
             "agents": {
                 "total": total_agents,
@@ -982,9 +924,9 @@ class MonitoringService:
                 "health_pct": budget_pct,
             },
             "capacity_forecast": predictions,
-            "scaling_events_24h": scaling_events_24h,
-            "frontend_errors_24h": frontend_errors_24h,
-            "active_anomalies": active_anomalies,
+            "scaling_events_24h": counter("scaling_events"),
+            "frontend_errors_24h": counter("frontend_errors"),
+            "active_anomalies": gauges["anomalies_open"],
             "timestamp": now.isoformat(),
         }
 
@@ -997,6 +939,68 @@ class MonitoringService:
 
         return result
 
+    @staticmethod
+    def _scan_window_metrics(db: Session, since: datetime) -> Dict[str, float]:
+        """
+        Table-scan equivalent of ``metrics_counters.window_totals`` for the
+        first day after deployment or when Redis is unavailable.
+        """
+        from sqlalchemy import case
+        from backend.models.entities.audit import AuditLog
+        from backend.models.entities.task import Task, TaskStatus
+        from backend.services.metrics_counters import SCALING_ACTIONS
+
+        totals: Dict[str, float] = {}
+
+        totals["tasks_created"] = db.query(func.count(Task.id)).filter(
+            Task.created_at >= since, Task.is_active == True,
+        ).scalar() or 0
+        for status, count in db.query(Task.status, func.count(Task.id)).filter(
+            Task.status.in_([TaskStatus.COMPLETED, TaskStatus.FAILED]),
+            Task.completed_at >= since,
+            Task.is_active == True,
+        ).group_by(Task.status).all():
+            totals["tasks_completed" if status == TaskStatus.COMPLETED else "tasks_failed"] = count
+
+        reports, score_sum = db.query(
+            func.count(AgentHealthReport.id), func.sum(AgentHealthReport.overall_health_score),
+        ).filter(AgentHealthReport.created_at >= since).one()
+        totals["health_reports"] = reports or 0
+        totals["health_score_sum"] = float(score_sum or 0.0)
+
+        try:
+            from backend.models.entities.workflow import WorkflowExecution, WorkflowExecutionStatus
+            started, completed = db.query(
+                func.count(WorkflowExecution.id),
+                func.count(case((WorkflowExecution.status == WorkflowExecutionStatus.COMPLETED, 1))),
+            ).filter(WorkflowExecution.started_at >= since).one()
+            totals["workflows_started"] = started or 0
+            totals["workflows_completed"] = completed or 0
+        except Exception:
+            pass
+
+        try:
+            from backend.models.entities.event_trigger import EventLog, EventLogStatus
+            events, dead = db.query(
+                func.count(EventLog.id),
+                func.count(case((EventLog.status == EventLogStatus.DEAD_LETTER, 1))),
+            ).filter(EventLog.created_at >= since).one()
+            totals["events_total"] = events or 0
+            totals["events_dead"] = dead or 0
+        except Exception:
+            pass
+
+        scaling, frontend = db.query(
+            func.count(case((AuditLog.action.in_(SCALING_ACTIONS), 1))),
+            func.count(case((AuditLog.action == "frontend_error", 1))),
+        ).filter(
+            AuditLog.action.in_([*SCALING_ACTIONS, "frontend_error"]),
+            AuditLog.created_at >= since,
+        ).one()
+        totals["scaling_events"] = scaling or 0
+        totals["frontend_errors"] = frontend or 0
+        return totals
+
     @staticmethod
     def detect_anomalies(db: Session) -> Dict[str, Any]:
         """
@@ -1240,47 +1244,36 @@ class MonitoringService:
         thirty_days_ago = now - timedelta(days=30)
 
         priorities = ["critical", "sovereign", "high", "normal", "low"]
-        sla_data = {}
-
-        for priority_name in priorities:
-            try:
-                priority_val = getattr(TaskPriority, priority_name.upper(), None)
-                if priority_val is None:
-                    sla_data[priority_name] = {"compliance_pct": 100.0, "total": 0, "met": 0, "breached": 0}
-                    continue
-
-                # Tasks completed in last 30 days with this priority
-                completed_tasks = db.query(Task).filter(
-                    Task.priority == priority_val,
-                    Task.status == TaskStatus.COMPLETED,
-                    Task.completed_at >= thirty_days_ago,
-                    Task.is_active == True,
-                ).all()
-
-                total = len(completed_tasks)
-                met = 0
-                breached = 0
-
-                for task in completed_tasks:
-                    timeout = getattr(task, "escalation_timeout_seconds", None) or 300
-                    if task.completed_at and task.started_at:
-                        duration = (task.completed_at - task.started_at).total_seconds()
-                        if duration <= timeout:
-                            met += 1
-                        else:
-                            breached += 1
-
-                compliance = round((met / max(total, 1)) * 100, 1)
-                sla_data[priority_name] = {
-                    "compliance_pct": compliance,
-                    "total": total,
-                    "met": met,
-                    "breached": breached,
-                }
+        sla_data = {p: {"compliance_pct": 100.0, "total": 0, "met": 0, "breached": 0} for p in priorities}
 
-            except Exception as e:
-                logger.warning("SLA metrics computation failed for %s: %s", priority_name, e)
-                sla_data[priority_name] = {"compliance_pct": 100.0, "total": 0, "met": 0, "breached": 0}
+        # One grouped pass over the last 30 days instead of loading every
+        # completed task per priority
+        from sqlalchemy import case
+        duration = func.extract("epoch", Task.completed_at - Task.started_at)
+        timeout = func.coalesce(func.nullif(Task.escalation_timeout_seconds, 0), 300)
+        try:
+            rows = db.query(
+                Task.priority,
+                func.count(Task.id),
+                func.count(case((duration <= timeout, 1))),
+                func.count(case((duration > timeout, 1))),
+            ).filter(
+                Task.priority.in_([getattr(TaskPriority, p.upper()) for p in priorities]),
+                Task.status == TaskStatus.COMPLETED,
+                Task.completed_at >= thirty_days_ago,
+                Task.is_active == True,
+            ).group_by(Task.priority).all()
+        except Exception as e:
+            logger.warning("SLA metrics computation failed: %s", e)
+            rows = []
+
+        for priority, total, met, breached in rows:
+            sla_data[priority.value] = {
+                "compliance_pct": round((met / max(total, 1)) * 100, 1),
+                "total": total,
+                "met": met,
+                "breached": breached,
+            }
 
         # Check for SLA breaches to fire WebSocket events
         for pname, pdata in sla_data.items():
@@ -32,34 +32,48 @@ class PredictiveScalingService:
         Retain 7 days, auto-trim.
         """
         now = int(time.time())
-        
-        pending_count = db.query(Task).filter(
-            Task.status.in_([
-                TaskStatus.PENDING,
-                TaskStatus.DELIBERATING,
-                TaskStatus.APPROVED,
-                TaskStatus.ASSIGNED
-            ]),
-            Task.is_active == True
-        ).count()
-        
-        active_agent_count = db.query(Agent).filter(
-            Agent.status.in_([AgentStatus.ACTIVE, AgentStatus.WORKING])
-        ).count()
-        
+
+        # Gauges and the last 5 minutes of completions come from the shared
+        # metrics counters; the queries below only run when those are unavailable
+        from backend.services.metrics_counters import metrics_counters
+        gauges = metrics_counters.gauges()
+        recent = metrics_counters.window_totals(window_seconds=300)
+
+        if gauges is not None:
+            pending_count = gauges["tasks_queued"]
+            active_agent_count = gauges["agents_scaling_active"]
+        else:
+            pending_count = db.query(Task).filter(
+                Task.status.in_([
+                    TaskStatus.PENDING,
+                    TaskStatus.DELIBERATING,
+                    TaskStatus.APPROVED,
+                    TaskStatus.ASSIGNED
+                ]),
+                Task.is_active == True
+            ).count()
+
+            active_agent_count = db.query(Agent).filter(
+                Agent.status.in_([AgentStatus.ACTIVE, AgentStatus.WORKING])
+            ).count()
+
         # Calculate avg task duration for tasks completed in last 5m
-        five_mins_ago = datetime.utcnow() - timedelta(minutes=5)
-        recent_tasks = db.query(Task).filter(
-            Task.status == TaskStatus.COMPLETED,
-            Task.completed_at >= five_mins_ago
-        ).all()
-        
         avg_duration = 0
-        if recent_tasks:
-            durations = [(t.completed_at - t.created_at).total_seconds() for t in recent_tasks if t.completed_at and t.created_at]
-            if durations:
-                avg_duration = sum(durations) / len(durations)
-                
+        if recent is not None:
+            if recent.get("tasks_completed"):
+                avg_duration = recent.get("tasks_completed_duration_s", 0.0) / recent["tasks_completed"]
+        else:
+            five_mins_ago = datetime.utcnow() - timedelta(minutes=5)
+            recent_tasks = db.query(Task).filter(
+                Task.status == TaskStatus.COMPLETED,
+                Task.completed_at >= five_mins_ago
+            ).all()
+
+            if recent_tasks:
+                durations = [(t.completed_at - t.created_at).total_seconds() for t in recent_tasks if t.completed_at and t.created_at]
+                if durations:
+                    avg_duration = sum(durations) / len(durations)
+
         # Get token spend (we can interface with TokenOptimizer)
         token_spend_last_5m = 0.0
         status = token_optimizer.get_status()
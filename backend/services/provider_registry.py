@@ -0,0 +1,248 @@
+"""
+Provider Registry - long-lived model providers and pooled HTTP clients.
+
+``ModelService.get_provider`` used to query ``user_model_configs``, decrypt
+the API key and build a fresh ``AsyncOpenAI`` / ``AsyncAnthropic`` client
+(new TLS handshake, new connection pool) for every LLM call.  This registry
+keeps, per process:
+
+  * the resolution ``(user_id, preferred_config_id) -> config id``,
+  * one provider instance per ``(config_id, config fingerprint)`` - the API
+    key is decrypted once, when the instance is built,
+  * one warm ``httpx.AsyncClient`` (HTTP/2, tunable pool limits) per
+    endpoint and event loop, shared by every SDK client that talks to it.
+
+Entries are dropped when a ``UserModelConfig`` change that affects the
+connection commits (hooks in ``models/entities/user_config.py``) and when a
+key is rotated (``APIKeyManager.rotate_key``).  ``PROVIDER_CACHE_TTL_SECONDS``
+bounds how long another worker's config edits can go unnoticed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_CACHE_TTL_SECONDS: float = float(os.getenv("PROVIDER_CACHE_TTL_SECONDS", "60"))
+LLM_HTTP2_ENABLED: bool = os.getenv("LLM_HTTP2_ENABLED", "true").lower() == "true"
+LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+# Columns that change how (or whether) a provider talks to its endpoint.
+# Usage counters and health bookkeeping are deliberately left out so that
+# logging a call never evicts the provider that made it.
+FINGERPRINT_ATTRIBUTES = (
+    "provider", "api_key_encrypted", "api_base_url", "local_server_url",
+    "azure_endpoint", "azure_deployment", "default_model", "max_tokens",
+    "temperature", "top_p", "timeout_seconds", "extra_params",
+    "status", "is_default", "user_id", "is_active",
+)
+
+
+def config_fingerprint(config: Any) -> str:
+    """Version stamp of the connection-relevant fields of a UserModelConfig."""
+    values = [repr(getattr(config, attr, None)) for attr in FINGERPRINT_ATTRIBUTES]
+    return hashlib.sha256("\x1f".join(values).encode("utf-8")).hexdigest()[:16]
+
+
+def _key_digest(api_key: Optional[str]) -> str:
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class _LoopPools:
+    """HTTP pools and SDK clients that belong to one event loop."""
+
+    __slots__ = ("http", "sdk")
+
+    def __init__(self):
+        self.http: Dict[str, Any] = {}                                  # endpoint -> httpx.AsyncClient
+        self.sdk: Dict[Tuple[str, str, str, Optional[float]], Any] = {}  # (kind, endpoint, key digest, timeout)
+
+
+class ProviderRegistry:
+    """Process-wide cache of provider instances and SDK / HTTP clients."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # (user_id, preferred_config_id) -> (config_id, resolved_at)
+        self._resolved: Dict[Tuple[str, Optional[str]], Tuple[str, float]] = {}
+        # config_id -> (fingerprint, provider)
+        self._providers: Dict[str, Tuple[str, Any]] = {}
+        # event loop -> that loop's HTTP pools and SDK clients
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPools]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats: Dict[str, int] = {
+            "provider_hits": 0,
+            "provider_misses": 0,
+            "client_hits": 0,
+            "client_misses": 0,
+            "invalidations": 0,
+        }
+
+    # ── Providers ────────────────────────────────────────────────────
+
+    def get_cached_provider(self, user_id: str, preferred_config_id: Optional[str]) -> Optional[Any]:
+        """Provider for a previously resolved lookup, or ``None`` on a miss."""
+        with self._lock:
+            resolved = self._resolved.get((user_id, preferred_config_id))
+            if resolved is None:
+                return None
+            config_id, resolved_at = resolved
+            if time.monotonic() - resolved_at > PROVIDER_CACHE_TTL_SECONDS:
+                del self._resolved[(user_id, preferred_config_id)]
+                return None
+            entry = self._providers.get(config_id)
+            if entry is None:
+                return None
+            self.stats["provider_hits"] += 1
+            return entry[1]
+
+    def provider_for_config(
+        self,
+        config: Any,
+        provider_class: type,
+        user_id: Optional[str] = None,
+        preferred_config_id: Optional[str] = None,
+    ) -> Any:
+        """
+        Provider instance for *config*, reused while its fingerprint matches.
+
+        When *user_id* is given the lookup is remembered so the next
+        ``get_provider`` call for the same arguments skips the database.
+        """
+        fingerprint = config_fingerprint(config)
+        with self._lock:
+            entry = self._providers.get(config.id)
+            if entry is not None and entry[0] == fingerprint:
+                provider = entry[1]
+                self.stats["provider_hits"] += 1
+            else:
+                provider = provider_class(config)
+                self._providers[config.id] = (fingerprint, provider)
+                self.stats["provider_misses"] += 1
+            if user_id is not None:
+                self._resolved[(user_id, preferred_config_id)] = (config.id, time.monotonic())
+        return provider
+
+    def invalidate(self, config_ids: Iterable[str] = (), drop_clients: bool = False) -> None:
+        """
+        Forget cached providers for *config_ids*.
+
+        Lookups are dropped wholesale: a change to one config (a new default,
+        a deactivated key) can change which config another lookup resolves to.
+        With *drop_clients* the SDK clients bound to those providers' API keys
+        are released too (key rotation); the pooled connections stay warm.
+        """
+        with self._lock:
+            digests = set()
+            for config_id in config_ids:
+                entry = self._providers.pop(config_id, None)
+                if entry is not None and drop_clients:
+                    digests.add(_key_digest(getattr(entry[1], "api_key", None)))
+            if digests:
+                for pools in self._pools.values():
+                    for key in [k for k in pools.sdk if k[2] in digests]:
+                        del pools.sdk[key]
+            self._resolved.clear()
+            self.stats["invalidations"] += 1
+
+    # ── Clients ──────────────────────────────────────────────────────
+
+    def _loop_pools(self) -> "_LoopPools":
+        # httpx pools are bound to the loop that opened their connections, so
+        # callers running their own loop (Celery tasks) get their own pools;
+        # they are released together with the loop.
+        loop = asyncio.get_running_loop()
+        pools = self._pools.get(loop)
+        if pools is None:
+            pools = _LoopPools()
+            self._pools[loop] = pools
+        return pools
+
+    @staticmethod
+    def _new_http_client() -> Any:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        try:
+            return httpx.AsyncClient(http2=LLM_HTTP2_ENABLED, limits=limits)
+        except ImportError:
+            # http2=True needs the optional ``h2`` package
+            return httpx.AsyncClient(limits=limits)
+
+    def _sdk_client(self, kind: str, api_key: Optional[str], base_url: Optional[str], timeout: Optional[float]) -> Any:
+        endpoint = base_url or kind
+        key = (kind, endpoint, _key_digest(api_key), timeout)
+        with self._lock:
+            pools = self._loop_pools()
+            client = pools.sdk.get(key)
+            if client is not None:
+                self.stats["client_hits"] += 1
+                return client
+
+            http_client = pools.http.get(endpoint)
+            if http_client is None or http_client.is_closed:
+                http_client = self._new_http_client()
+                pools.http[endpoint] = http_client
+
+            kwargs: Dict[str, Any] = {"api_key": api_key, "http_client": http_client}
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            if kind == "anthropic":
+                import anthropic
+                client = anthropic.AsyncAnthropic(**kwargs)
+            else:
+                import openai
+                client = openai.AsyncOpenAI(base_url=base_url, **kwargs)
+            pools.sdk[key] = client
+            self.stats["client_misses"] += 1
+            return client
+
+    def openai_client(self, api_key: Optional[str], base_url: Optional[str], timeout: Optional[float] = None) -> Any:
+        """Shared ``openai.AsyncOpenAI`` for (endpoint, key, timeout) on the running loop."""
+        return self._sdk_client("openai", api_key, base_url, timeout)
+
+    def anthropic_client(self, api_key: Optional[str], timeout: Optional[float] = None) -> Any:
+        """Shared ``anthropic.AsyncAnthropic`` for (key, timeout) on the running loop."""
+        return self._sdk_client("anthropic", api_key, "https://api.anthropic.com", timeout)
+
+    async def aclose(self) -> None:
+        """Close the HTTP pools opened on the running event loop."""
+        with self._lock:
+            pools = self._pools.pop(asyncio.get_running_loop(), None)
+        if pools is None:
+            return
+        for client in pools.http.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug("Closing LLM HTTP client failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return {
+            **self.stats,
+            "providers": len(self._providers),
+            "resolved_lookups": len(self._resolved),
+            "event_loops": len(pools),
+            "http_pools": sum(len(p.http) for p in pools),
+            "sdk_clients": sum(len(p.sdk) for p in pools),
+            "http2": LLM_HTTP2_ENABLED,
+        }
+
+
+# Global instance
+provider_registry = ProviderRegistry()
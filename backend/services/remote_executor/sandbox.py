@@ -1,9 +1,31 @@
-"""Sandbox container management for remote code execution."""
+"""Sandbox container management for remote code execution.
+
+Cold-starting a container takes seconds, so ``SandboxPoolManager`` keeps
+warm containers per sandbox shape (image, CPU, memory, network):
+
+  * each pool's target size follows that shape's recent request rate
+    (enough for ``AGENTIUM_WARM_SANDBOX_LEAD_SECONDS`` of demand, between a
+    floor and ``AGENTIUM_MAX_WARM_SANDBOXES``); the default shape keeps at
+    least ``AGENTIUM_MIN_WARM_SANDBOXES``,
+  * docker-py calls run on worker threads, and missing containers are
+    created concurrently (``AGENTIUM_SANDBOX_CREATE_CONCURRENCY``),
+  * idle containers older than ``AGENTIUM_WARM_SANDBOX_TTL_SECONDS`` are
+    recycled, and every container gets a liveness probe before it is
+    handed out,
+  * warm-hit and cold-start latencies are tracked (``get_stats``).
+
+The docker client and the pools are shared by every ``SandboxManager``.
+"""
+import asyncio
+import math
 import os
+import time
 import uuid
 import logging
+import threading
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Deque, List, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -18,6 +40,19 @@ except ImportError:
     DOCKER_AVAILABLE = False
     logger.warning("docker-py not installed – SandboxManager will operate in stub mode")
 
+MIN_WARM_SANDBOXES = int(os.getenv("AGENTIUM_MIN_WARM_SANDBOXES", "3"))
+MAX_WARM_SANDBOXES = int(os.getenv("AGENTIUM_MAX_WARM_SANDBOXES", "10"))
+WARM_SANDBOX_TTL_SECONDS = float(os.getenv("AGENTIUM_WARM_SANDBOX_TTL_SECONDS", "600"))
+WARM_SANDBOX_LEAD_SECONDS = float(os.getenv("AGENTIUM_WARM_SANDBOX_LEAD_SECONDS", "30"))
+SANDBOX_CREATE_CONCURRENCY = int(os.getenv("AGENTIUM_SANDBOX_CREATE_CONCURRENCY", "4"))
+REQUEST_RATE_WINDOW_SECONDS = 300
+POOL_MAINTENANCE_SECONDS = 30
+DOCKER_RETRY_SECONDS = 30
+WARM_POOL_AGENT_ID = "warm_pool"
+
+# (image, cpu_limit, memory_limit_mb, network_mode)
+PoolKey = Tuple[str, float, int, str]
+
 
 @dataclass
 class SandboxConfig:
@@ -30,81 +65,108 @@ class SandboxConfig:
     max_disk_mb: int = 1024  # 1GB
     image: str = "python:3.11-slim"  # Base image
 
+    def pool_key(self) -> PoolKey:
+        """Containers are interchangeable when these settings match."""
+        return (self.image, float(self.cpu_limit), int(self.memory_limit_mb), self.network_mode)
 
-class SandboxManager:
-    """
-    Manages Docker sandbox containers for remote code execution.
 
-    Each execution runs in an isolated container with resource limits.
-    Containers are ephemeral – created per execution and destroyed after.
-    """
+_DEFAULT_POOL_KEY = SandboxConfig().pool_key()
 
-    def __init__(self):
-        self.docker_client = None
-        self._init_docker()
 
-    def _init_docker(self):
-        """Initialize Docker client from environment."""
-        if not DOCKER_AVAILABLE:
-            logger.warning("SandboxManager: docker-py not available")
-            return
+def _percentile(samples: Deque[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1)
 
-        try:
-            # Try environment variable first
-            docker_socket = os.getenv('HOST_DOCKER_SOCKET', '/var/run/docker.sock')
-            self.docker_client = docker.DockerClient(base_url=f'unix://{docker_socket}')
 
-            # Test connection
-            self.docker_client.ping()
-            logger.info(f"SandboxManager connected to Docker at {docker_socket}")
+@dataclass
+class _WarmSandbox:
+    info: Dict[str, Any]
+    created_at: float = field(default_factory=time.monotonic)
 
-        except Exception as e:
-            logger.error(f"Failed to connect to Docker: {e}")
-            self.docker_client = None
-
-        # ── WARM POOLING CONFIGURATION ──
-        self.MIN_WARM_CONTAINERS = int(os.getenv("AGENTIUM_MIN_WARM_SANDBOXES", "3"))
-        self._warm_pool: List[Dict[str, Any]] = []
-        self._pool_lock = None  # Initialized in async context
-        
-    async def _ensure_pool_lock(self):
-        import asyncio
-        if self._pool_lock is None:
-            self._pool_lock = asyncio.Lock()
-
-    async def _replenish_warm_pool(self, config: Optional[SandboxConfig] = None):
-        """Background task to keep warm pool stocked."""
-        await self._ensure_pool_lock()
-        
-        async with self._pool_lock:
-            current_count = len(self._warm_pool)
-            needed = self.MIN_WARM_CONTAINERS - current_count
-            
-        if needed > 0 and self.docker_client:
-            logger.info(f"[Warm Pool] Replenishing {needed} containers in background...")
-            for _ in range(needed):
+
+class _Pool:
+    """Idle containers and recent demand for one sandbox shape."""
+
+    def __init__(self, config: SandboxConfig):
+        self.config = config
+        self.idle: Deque[_WarmSandbox] = deque()
+        self.creating = 0
+        self.requests: Deque[float] = deque()
+
+    def record_request(self, now: float) -> None:
+        self.requests.append(now)
+        self.prune(now)
+
+    def prune(self, now: float) -> None:
+        while self.requests and now - self.requests[0] > REQUEST_RATE_WINDOW_SECONDS:
+            self.requests.popleft()
+
+    def target(self, is_default: bool) -> int:
+        """Warm containers needed to cover the next lead window of demand."""
+        rate = len(self.requests) / REQUEST_RATE_WINDOW_SECONDS
+        floor = MIN_WARM_SANDBOXES if is_default else (1 if self.requests else 0)
+        return max(floor, min(MAX_WARM_SANDBOXES, math.ceil(rate * WARM_SANDBOX_LEAD_SECONDS)))
+
+
+class SandboxPoolManager:
+    """Process-wide docker client and warm pools, shared by every SandboxManager."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docker = None
+        self._docker_failed_at: Optional[float] = None
+        self._pools: Dict[PoolKey, _Pool] = {}
+        self._creating_total = 0
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._background: set = set()  # Keeps fire-and-forget tasks referenced
+        self._warm_ms: Deque[float] = deque(maxlen=500)
+        self._cold_ms: Deque[float] = deque(maxlen=500)
+        self.stats: Dict[str, int] = {
+            "warm_hits": 0,
+            "cold_starts": 0,
+            "created": 0,
+            "create_failures": 0,
+            "probe_failures": 0,
+            "expired": 0,
+            "trimmed": 0,
+        }
+
+    # ── Docker client ────────────────────────────────────────────────
+
+    @property
+    def docker_client(self):
+        """Shared docker client (``None`` when docker is unavailable)."""
+        if self._docker is not None or not DOCKER_AVAILABLE:
+            return self._docker
+        if self._docker_failed_at and time.monotonic() - self._docker_failed_at < DOCKER_RETRY_SECONDS:
+            return None
+        with self._lock:
+            if self._docker is None:
                 try:
-                    # Create without tying to a specific agent yet
-                    container_info = await self._create_raw_container("warm_pool", config)
-                    async with self._pool_lock:
-                        self._warm_pool.append(container_info)
+                    # Try environment variable first
+                    docker_socket = os.getenv('HOST_DOCKER_SOCKET', '/var/run/docker.sock')
+                    client = docker.DockerClient(base_url=f'unix://{docker_socket}')
+                    client.ping()
+                    self._docker = client
+                    logger.info(f"SandboxManager connected to Docker at {docker_socket}")
                 except Exception as e:
-                    logger.error(f"[Warm Pool] Failed to create warm container: {e}")
+                    logger.error(f"Failed to connect to Docker: {e}")
+                    self._docker_failed_at = time.monotonic()
+        return self._docker
 
-    async def _create_raw_container(
-        self,
-        agent_id: str,
-        config: Optional[SandboxConfig] = None
-    ) -> Dict[str, Any]:
-        """Internal helper to actually spin up docker."""
-        if not self.docker_client:
+    # ── Blocking docker calls (run on worker threads) ────────────────
+
+    def _run_container(self, agent_id: str, config: SandboxConfig) -> Dict[str, Any]:
+        client = self.docker_client
+        if not client:
             raise RuntimeError("Docker client not available")
 
-        config = config or SandboxConfig()
         sandbox_id = f"sandbox_{uuid.uuid4().hex[:12]}"
 
         # Create container with resource limits
-        container = self.docker_client.containers.run(
+        container = client.containers.run(
             image=config.image,
             name=sandbox_id,
             detach=True,
@@ -118,7 +180,7 @@ class SandboxManager:
                 "agentium.sandbox": "true",
                 "agentium.agent_id": agent_id,
                 "agentium.created_at": datetime.utcnow().isoformat(),
-                "agentium.is_warm": "true" if agent_id == "warm_pool" else "false"
+                "agentium.is_warm": "true" if agent_id == WARM_POOL_AGENT_ID else "false"
             },
             environment={
                 "PYTHONDONTWRITEBYTECODE": "1",
@@ -137,6 +199,212 @@ class SandboxManager:
             }
         }
 
+    def _probe(self, container_id: str) -> bool:
+        """Liveness check: running, and able to exec a trivial command."""
+        try:
+            container = self.docker_client.containers.get(container_id)
+            if container.status != "running":
+                return False
+            exit_code, _ = container.exec_run(["true"])
+            return exit_code == 0
+        except Exception as e:
+            logger.debug(f"[Warm Pool] Probe of {container_id[:12]} failed: {e}")
+            return False
+
+    def _remove(self, container_id: str) -> None:
+        try:
+            self.docker_client.containers.get(container_id).remove(force=True)
+        except Exception as e:
+            if not (DOCKER_AVAILABLE and isinstance(e, docker.errors.NotFound)):
+                logger.warning(f"[Warm Pool] Could not remove {container_id[:12]}: {e}")
+
+    # ── Acquire ──────────────────────────────────────────────────────
+
+    async def acquire(self, agent_id: str, config: SandboxConfig) -> Dict[str, Any]:
+        """A ready sandbox for *config*: a probed warm container, else a cold start."""
+        started = time.monotonic()
+        key = config.pool_key()
+        self._ensure_maintenance()
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _Pool(config)
+            pool.record_request(started)
+
+        try:
+            while True:
+                with self._lock:
+                    warm = pool.idle.popleft() if pool.idle else None
+                if warm is None:
+                    break
+                if started - warm.created_at > WARM_SANDBOX_TTL_SECONDS:
+                    self.stats["expired"] += 1
+                    self._spawn(asyncio.to_thread(self._remove, warm.info["container_id"]))
+                    continue
+                if not await asyncio.to_thread(self._probe, warm.info["container_id"]):
+                    self.stats["probe_failures"] += 1
+                    self._spawn(asyncio.to_thread(self._remove, warm.info["container_id"]))
+                    continue
+
+                info = dict(warm.info)
+                info["config"] = {
+                    "cpu_limit": config.cpu_limit,
+                    "memory_limit_mb": config.memory_limit_mb,
+                    "timeout_seconds": config.timeout_seconds,
+                }
+                elapsed_ms = (time.monotonic() - started) * 1000
+                self.stats["warm_hits"] += 1
+                self._warm_ms.append(elapsed_ms)
+                logger.info(f"Popped warm sandbox {info['sandbox_id']} for agent {agent_id} in {elapsed_ms:.0f}ms")
+                return info
+
+            # Slow path: create on demand if pool is empty
+            logger.warning(f"Warm pool empty. Cold-starting sandbox for agent {agent_id}")
+            info = await asyncio.to_thread(self._run_container, agent_id, config)
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.stats["cold_starts"] += 1
+            self._cold_ms.append(elapsed_ms)
+            logger.info(f"Created cold sandbox {info['sandbox_id']} for agent {agent_id} in {elapsed_ms:.0f}ms")
+            return info
+        finally:
+            self._spawn(self.replenish(key))
+
+    # ── Pool maintenance ─────────────────────────────────────────────
+
+    async def replenish(self, key: PoolKey) -> None:
+        """Create the missing warm containers for one pool, several at a time."""
+        # Connect first: docker_client pings Docker and takes self._lock itself
+        if self._docker is None and await asyncio.to_thread(lambda: self.docker_client) is None:
+            return
+        while True:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None or self._docker is None:
+                    return
+                deficit = pool.target(key == _DEFAULT_POOL_KEY) - len(pool.idle) - pool.creating
+                batch = min(deficit, SANDBOX_CREATE_CONCURRENCY - self._creating_total)
+                if batch <= 0:
+                    return
+                pool.creating += batch
+                self._creating_total += batch
+
+            logger.info(f"[Warm Pool] Creating {batch} containers for {key}")
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._run_container, WARM_POOL_AGENT_ID, pool.config) for _ in range(batch)),
+                return_exceptions=True,
+            )
+            failed = 0
+            with self._lock:
+                pool.creating -= batch
+                self._creating_total -= batch
+                for result in results:
+                    if isinstance(result, BaseException):
+                        failed += 1
+                    else:
+                        pool.idle.append(_WarmSandbox(result))
+            self.stats["created"] += batch - failed
+            if failed:
+                self.stats["create_failures"] += failed
+                logger.error(f"[Warm Pool] Failed to create {failed} warm containers: {results[0]}")
+                return
+
+    async def maintain(self) -> None:
+        """Recycle expired containers, trim surplus and restock every pool."""
+        now = time.monotonic()
+        stale: List[str] = []
+        with self._lock:
+            for key, pool in self._pools.items():
+                pool.prune(now)
+                while pool.idle and now - pool.idle[0].created_at > WARM_SANDBOX_TTL_SECONDS:
+                    stale.append(pool.idle.popleft().info["container_id"])
+                    self.stats["expired"] += 1
+                surplus = len(pool.idle) - pool.target(key == _DEFAULT_POOL_KEY)
+                for _ in range(max(0, surplus)):
+                    stale.append(pool.idle.popleft().info["container_id"])  # Oldest first
+                    self.stats["trimmed"] += 1
+            keys = list(self._pools)
+
+        if stale:
+            await asyncio.gather(*(asyncio.to_thread(self._remove, cid) for cid in stale))
+        for key in keys:
+            await self.replenish(key)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _ensure_maintenance(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(POOL_MAINTENANCE_SECONDS)
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Warm Pool] Maintenance failed: {e}")
+
+    async def shutdown(self) -> None:
+        """Stop maintenance and remove every idle warm container."""
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        with self._lock:
+            idle = [w.info["container_id"] for pool in self._pools.values() for w in pool.idle]
+            for pool in self._pools.values():
+                pool.idle.clear()
+        if idle and self._docker is not None:
+            await asyncio.gather(*(asyncio.to_thread(self._remove, cid) for cid in idle))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = [
+                {
+                    "image": key[0],
+                    "cpu_limit": key[1],
+                    "memory_limit_mb": key[2],
+                    "network_mode": key[3],
+                    "idle": len(pool.idle),
+                    "creating": pool.creating,
+                    "target": pool.target(key == _DEFAULT_POOL_KEY),
+                    "requests_per_min": round(len(pool.requests) * 60 / REQUEST_RATE_WINDOW_SECONDS, 2),
+                }
+                for key, pool in self._pools.items()
+            ]
+        requests = self.stats["warm_hits"] + self.stats["cold_starts"]
+        return {
+            **self.stats,
+            "warm_hit_rate": round(self.stats["warm_hits"] / requests, 3) if requests else None,
+            "warm_latency_ms": {"p50": _percentile(self._warm_ms, 0.5), "p95": _percentile(self._warm_ms, 0.95)},
+            "cold_latency_ms": {"p50": _percentile(self._cold_ms, 0.5), "p95": _percentile(self._cold_ms, 0.95)},
+            "pools": pools,
+        }
+
+
+# Global instance
+sandbox_pool = SandboxPoolManager()
+
+
+class SandboxManager:
+    """
+    Manages Docker sandbox containers for remote code execution.
+
+    Each execution runs in an isolated container with resource limits.
+    Containers are ephemeral – taken from the shared warm pool (or created)
+    per execution and destroyed after.
+    """
+
+    def __init__(self):
+        self.pool = sandbox_pool
+
+    @property
+    def docker_client(self):
+        return self.pool.docker_client
+
     async def create_sandbox(
         self,
         agent_id: str,
@@ -153,43 +421,11 @@ class SandboxManager:
         Returns:
             Dict with sandbox_id, container_id, status
         """
-        import asyncio
         if not self.docker_client:
             raise RuntimeError("Docker client not available")
 
-        await self._ensure_pool_lock()
-        
-        warm_container = None
-        # Fast path: try to pop from warm pool
-        async with self._pool_lock:
-            if self._warm_pool:
-                warm_container = self._warm_pool.pop()
-                
-        if warm_container:
-            logger.info(f"Popped warm sandbox {warm_container['sandbox_id']} for agent {agent_id}. Replenishing pool...")
-            # Claim it by updating labels (best effort)
-            try:
-                container = self.docker_client.containers.get(warm_container['container_id'])
-                # Docker doesn't support updating labels on running containers easily,
-                # but we logically track it in our system now.
-            except Exception as e:
-                logger.warning(f"Could not retrieve warm container {warm_container['sandbox_id']}: {e}")
-            
-            # Kick off background replenishment
-            asyncio.create_task(self._replenish_warm_pool(config))
-            return warm_container
-            
-        # Slow path: create on demand if pool is empty
-        logger.warning(f"Warm pool empty. Cold-starting sandbox for agent {agent_id}")
-        config = config or SandboxConfig()
-        
         try:
-            container_info = await self._create_raw_container(agent_id, config)
-            logger.info(f"Created cold sandbox {container_info['sandbox_id']} for agent {agent_id}")
-            # Still kick off background replenishment to fix the empty pool
-            asyncio.create_task(self._replenish_warm_pool(config))
-            return container_info
-
+            return await self.pool.acquire(agent_id, config or SandboxConfig())
         except Exception as e:
             logger.error(f"Failed to create sandbox: {e}")
             raise RuntimeError(f"Sandbox creation failed: {e}")
@@ -213,12 +449,14 @@ class SandboxManager:
             return False
 
         try:
-            container = self.docker_client.containers.get(sandbox_id)
+            def _stop_and_remove():
+                container = self.docker_client.containers.get(sandbox_id)
 
-            # Force remove after 5 second grace period
-            container.stop(timeout=5)
-            container.remove(force=True)
+                # Force remove after 5 second grace period
+                container.stop(timeout=5)
+                container.remove(force=True)
 
+            await asyncio.to_thread(_stop_and_remove)
             logger.info(f"Destroyed sandbox {sandbox_id}: {reason}")
             return True
 
@@ -252,7 +490,8 @@ class SandboxManager:
             if agent_id:
                 filters["label"].append(f"agentium.agent_id={agent_id}")
 
-            containers = self.docker_client.containers.list(
+            containers = await asyncio.to_thread(
+                self.docker_client.containers.list,
                 all=True,
                 filters=filters
             )
@@ -6,16 +6,23 @@ Handles creation, retrieval, updating, and governance of skills.
 import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
 from backend.models.entities.skill import SkillSchema, SkillDB, SkillSubmission, CHROMA_CHAR_LIMIT
 from backend.models.entities.task import Task
 from backend.models.entities.agents import Agent
-from backend.core.vector_store import get_vector_store
+from backend.core.vector_store import EMBEDDING_MODEL, get_vector_store
 from backend.services.knowledge_governance import KnowledgeGovernanceService
 
 logger = logging.getLogger(__name__)
 
+# Collections searched by SkillManager.search_skills
+SKILL_SEARCH_COLLECTIONS = ["agent_skills", "best_practices", "constitutional_skills"]
+
+# SentenceTransformer instances for skills pinned to a non-default model
+_other_models: Dict[str, Any] = {}
+
 
 class SkillManager:
     """
@@ -140,13 +147,11 @@ class SkillManager:
             chroma_id = f"{skill_id}_v{skill.version}"
             collection = self.vector_store.get_collection(skill.chroma_collection)
 
-            from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer(skill.embedding_model)
-            embedding = model.encode(chroma_doc)
+            embedding = self._embed_document(chroma_doc, skill.embedding_model)
 
             collection.add(
                 ids=[chroma_id],
-                embeddings=[embedding.tolist()],
+                embeddings=[embedding],
                 documents=[chroma_doc],
                 metadatas=[skill.to_chroma_metadata()]
             )
@@ -210,6 +215,20 @@ class SkillManager:
             "skill_name": skill.display_name
         })
 
+    def _embed_document(self, doc: str, model_name: str) -> List[float]:
+        """
+        Embed *doc* with *model_name*.  The default model goes through the
+        vector store's shared (cached, batched) embedding function; any
+        other model is loaded once per process.
+        """
+        if model_name == EMBEDDING_MODEL:
+            return self.vector_store.embed([doc])[0]
+        model = _other_models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = _other_models[model_name] = SentenceTransformer(model_name)
+        return model.encode(doc).tolist()
+
     # ═══════════════════════════════════════════════════════════
     # RETRIEVE Operations (RAG)
     # ═══════════════════════════════════════════════════════════
@@ -241,50 +260,63 @@ class SkillManager:
             if filters:
                 where_clause = {"$and": [where_clause, filters]}
 
-            from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-            query_embedding = model.encode(query)
+            # One embedding pass on the shared model; the three collections
+            # are queried concurrently (failing ones are logged and skipped)
+            by_collection = self.vector_store.query_collections(
+                [query],
+                SKILL_SEARCH_COLLECTIONS,
+                n_results=n_results,
+                filter_dict=where_clause,
+            )
 
-            all_results = []
-            for collection_name in ["agent_skills", "best_practices", "constitutional_skills"]:
-                try:
-                    collection = self.vector_store.get_collection(collection_name)
-                    results = collection.query(
-                        query_embeddings=[query_embedding.tolist()],
-                        n_results=n_results,
-                        where=where_clause,
-                        include=["documents", "metadatas", "distances"]
+            hits = []
+            for collection_name in SKILL_SEARCH_COLLECTIONS:
+                results = by_collection.get(collection_name)
+                if not results or not results['ids'][0]:
+                    continue
+                for doc_id, doc, meta, dist in zip(
+                    results['ids'][0],
+                    results['documents'][0],
+                    results['metadatas'][0],
+                    results['distances'][0]
+                ):
+                    hits.append((collection_name, doc_id, doc, meta, dist))
+
+            # Hydrate every hit with one query, then count the retrievals
+            # with one UPDATE instead of mutating row by row
+            chroma_ids = list({doc_id for _, doc_id, _, _, _ in hits})
+            records = {}
+            if chroma_ids:
+                # Serialized before the commit below expires the instances
+                records = {
+                    row.chroma_id: row.to_dict()
+                    for row in db.query(SkillDB).filter(SkillDB.chroma_id.in_(chroma_ids)).all()
+                }
+            if records:
+                db.execute(
+                    update(SkillDB)
+                    .where(SkillDB.chroma_id.in_(list(records)))
+                    .values(
+                        retrieval_count=func.coalesce(SkillDB.retrieval_count, 0) + 1,
+                        last_retrieved=datetime.utcnow(),
                     )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
 
-                    if results and results['ids'][0]:
-                        for doc_id, doc, meta, dist in zip(
-                            results['ids'][0],
-                            results['documents'][0],
-                            results['metadatas'][0],
-                            results['distances'][0]
-                        ):
-                            skill_db = db.query(SkillDB).filter_by(chroma_id=doc_id).first()
-
-                            all_results.append({
-                                "skill_id": meta.get("skill_id"),
-                                "chroma_id": doc_id,
-                                "relevance_score": max(0.0, 1.0 - dist),
-                                "semantic_distance": dist,
-                                # content_preview: full stored doc (already capped at CHROMA_CHAR_LIMIT)
-                                "content_preview": doc,
-                                "metadata": meta,
-                                "db_record": skill_db.to_dict() if skill_db else None,
-                                "collection": collection_name
-                            })
-
-                            if skill_db:
-                                skill_db.retrieval_count += 1
-                                skill_db.last_retrieved = datetime.utcnow()
-
-                except Exception as col_err:
-                    logger.warning("search_skills: collection '%s' query failed: %s", collection_name, col_err)
-
-            db.commit()
+            all_results = []
+            for collection_name, doc_id, doc, meta, dist in hits:
+                all_results.append({
+                    "skill_id": meta.get("skill_id"),
+                    "chroma_id": doc_id,
+                    "relevance_score": max(0.0, 1.0 - dist),
+                    "semantic_distance": dist,
+                    # content_preview: full stored doc (already capped at CHROMA_CHAR_LIMIT)
+                    "content_preview": doc,
+                    "metadata": meta,
+                    "db_record": records.get(doc_id),
+                    "collection": collection_name
+                })
 
             # Sort by relevance descending, then deduplicate by skill_id
             # keeping the highest-scoring hit when a skill appears in multiple collections
@@ -371,13 +403,11 @@ class SkillManager:
         chroma_id = f"{skill_id}_v{new_version}"
         collection = self.vector_store.get_collection(new_skill.chroma_collection)
 
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer(new_skill.embedding_model)
-        embedding = model.encode(chroma_doc)
+        embedding = self._embed_document(chroma_doc, new_skill.embedding_model)
 
         collection.add(
             ids=[chroma_id],
-            embeddings=[embedding.tolist()],
+            embeddings=[embedding],
             documents=[chroma_doc],
             metadatas=[new_skill.to_chroma_metadata()]
         )
@@ -3,7 +3,7 @@ Task State Machine Service for Agentium.
 Enforces legal state transitions according to Governance Architecture.
 """
 
-from typing import Dict, List, Set
+from typing import Dict, FrozenSet, List, Set
 from enum import Enum
 
 from backend.models.entities.task import TaskStatus
@@ -95,6 +95,13 @@ class TaskStateMachine:
         TaskStatus.REJECTED: set()         # Terminal
     }
     
+    # Reaching one of these lets later-ordered sibling sub-tasks start
+    # (see services/dag_scheduler.py)
+    DEPENDENCY_RELEASING_STATES: FrozenSet[TaskStatus] = frozenset({
+        TaskStatus.COMPLETED,
+        TaskStatus.CANCELLED,
+    })
+
     @classmethod
     def validate_transition(cls, current: TaskStatus, proposed: TaskStatus) -> bool:
         """
@@ -134,6 +141,11 @@ class TaskStateMachine:
         """Check if status is a terminal state (no further transitions)."""
         return len(cls.LEGAL_TRANSITIONS.get(status, set())) == 0
     
+    @classmethod
+    def releases_dependents(cls, status: TaskStatus) -> bool:
+        """Check if reaching *status* satisfies the task's DAG dependency."""
+        return status in cls.DEPENDENCY_RELEASING_STATES
+
     @classmethod
     def can_transition_to(cls, current: TaskStatus, proposed: TaskStatus) -> bool:
         """Check if transition is possible without raising exception."""
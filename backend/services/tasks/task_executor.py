@@ -175,7 +175,7 @@ def execute_task_async(self, task_id: str, agent_id: str):
                 vs = get_vector_store()
                 try:
                     results = vs.get_collection("task_patterns").query(
-                        query_texts=[str(exc)],
+                        query_embeddings=vs.embed([str(exc)]),
                         n_results=3,
                         where={"type": "anti_pattern"}
                     )
@@ -991,90 +991,46 @@ def check_escalation_timeouts():
             return {"error": str(e)}
 
 
-@celery_app.task(name='backend.services.tasks.task_executor.process_dependency_graph')
-def process_dependency_graph():
+@celery_app.task(name='backend.services.tasks.task_executor.advance_dependency_graph')
+def advance_dependency_graph(finished_task_ids: list, ready_child_ids: list = None):
     """
-    Dependency graph processor: for each parent task with TaskDependency rows,
-    checks which child tasks are ready (all dependencies of lower order are
-    complete) and dispatches them.
+    Event path of the dependency scheduler: queued after commit when sub-tasks
+    finish or dependency rows are created ready, dispatches the children
+    whose last open predecessor just completed.
     """
+    from backend.services.dag_scheduler import dependency_scheduler
+
     with get_task_db() as db:
-        try:
-            from backend.models.entities.task import TaskDependency
+        dispatched = dependency_scheduler.advance(db, finished_task_ids, ready_child_ids or [])
 
-            # Get all pending dependency records
-            pending_deps = db.query(TaskDependency).filter(
-                TaskDependency.status == "pending",
-            ).all()
+    # Queue only once the IN_PROGRESS transitions are committed
+    _queue_dispatched_children(dispatched)
+    return {"dispatched": len(dispatched)}
 
-            if not pending_deps:
-                return {"dispatched": 0}
-
-            # Group by parent task
-            by_parent = {}
-            for dep in pending_deps:
-                by_parent.setdefault(dep.parent_task_id, []).append(dep)
-
-            dispatched = 0
-            for parent_id, deps in by_parent.items():
-                # Sort by dependency_order
-                deps.sort(key=lambda d: d.dependency_order)
-
-                for dep in deps:
-                    # Check: all deps with lower order for this parent must be complete
-                    lower_complete = db.query(TaskDependency).filter(
-                        TaskDependency.parent_task_id == parent_id,
-                        TaskDependency.dependency_order < dep.dependency_order,
-                        TaskDependency.status != "completed",
-                    ).count()
-
-                    if lower_complete > 0:
-                        continue  # Dependencies not yet met
-
-                    # Check if child task is still pending
-                    child = db.query(Task).filter_by(
-                        id=dep.child_task_id, is_active=True
-                    ).first()
-
-                    if not child or child.status != TaskStatus.PENDING:
-                        # Already started or completed
-                        if child and child.status in (TaskStatus.COMPLETED, TaskStatus.CANCELLED):
-                            dep.status = "completed"
-                        continue
-
-                    # Dispatch the child task
-                    try:
-                        child.status = TaskStatus.IN_PROGRESS
-                        child.started_at = datetime.utcnow()
-                        dep.status = "dispatched"
-                        dispatched += 1
-
-                        # Actually queue the task for execution — previously this was
-                        # missing, leaving child tasks perpetually stuck in IN_PROGRESS
-                        # with no Celery worker ever picking them up.
-                        assigned_agent_id = getattr(child, 'assigned_agent_id', None)
-                        if assigned_agent_id:
-                            execute_task_async.delay(child.agentium_id, assigned_agent_id)
-                            logger.info(
-                                f"📊 DAG: dispatched child task {child.agentium_id} "
-                                f"(order={dep.dependency_order}) for parent {parent_id}"
-                            )
-                        else:
-                            logger.warning(
-                                f"📊 DAG: child task {child.agentium_id} has no assigned_agent_id "
-                                f"— marked IN_PROGRESS but not queued for execution"
-                            )
-                    except Exception as e:
-                        logger.warning(f"Failed to dispatch child task: {e}")
 
-            if dispatched:
-                db.commit()
+@celery_app.task(name='backend.services.tasks.task_executor.process_dependency_graph')
+def process_dependency_graph():
+    """
+    Dependency graph safety net: reconciles every TaskDependency counter in
+    set-based SQL and dispatches ready children the event path missed.
+    """
+    from backend.services.dag_scheduler import dependency_scheduler
 
-            return {"dispatched": dispatched, "parents_checked": len(by_parent)}
+    try:
+        with get_task_db() as db:
+            result = dependency_scheduler.sweep(db)
+    except Exception as e:
+        logger.error(f"process_dependency_graph failed: {e}")
+        return {"error": str(e)}
 
-        except Exception as e:
-            logger.error(f"process_dependency_graph failed: {e}")
-            return {"error": str(e)}
+    _queue_dispatched_children(result["dispatched"])
+    return {"dispatched": len(result["dispatched"]), "released": result["released"]}
+
+
+def _queue_dispatched_children(dispatched) -> None:
+    for child_agentium_id, agent_id in dispatched:
+        if agent_id:
+            execute_task_async.delay(child_agentium_id, agent_id)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -1202,7 +1158,10 @@ def metrics_snapshot():
     """
     with get_task_db() as db:
         try:
+            from backend.services.metrics_counters import metrics_counters
             from backend.services.predictive_scaling import predictive_scaling_service
+            # Reset the dashboard gauges from the tables so drift cannot build up
+            metrics_counters.reconcile(db)
             result = predictive_scaling_service.snapshot_metrics(db)
             return {"status": "success", "snapshot": result}
         except Exception as e:
@@ -1362,4 +1321,27 @@ def poll_wait_conditions():
             return summary
         except Exception as exc:
             logger.error(f"poll_wait_conditions failed: {exc}", exc_info=True)
-            return {"error": str(exc)}
\ No newline at end of file
+            return {"error": str(exc)}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Tool analytics rollups
+# ══════════════════════════════════════════════════════════════════════════════
+
+@celery_app.task(name='backend.services.tasks.task_executor.rollup_tool_usage')
+def rollup_tool_usage():
+    """
+    Fold closed hours of ToolUsageLog into ToolUsageHourlyRollup.
+
+    Runs every 5 minutes via Celery Beat; the first run backfills the last
+    30 days.  Tool stats endpoints read the rollups instead of raw logs.
+    """
+    with get_task_db() as db:
+        try:
+            from backend.services.tool_analytics import ToolAnalyticsService
+            summary = ToolAnalyticsService(db).rollup_pending_hours()
+            if summary.get("rollups_written"):
+                logger.info(f"rollup_tool_usage: {summary}")
+            return summary
+        except Exception as exc:
+            logger.error(f"rollup_tool_usage failed: {exc}", exc_info=True)
+            return {"error": str(exc)}
@@ -4,6 +4,13 @@ Records every tool invocation in ToolUsageLog and surfaces
 aggregated stats: call counts, error rates, p50/p95 latency,
 top callers, usage over time.
 
+Stats are read from ToolUsageHourlyRollup (one row per tool and hour,
+maintained by the rollup_tool_usage Celery task) plus a live scan of the
+hours not rolled up yet, so a 30-day report never loads 30 days of raw
+rows.  Latency percentiles come from mergeable log-scale histograms: each
+bucket spans a quarter of a doubling, so p50/p95/p99 are accurate to
+within ~10% and any range of hours can be combined by adding counts.
+
 Usage:
     analytics = ToolAnalyticsService(db)
 
@@ -17,15 +24,162 @@ Usage:
     report = analytics.get_full_report()
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import Dict, Any, List, Optional
+from sqlalchemy import func, case
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 import hashlib
 import json
+import math
 import time
 
-from backend.models.entities.tool_usage_log import ToolUsageLog
+from backend.models.entities.tool_usage_log import ToolUsageLog, ToolUsageHourlyRollup
+from backend.services.usage_log_writer import usage_log_writer
+
+LATENCY_BUCKETS_PER_DOUBLING = 4     # bucket i holds latencies in (2^((i-1)/4), 2^(i/4)] ms
+ROLLUP_BACKFILL_DAYS = 30            # First rollup run covers this much history
+ROLLUP_ERROR_KEYS_PER_HOUR = 50      # Distinct error messages kept per rollup row
+_OTHER_ERRORS = "(other)"
+
+
+def _hour_floor(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _latency_bucket(latency_ms: float) -> int:
+    if latency_ms <= 1.0:
+        return 0
+    return math.ceil(math.log2(latency_ms) * LATENCY_BUCKETS_PER_DOUBLING)
+
+
+def _bucket_value(index: int) -> float:
+    """Geometric midpoint of a bucket - the estimate reported for a percentile."""
+    if index <= 0:
+        return 1.0
+    return 2 ** ((index - 0.5) / LATENCY_BUCKETS_PER_DOUBLING)
+
+
+class _UsageAggregate:
+    """
+    Mergeable summary of a set of tool calls.
+
+    Built from raw ToolUsageLog rows (add_call) or existing rollups
+    (merge_rollup); both produce the same shape, so hourly rollups and the
+    live tail of the current hour combine into one set of stats.
+    """
+
+    __slots__ = (
+        "calls", "errors", "latency_count", "latency_sum", "latency_min",
+        "latency_max", "histogram", "callers", "error_messages", "daily",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_min: Optional[float] = None
+        self.latency_max: Optional[float] = None
+        self.histogram: Dict[int, int] = {}
+        self.callers: Dict[str, int] = {}
+        self.error_messages: Dict[str, int] = {}
+        self.daily: Dict[str, int] = {}
+
+    def add_call(
+        self,
+        success: bool,
+        latency_ms: Optional[float],
+        caller: Optional[str],
+        error_message: Optional[str],
+        invoked_at: Optional[datetime] = None,
+    ) -> None:
+        self.calls += 1
+        if caller:
+            self.callers[caller] = self.callers.get(caller, 0) + 1
+        if not success:
+            self.errors += 1
+            key = (error_message or "unknown")[:80]
+            self.error_messages[key] = self.error_messages.get(key, 0) + 1
+        if latency_ms is not None:
+            self._add_latency(latency_ms)
+        if invoked_at is not None:
+            day = invoked_at.strftime("%Y-%m-%d")
+            self.daily[day] = self.daily.get(day, 0) + 1
+
+    def _add_latency(self, latency_ms: float) -> None:
+        self.latency_count += 1
+        self.latency_sum += latency_ms
+        if self.latency_min is None or latency_ms < self.latency_min:
+            self.latency_min = latency_ms
+        if self.latency_max is None or latency_ms > self.latency_max:
+            self.latency_max = latency_ms
+        bucket = _latency_bucket(latency_ms)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def merge_rollup(self, rollup: ToolUsageHourlyRollup) -> None:
+        self.calls += rollup.call_count or 0
+        self.errors += rollup.error_count or 0
+        self.latency_count += rollup.latency_count or 0
+        self.latency_sum += rollup.latency_sum_ms or 0.0
+        if rollup.latency_min_ms is not None:
+            if self.latency_min is None or rollup.latency_min_ms < self.latency_min:
+                self.latency_min = rollup.latency_min_ms
+        if rollup.latency_max_ms is not None:
+            if self.latency_max is None or rollup.latency_max_ms > self.latency_max:
+                self.latency_max = rollup.latency_max_ms
+        # JSON round-trips turn bucket indexes into strings
+        for bucket, count in (rollup.latency_histogram or {}).items():
+            bucket = int(bucket)
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+        for caller, count in (rollup.caller_counts or {}).items():
+            self.callers[caller] = self.callers.get(caller, 0) + count
+        for message, count in (rollup.error_counts or {}).items():
+            self.error_messages[message] = self.error_messages.get(message, 0) + count
+        day = rollup.hour_start.strftime("%Y-%m-%d")
+        self.daily[day] = self.daily.get(day, 0) + (rollup.call_count or 0)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latency_count:
+            return None
+        rank = min(self.latency_count, int(self.latency_count * q) + 1)
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= rank:
+                # Never report an estimate outside the observed range
+                return min(max(_bucket_value(bucket), self.latency_min), self.latency_max)
+        return self.latency_max
+
+    def latency_stats(self) -> Dict[str, Any]:
+        if not self.latency_count:
+            return {}
+        return {
+            "min_ms": round(self.latency_min, 2),
+            "max_ms": round(self.latency_max, 2),
+            "avg_ms": round(self.latency_sum / self.latency_count, 2),
+            "p50_ms": round(self.percentile(0.50), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "p99_ms": round(self.percentile(0.99), 2),
+        }
+
+    def rollup_values(self) -> Dict[str, Any]:
+        """Column values for a ToolUsageHourlyRollup row."""
+        error_counts = self.error_messages
+        if len(error_counts) > ROLLUP_ERROR_KEYS_PER_HOUR:
+            ranked = sorted(error_counts.items(), key=lambda x: -x[1])
+            error_counts = dict(ranked[:ROLLUP_ERROR_KEYS_PER_HOUR - 1])
+            error_counts[_OTHER_ERRORS] = sum(c for _, c in ranked[ROLLUP_ERROR_KEYS_PER_HOUR - 1:])
+        return {
+            "call_count": self.calls,
+            "error_count": self.errors,
+            "latency_count": self.latency_count,
+            "latency_sum_ms": self.latency_sum,
+            "latency_min_ms": self.latency_min,
+            "latency_max_ms": self.latency_max,
+            "latency_histogram": {str(b): c for b, c in self.histogram.items()},
+            "caller_counts": dict(self.callers),
+            "error_counts": error_counts,
+        }
 
 
 class _RecordingContext:
@@ -133,34 +287,43 @@ class ToolAnalyticsService:
     ) -> Dict[str, Any]:
         """
         Return aggregated stats for a single tool over the last N days.
+
+        The window is counted in whole hours (the hour containing the
+        start of the period is included).
         """
-        since = datetime.utcnow() - timedelta(days=days)
-        rows = (
-            self.db.query(ToolUsageLog)
+        now = datetime.utcnow()
+        start_hour = _hour_floor(now - timedelta(days=days))
+        watermark = max(self._rollup_watermark() or start_hour, start_hour)
+
+        agg = _UsageAggregate()
+        rollups = (
+            self.db.query(ToolUsageHourlyRollup)
             .filter(
-                ToolUsageLog.tool_name == tool_name,
-                ToolUsageLog.invoked_at >= since,
+                ToolUsageHourlyRollup.tool_name == tool_name,
+                ToolUsageHourlyRollup.hour_start >= start_hour,
+                ToolUsageHourlyRollup.hour_start < watermark,
             )
-            .all()
         )
+        for rollup in rollups:
+            agg.merge_rollup(rollup)
+        for row in self._raw_calls(watermark, now, tool_name=tool_name):
+            agg.add_call(row.success, row.latency_ms, row.called_by_agentium_id,
+                         row.error_message, row.invoked_at)
 
-        if not rows:
+        if not agg.calls:
             return {"tool_name": tool_name, "period_days": days, "total_calls": 0}
 
-        latencies = [r.latency_ms for r in rows if r.latency_ms is not None]
-        errors = [r for r in rows if not r.success]
-
         return {
             "tool_name": tool_name,
             "period_days": days,
-            "total_calls": len(rows),
-            "successful_calls": len(rows) - len(errors),
-            "failed_calls": len(errors),
-            "error_rate_pct": round(len(errors) / len(rows) * 100, 2),
-            "latency": self._latency_stats(latencies),
-            "top_callers": self._top_callers(rows),
-            "errors_breakdown": self._errors_breakdown(errors),
-            "daily_breakdown": self._daily_breakdown(rows, days),
+            "total_calls": agg.calls,
+            "successful_calls": agg.calls - agg.errors,
+            "failed_calls": agg.errors,
+            "error_rate_pct": round(agg.errors / agg.calls * 100, 2),
+            "latency": agg.latency_stats(),
+            "top_callers": self._top_callers(agg.callers),
+            "errors_breakdown": agg.error_messages,
+            "daily_breakdown": self._daily_breakdown(agg.daily, days),
         }
 
     # ──────────────────────────────────────────────────────────────
@@ -171,33 +334,58 @@ class ToolAnalyticsService:
         """
         Summary report across all tools.
         """
-        since = datetime.utcnow() - timedelta(days=days)
+        now = datetime.utcnow()
+        start_hour = _hour_floor(now - timedelta(days=days))
+        watermark = max(self._rollup_watermark() or start_hour, start_hour)
+
+        # tool_name -> [calls, errors, latency_sum, latency_count]
+        totals: Dict[str, List[float]] = {}
 
-        tool_totals = (
+        rolled = (
+            self.db.query(
+                ToolUsageHourlyRollup.tool_name,
+                func.sum(ToolUsageHourlyRollup.call_count),
+                func.sum(ToolUsageHourlyRollup.error_count),
+                func.sum(ToolUsageHourlyRollup.latency_sum_ms),
+                func.sum(ToolUsageHourlyRollup.latency_count),
+            )
+            .filter(
+                ToolUsageHourlyRollup.hour_start >= start_hour,
+                ToolUsageHourlyRollup.hour_start < watermark,
+            )
+            .group_by(ToolUsageHourlyRollup.tool_name)
+        )
+        live = (
             self.db.query(
                 ToolUsageLog.tool_name,
-                func.count(ToolUsageLog.id).label("total"),
-                func.sum(
-                    func.cast(ToolUsageLog.success == False, func.Integer)
-                ).label("errors"),
-                func.avg(ToolUsageLog.latency_ms).label("avg_latency"),
+                func.count(ToolUsageLog.id),
+                func.sum(case((ToolUsageLog.success == False, 1), else_=0)),
+                func.sum(ToolUsageLog.latency_ms),
+                func.count(ToolUsageLog.latency_ms),
             )
-            .filter(ToolUsageLog.invoked_at >= since)
+            .filter(ToolUsageLog.invoked_at >= watermark)
             .group_by(ToolUsageLog.tool_name)
-            .order_by(desc("total"))
-            .all()
         )
-
-        tools_summary = [
-            {
-                "tool_name": row.tool_name,
-                "total_calls": row.total,
-                "failed_calls": int(row.errors or 0),
-                "error_rate_pct": round((row.errors or 0) / row.total * 100, 2),
-                "avg_latency_ms": round(row.avg_latency or 0, 2),
-            }
-            for row in tool_totals
-        ]
+        for tool_name, calls, errors, latency_sum, latency_count in list(rolled) + list(live):
+            entry = totals.setdefault(tool_name, [0, 0, 0.0, 0])
+            entry[0] += calls or 0
+            entry[1] += errors or 0
+            entry[2] += latency_sum or 0.0
+            entry[3] += latency_count or 0
+
+        tools_summary = sorted(
+            (
+                {
+                    "tool_name": tool_name,
+                    "total_calls": int(calls),
+                    "failed_calls": int(errors),
+                    "error_rate_pct": round(errors / calls * 100, 2) if calls else 0,
+                    "avg_latency_ms": round(latency_sum / latency_count, 2) if latency_count else 0,
+                }
+                for tool_name, (calls, errors, latency_sum, latency_count) in totals.items()
+            ),
+            key=lambda t: -t["total_calls"],
+        )
 
         total_calls = sum(t["total_calls"] for t in tools_summary)
         total_errors = sum(t["failed_calls"] for t in tools_summary)
@@ -211,6 +399,63 @@ class ToolAnalyticsService:
             "tools": tools_summary,
         }
 
+    # ──────────────────────────────────────────────────────────────
+    # ROLLUPS
+    # ──────────────────────────────────────────────────────────────
+
+    def rollup_pending_hours(self) -> Dict[str, Any]:
+        """
+        Roll up every closed hour since the last rollup.
+
+        The most recent rolled-up hour is recomputed as well, which picks up
+        rows the batched log writer flushed after that hour was first rolled.
+        """
+        latest = self.db.query(func.max(ToolUsageHourlyRollup.hour_start)).scalar()
+        end = _hour_floor(datetime.utcnow())
+        start = latest or _hour_floor(end - timedelta(days=ROLLUP_BACKFILL_DAYS))
+        written = self.rollup_hours(start, end)
+        return {"from": start.isoformat(), "to": end.isoformat(), "rollups_written": written}
+
+    def rollup_hours(self, start: datetime, end: datetime) -> int:
+        """
+        (Re)compute the rollup rows for every hour in [start, end).
+
+        Idempotent: a (tool, hour) row is rewritten from the raw logs each
+        time.  Rows whose raw logs have since been purged are left alone, so
+        rollups outlive log retention.  Returns the number of rows written.
+        """
+        start, end = _hour_floor(start), _hour_floor(end)
+        if end <= start:
+            return 0
+
+        aggregates: Dict[Tuple[str, datetime], _UsageAggregate] = {}
+        for row in self._raw_calls(start, end):
+            key = (row.tool_name, _hour_floor(row.invoked_at))
+            agg = aggregates.get(key)
+            if agg is None:
+                agg = aggregates[key] = _UsageAggregate()
+            agg.add_call(row.success, row.latency_ms, row.called_by_agentium_id, row.error_message)
+        if not aggregates:
+            return 0
+
+        existing = {
+            (r.tool_name, r.hour_start): r
+            for r in self.db.query(ToolUsageHourlyRollup).filter(
+                ToolUsageHourlyRollup.hour_start >= start,
+                ToolUsageHourlyRollup.hour_start < end,
+            )
+        }
+        for (tool_name, hour_start), agg in aggregates.items():
+            values = agg.rollup_values()
+            rollup = existing.get((tool_name, hour_start))
+            if rollup is None:
+                self.db.add(ToolUsageHourlyRollup(tool_name=tool_name, hour_start=hour_start, **values))
+            else:
+                for column, value in values.items():
+                    setattr(rollup, column, value)
+        self.db.commit()
+        return len(aggregates)
+
     # ──────────────────────────────────────────────────────────────
     # STATS — per-agent
     # ──────────────────────────────────────────────────────────────
@@ -276,13 +521,14 @@ class ToolAnalyticsService:
     # INTERNAL HELPERS
     # ──────────────────────────────────────────────────────────────
 
-    def _write_log(self, **kwargs):
-        log = ToolUsageLog(**kwargs, invoked_at=datetime.utcnow())
-        self.db.add(log)
-        try:
-            self.db.commit()
-        except Exception:
-            self.db.rollback()  # Never let analytics writes break the main flow
+    def _write_log(self, called_by: str, **kwargs):
+        # Queued for the batched writer: never touches self.db, so analytics
+        # writes can neither block nor break the caller's transaction.
+        usage_log_writer.submit(ToolUsageLog, {
+            **kwargs,
+            "called_by_agentium_id": called_by,
+            "invoked_at": datetime.utcnow(),
+        })
 
     def _hash_input(self, kwargs: dict) -> str:
         try:
@@ -291,48 +537,43 @@ class ToolAnalyticsService:
         except Exception:
             return "hash_error"
 
-    def _latency_stats(self, latencies: List[float]) -> Dict[str, Any]:
-        if not latencies:
-            return {}
-        sorted_l = sorted(latencies)
-        n = len(sorted_l)
-        return {
-            "min_ms": round(sorted_l[0], 2),
-            "max_ms": round(sorted_l[-1], 2),
-            "avg_ms": round(sum(sorted_l) / n, 2),
-            "p50_ms": round(sorted_l[int(n * 0.50)], 2),
-            "p95_ms": round(sorted_l[int(n * 0.95)], 2),
-            "p99_ms": round(sorted_l[int(n * 0.99)], 2),
-        }
+    def _rollup_watermark(self) -> Optional[datetime]:
+        """First hour not covered by rollups (``None`` before the first rollup)."""
+        latest = self.db.query(func.max(ToolUsageHourlyRollup.hour_start)).scalar()
+        return latest + timedelta(hours=1) if latest else None
+
+    def _raw_calls(
+        self, start: datetime, end: datetime, tool_name: Optional[str] = None
+    ) -> Iterable[Any]:
+        """Stream just the columns the aggregates need, never whole entities."""
+        q = self.db.query(
+            ToolUsageLog.tool_name,
+            ToolUsageLog.invoked_at,
+            ToolUsageLog.success,
+            ToolUsageLog.latency_ms,
+            ToolUsageLog.called_by_agentium_id,
+            ToolUsageLog.error_message,
+        ).filter(
+            ToolUsageLog.invoked_at >= start,
+            ToolUsageLog.invoked_at < end,
+        )
+        if tool_name:
+            q = q.filter(ToolUsageLog.tool_name == tool_name)
+        return q.yield_per(5000)
 
-    def _top_callers(self, rows: List[ToolUsageLog], top_n: int = 5) -> List[Dict]:
-        counts: Dict[str, int] = {}
-        for r in rows:
-            counts[r.called_by_agentium_id] = counts.get(r.called_by_agentium_id, 0) + 1
+    def _top_callers(self, counts: Dict[str, int], top_n: int = 5) -> List[Dict]:
         return [
             {"agentium_id": k, "calls": v}
             for k, v in sorted(counts.items(), key=lambda x: -x[1])[:top_n]
         ]
 
-    def _errors_breakdown(self, errors: List[ToolUsageLog]) -> Dict[str, int]:
-        breakdown: Dict[str, int] = {}
-        for e in errors:
-            key = (e.error_message or "unknown")[:80]
-            breakdown[key] = breakdown.get(key, 0) + 1
-        return breakdown
-
     def _daily_breakdown(
-        self, rows: List[ToolUsageLog], days: int
+        self, daily: Dict[str, int], days: int
     ) -> List[Dict[str, Any]]:
         """Calls per day for the last N days."""
-        daily: Dict[str, int] = {}
-        for r in rows:
-            day = r.invoked_at.strftime("%Y-%m-%d")
-            daily[day] = daily.get(day, 0) + 1
-
         # Fill in missing days with 0
         result = []
         for i in range(days - 1, -1, -1):
             day = (datetime.utcnow() - timedelta(days=i)).strftime("%Y-%m-%d")
             result.append({"date": day, "calls": daily.get(day, 0)})
-        return result
\ No newline at end of file
+        return result
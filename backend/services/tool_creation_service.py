@@ -21,6 +21,8 @@ from backend.services.tool_factory import ToolFactory
 from backend.services.tool_versioning import ToolVersioningService
 from backend.services.tool_analytics import ToolAnalyticsService
 from backend.core.tool_registry import tool_registry
+from backend.core.tool_execution import tool_execution_engine
+from backend.services.tool_version_map import active_tool_versions
 from backend.models.entities.agents import Agent
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -284,16 +286,42 @@ class ToolCreationService:
         """
         Execute a registered tool with automatic analytics recording.
         Use this instead of calling tool_registry directly when analytics is needed.
+        Async callers should prefer execute_tool_async().
         """
-        # Resolve current version number
-        from backend.models.entities.tool_version import ToolVersion
-        active_version = (
-            self.db.query(ToolVersion)
-            .filter(ToolVersion.tool_name == tool_name, ToolVersion.is_active == True)
-            .first()
-        )
-        version_number = active_version.version_number if active_version else 1
+        version_number = self._active_version_number(tool_name)
+        result = {}
+        with self.analytics.record(
+            tool_name=tool_name,
+            called_by=called_by,
+            task_id=task_id,
+            tool_version=version_number,
+            input_kwargs=kwargs,
+        ) as ctx:
+            tool = tool_registry.get_tool(tool_name)
+            if not tool:
+                ctx.set_error(f"Tool '{tool_name}' not found in registry")
+                return {"status": "error", "error": f"Tool '{tool_name}' not found"}
+
+            call_kwargs = self._inject_context(tool["function"], kwargs, called_by)
+            result = tool_execution_engine.run_sync(tool_name, tool["function"], call_kwargs, tool=tool)
+
+            if isinstance(result, dict):
+                ctx.set_output_size(len(str(result)))
 
+        return result
+
+    async def execute_tool_async(
+        self,
+        tool_name: str,
+        called_by: str,
+        kwargs: Dict[str, Any],
+        task_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of execute_tool(): async tools are awaited on the
+        caller's loop, sync tools run on the shared tool thread pool.
+        """
+        version_number = self._active_version_number(tool_name)
         result = {}
         with self.analytics.record(
             tool_name=tool_name,
@@ -302,48 +330,40 @@ class ToolCreationService:
             tool_version=version_number,
             input_kwargs=kwargs,
         ) as ctx:
-            tool_fn = tool_registry.get_tool_function(tool_name)
-            if not tool_fn:
+            tool = tool_registry.get_tool(tool_name)
+            if not tool:
                 ctx.set_error(f"Tool '{tool_name}' not found in registry")
                 return {"status": "error", "error": f"Tool '{tool_name}' not found"}
 
-            # Inject db + agent_id for tools whose signatures declare them
-            # (e.g. deep_think_tool).  Uses inspect so every existing tool
-            # is completely unaffected — they don't declare these params.
-            import inspect as _inspect
-            _sig = _inspect.signature(tool_fn)
-            if "db" in _sig.parameters:
-                kwargs["db"] = self.db
-            if "agent_id" in _sig.parameters and "agent_id" not in kwargs:
-                kwargs["agent_id"] = called_by
-
-            # Async-aware dispatch — deep_think and any future async tools
-            # return coroutines that must be run; all existing sync tools hit
-            # the else-branch and behave exactly as before.
-            import asyncio as _asyncio
-            if _inspect.iscoroutinefunction(tool_fn):
-                try:
-                    _loop = _asyncio.get_running_loop()
-                except RuntimeError:
-                    _loop = None
-                if _loop and _loop.is_running():
-                    # Already inside an event loop (FastAPI request context):
-                    # run the coroutine in a fresh thread so we don't deadlock.
-                    import concurrent.futures as _cf
-                    with _cf.ThreadPoolExecutor(max_workers=1) as _pool:
-                        result = _pool.submit(
-                            _asyncio.run, tool_fn(**kwargs)
-                        ).result(timeout=120)
-                else:
-                    result = _asyncio.run(tool_fn(**kwargs))
-            else:
-                result = tool_fn(**kwargs)
+            call_kwargs = self._inject_context(tool["function"], kwargs, called_by)
+            result = await tool_execution_engine.run(tool_name, tool["function"], call_kwargs, tool=tool)
 
             if isinstance(result, dict):
                 ctx.set_output_size(len(str(result)))
 
         return result
 
+    def _active_version_number(self, tool_name: str) -> int:
+        # In-process map kept current by versioning / deprecation events —
+        # no ToolVersion SELECT on the tool-call path.
+        return active_tool_versions.get(tool_name)
+
+    def _inject_context(self, tool_fn, kwargs: Dict[str, Any], called_by: str) -> Dict[str, Any]:
+        """
+        Inject db + agent_id for tools whose signatures declare them
+        (e.g. deep_think_tool).  The signature is inspected once per tool
+        function, so every existing tool is unaffected and pays nothing.
+        """
+        spec = tool_execution_engine.spec_for(tool_fn)
+        if not (spec.accepts("db") or spec.accepts("agent_id")):
+            return kwargs
+        call_kwargs = dict(kwargs)
+        if spec.accepts("db"):
+            call_kwargs["db"] = self.db
+        if spec.accepts("agent_id") and "agent_id" not in call_kwargs:
+            call_kwargs["agent_id"] = called_by
+        return call_kwargs
+
     # ──────────────────────────────────────────────────────────────
     # LIST
     # ──────────────────────────────────────────────────────────────
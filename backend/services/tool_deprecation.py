@@ -16,9 +16,11 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from backend.models.entities.tool_staging import ToolStaging
+from backend.models.entities.tool_version import ToolVersion
 from backend.models.entities.tool_usage_log import ToolUsageLog
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
 from backend.core.tool_registry import tool_registry
+from backend.services.tool_version_map import active_tool_versions
 
 
 MINIMUM_SUNSET_DAYS = 7  # At least 7 days warning before hard removal
@@ -173,7 +175,7 @@ class ToolDeprecationService:
         Hard-remove a tool that has passed its sunset date.
         - Removes from tool registry
         - Deletes generated file from disk
-        - Marks staging record as 'sunset'
+        - Marks staging record as 'sunset' and its versions inactive
         Can be forced early by Head (0xxxx) only.
         """
         staging = self.db.query(ToolStaging).filter(
@@ -213,10 +215,16 @@ class ToolDeprecationService:
         else:
             deleted_file = False
 
-        # Update record
+        # Update record; no version stays active, so the version map's
+        # periodic reload agrees with the removal below
         staging.status = "sunset"
+        self.db.query(ToolVersion).filter(
+            ToolVersion.tool_name == tool_name,
+            ToolVersion.is_active == True,
+        ).update({"is_active": False}, synchronize_session=False)
 
         self.db.commit()
+        active_tool_versions.remove(tool_name)
 
         self._audit(
             "tool_sunset",
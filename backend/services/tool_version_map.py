@@ -0,0 +1,159 @@
+"""
+Active Tool Version Map - in-process tool_name -> active version number.
+
+``ToolCreationService.execute_tool`` records the active version of every
+tool it runs.  Instead of a ``SELECT`` on ``tool_versions`` before each call,
+the map is loaded once (at startup, or lazily) and kept current by:
+  * ``ToolVersioningService`` (initial version, approve_update, rollback) and
+    ``ToolDeprecationService`` (sunset, which also deactivates the tool's
+    versions), after their commits, and
+  * the ``tool:versions:changes`` Redis channel, which carries those changes
+    to every other worker.
+A periodic full reload (``VERSION_MAP_MAX_AGE_SECONDS``) is the safety net for
+processes that do not run the Redis listener (e.g. Celery workers).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHANGES_CHANNEL = "tool:versions:changes"
+VERSION_MAP_MAX_AGE_SECONDS = 300
+DEFAULT_VERSION = 1  # Tools without a ToolVersion row (built-ins) report v1
+
+
+class ActiveToolVersionMap:
+    """Thread-safe map of tool_name -> active ToolVersion.version_number."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._origin = uuid.uuid4().hex                  # Ignore our own Redis notices
+        self._listener_task: Optional[asyncio.Task] = None
+        self._redis_sync = None
+
+    # ── Loading ──────────────────────────────────────────────────────
+
+    def reload(self) -> None:
+        """Rebuild the whole map from the active ``tool_versions`` rows."""
+        from backend.models.database import get_db_context
+        from backend.models.entities.tool_version import ToolVersion
+
+        with get_db_context() as session:
+            rows = (
+                session.query(ToolVersion.tool_name, ToolVersion.version_number)
+                .filter(ToolVersion.is_active == True)
+                .all()
+            )
+        with self._lock:
+            self._versions = {name: number for name, number in rows}
+            self._loaded_at = time.monotonic()
+        logger.info("Active tool version map loaded: %d tools", len(rows))
+
+    def _ensure_loaded(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < VERSION_MAP_MAX_AGE_SECONDS:
+            return
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the last known map rather than failing tool calls
+            logger.warning("Active tool version map reload failed: %s", e)
+            with self._lock:
+                self._loaded_at = time.monotonic()
+
+    # ── Queries / updates ────────────────────────────────────────────
+
+    def get(self, tool_name: str) -> int:
+        """Active version number of *tool_name* (``1`` when it has none recorded)."""
+        self._ensure_loaded()
+        return self._versions.get(tool_name, DEFAULT_VERSION)
+
+    def set(self, tool_name: str, version_number: int, publish: bool = True) -> None:
+        """Record a newly activated version (call after the commit)."""
+        with self._lock:
+            self._versions[tool_name] = version_number
+        if publish:
+            self._publish(tool_name, version_number)
+
+    def remove(self, tool_name: str, publish: bool = True) -> None:
+        """Forget a tool that no longer has an active version (sunset)."""
+        with self._lock:
+            self._versions.pop(tool_name, None)
+        if publish:
+            self._publish(tool_name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tools": len(self._versions),
+            "loaded": self._loaded_at is not None,
+            "age_seconds": (time.monotonic() - self._loaded_at) if self._loaded_at else None,
+            "listening": bool(self._listener_task and not self._listener_task.done()),
+        }
+
+    # ── Cross-worker sync ────────────────────────────────────────────
+
+    def _publish(self, tool_name: str, version_number: Optional[int]) -> None:
+        try:
+            if self._redis_sync is None:
+                import redis
+                url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                self._redis_sync = redis.Redis.from_url(url, decode_responses=True)
+            self._redis_sync.publish(
+                CHANGES_CHANNEL,
+                json.dumps({"origin": self._origin, "tool": tool_name, "version": version_number}),
+            )
+        except Exception as e:
+            logger.debug("Tool version change publish skipped: %s", e)
+
+    async def start_listener(self, redis_url: Optional[str] = None) -> None:
+        """Subscribe to tool version changes published by other workers."""
+        if self._listener_task and not self._listener_task.done():
+            return
+        self._listener_task = asyncio.create_task(self._listen(redis_url))
+
+    async def stop_listener(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+
+    async def _listen(self, redis_url: Optional[str]) -> None:
+        import redis.asyncio as aioredis
+
+        url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        client = aioredis.from_url(url, decode_responses=True)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(CHANGES_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                if data.get("origin") == self._origin or not data.get("tool"):
+                    continue
+                if data.get("version") is None:
+                    self.remove(data["tool"], publish=False)
+                else:
+                    self.set(data["tool"], int(data["version"]), publish=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Tool version listener stopped: %s", e)
+        finally:
+            await pubsub.close()
+            await client.close()
+
+
+# Global instance
+active_tool_versions = ActiveToolVersionMap()
@@ -18,6 +18,7 @@ from backend.models.entities.tool_staging import ToolStaging
 from backend.models.entities.audit import AuditLog, AuditLevel, AuditCategory
 from backend.services.tool_factory import ToolFactory
 from backend.core.tool_registry import tool_registry
+from backend.services.tool_version_map import active_tool_versions
 
 
 class ToolVersioningService:
@@ -65,6 +66,7 @@ class ToolVersioningService:
         self.db.add(version)
         self.db.commit()
         self.db.refresh(version)
+        active_tool_versions.set(tool_name, version.version_number)
         return version
 
     # ──────────────────────────────────────────────────────────────
@@ -211,6 +213,7 @@ class ToolVersioningService:
             )
 
         self.db.commit()
+        active_tool_versions.set(tool_name, pending.version_number)
 
         self._audit(
             "tool_updated",
@@ -308,6 +311,7 @@ class ToolVersioningService:
             )
 
         self.db.commit()
+        active_tool_versions.set(tool_name, new_version_number)
 
         self._audit(
             "tool_rolled_back",
@@ -0,0 +1,282 @@
+"""
+Buffered usage-log writer for Agentium.
+
+LLM calls (``BaseModelProvider._log_usage``) and tool calls
+(``ToolAnalyticsService._write_log``) used to open a session and commit one
+log row per call - from inside the event loop in the LLM case.  Producers now
+hand rows to a bounded in-memory queue and return immediately; a writer
+thread drains it every ``USAGE_LOG_BATCH_SIZE`` rows or
+``USAGE_LOG_FLUSH_MS`` milliseconds, whichever comes first, and writes:
+
+  * one multi-row INSERT per log table, and
+  * one UPDATE per ``UserModelConfig`` for the aggregated
+    ``increment_usage`` counters (requests, tokens, cost, last_used_at),
+
+in a single transaction.  When the queue is full new rows are dropped and
+counted rather than blocking the caller.  ``shutdown()`` flushes whatever
+is still queued.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+USAGE_LOG_QUEUE_SIZE: int = int(os.getenv("USAGE_LOG_QUEUE_SIZE", "10000"))
+USAGE_LOG_BATCH_SIZE: int = int(os.getenv("USAGE_LOG_BATCH_SIZE", "200"))
+USAGE_LOG_FLUSH_MS: float = float(os.getenv("USAGE_LOG_FLUSH_MS", "500"))
+
+# (entity class, column values)
+_Row = Tuple[type, Dict[str, Any]]
+_FLUSH = object()
+
+
+class UsageLogWriter:
+    """
+    Bounded queue of log rows plus per-config usage counters.
+
+    Thread-safe: rows may be submitted from the event loop, from executor
+    threads (tool calls) and from Celery workers alike.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = USAGE_LOG_QUEUE_SIZE,
+        batch_size: int = USAGE_LOG_BATCH_SIZE,
+        flush_ms: float = USAGE_LOG_FLUSH_MS,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_ms) / 1000.0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_queue_size))
+        # config_id -> [requests, tokens, cost_usd, last_used_at]
+        self._config_usage: Dict[str, List[Any]] = {}
+        self._usage_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._closed = False
+
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "config_updates": 0,
+            "errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def submit(self, entity: type, row: Dict[str, Any]) -> bool:
+        """
+        Queue one log row for *entity* (an ORM class); never blocks.
+
+        Returns ``False`` when the row was dropped (queue full or shut down).
+        """
+        if self._closed:
+            self.stats["dropped"] += 1
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((entity, row))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            if self.stats["dropped"] % 1000 == 1:
+                logger.warning("Usage log queue full; %d rows dropped so far", self.stats["dropped"])
+            return False
+        self.stats["submitted"] += 1
+        return True
+
+    def add_config_usage(self, config_id: str, tokens: int, cost_usd: float = 0.0) -> None:
+        """Aggregate ``UserModelConfig.increment_usage`` until the next flush."""
+        if not config_id:
+            return
+        self._ensure_started()
+        with self._usage_lock:
+            usage = self._config_usage.get(config_id)
+            if usage is None:
+                usage = self._config_usage[config_id] = [0, 0, 0.0, None]
+            usage[0] += 1
+            usage[1] += tokens or 0
+            usage[2] += cost_usd or 0.0
+            usage[3] = datetime.utcnow()
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ask the writer to flush now and wait until it has; ``False`` on timeout."""
+        if self._writer is None or not self._writer.is_alive():
+            self._write_batch(self._drain())
+            return True
+        with self._flushed:
+            try:
+                self._queue.put(_FLUSH, timeout=timeout)
+            except queue.Full:
+                return False
+            return self._flushed.wait(timeout)
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting rows, write everything still queued, stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout)
+        else:
+            self._write_batch(self._drain())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._usage_lock:
+            pending_configs = len(self._config_usage)
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "pending_config_updates": pending_configs,
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_interval * 1000,
+        }
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                name="usage-log-writer",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch: List[_Row] = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = flush_requested = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item is _FLUSH:
+                    flush_requested = True
+                    break
+                batch.append(item)
+
+            if stop or flush_requested:
+                batch.extend(self._drain())
+                stop = stop or self._closed
+            self._write_batch(batch)
+
+            if flush_requested or stop:
+                with self._flushed:
+                    self._flushed.notify_all()
+            if stop:
+                return
+
+    def _drain(self) -> List[_Row]:
+        rows: List[_Row] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if item is None:
+                self._closed = True
+            elif item is not _FLUSH:
+                rows.append(item)
+
+    def _take_config_usage(self) -> Dict[str, List[Any]]:
+        with self._usage_lock:
+            usage, self._config_usage = self._config_usage, {}
+        return usage
+
+    def _write_batch(self, batch: List[_Row]) -> None:
+        usage = self._take_config_usage()
+        if not batch and not usage:
+            return
+
+        from sqlalchemy import insert
+        from backend.models.database import get_db_context
+
+        by_entity: Dict[type, List[Dict[str, Any]]] = {}
+        for entity, row in batch:
+            by_entity.setdefault(entity, []).append(row)
+
+        try:
+            with get_db_context() as db:
+                for entity, rows in by_entity.items():
+                    db.execute(insert(entity), rows)
+                self._apply_config_usage(db, usage)
+            self.stats["batches"] += 1
+            self.stats["written"] += len(batch)
+            self.stats["config_updates"] += len(usage)
+        except Exception as exc:
+            # One bad row must not cost the whole batch: retry row by row
+            self.stats["errors"] += 1
+            logger.warning("Usage log batch of %d rows failed (%s); retrying individually", len(batch), exc)
+            self._write_rows_individually(batch)
+            try:
+                with get_db_context() as db:
+                    self._apply_config_usage(db, usage)
+                self.stats["config_updates"] += len(usage)
+            except Exception as usage_exc:
+                logger.warning("Config usage counters for %d configs lost: %s", len(usage), usage_exc)
+
+    @staticmethod
+    def _apply_config_usage(db: Any, usage: Dict[str, List[Any]]) -> None:
+        from sqlalchemy import update
+        from backend.models.entities.user_config import UserModelConfig
+
+        for config_id, (requests, tokens, cost, last_used_at) in usage.items():
+            db.execute(
+                update(UserModelConfig)
+                .where(UserModelConfig.id == config_id)
+                .values(
+                    total_requests=UserModelConfig.total_requests + requests,
+                    total_tokens=UserModelConfig.total_tokens + tokens,
+                    estimated_cost_usd=UserModelConfig.estimated_cost_usd + cost,
+                    last_used_at=last_used_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    def _write_rows_individually(self, batch: List[_Row]) -> None:
+        from sqlalchemy import insert
+        from backend.models.database import get_db_context
+
+        for entity, row in batch:
+            try:
+                with get_db_context() as db:
+                    db.execute(insert(entity), [row])
+                self.stats["written"] += 1
+            except Exception as exc:
+                self.stats["dropped"] += 1
+                logger.debug("Usage log row for %s dropped: %s", entity.__name__, exc)
+
+
+# Global instance
+usage_log_writer = UsageLogWriter()
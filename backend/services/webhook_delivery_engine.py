@@ -0,0 +1,255 @@
+"""
+Webhook Delivery Engine - pooled, concurrent outbound webhook POSTs.
+
+``WebhookDispatchService`` used to deliver to each subscriber in turn with a
+fresh ``httpx.AsyncClient`` per delivery, so one slow endpoint (10s timeout)
+held up every other subscriber and each event paid one TLS handshake per
+subscriber.  The engine keeps, per event loop, one warm ``httpx.AsyncClient``
+and delivers a whole fan-out concurrently, bounded by:
+
+  * ``WEBHOOK_MAX_CONCURRENCY`` in-flight requests overall, and
+  * ``WEBHOOK_PER_HOST_CONCURRENCY`` in-flight requests per host, so a
+    single receiver cannot take every slot.
+
+A per-endpoint circuit breaker stops hammering receivers that keep failing:
+after ``WEBHOOK_BREAKER_THRESHOLD`` consecutive failures the endpoint is
+skipped for ``WEBHOOK_BREAKER_COOLDOWN_SECONDS``, then a single trial request
+decides whether it closes again.  Skipped deliveries fail like any other
+attempt and follow the normal retry schedule.
+
+The engine only does HTTP; delivery rows are updated by the caller, on its
+own session, once the results are in.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_MAX_CONCURRENCY: int = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "50"))
+WEBHOOK_PER_HOST_CONCURRENCY: int = int(os.getenv("WEBHOOK_PER_HOST_CONCURRENCY", "4"))
+WEBHOOK_TIMEOUT_SECONDS: float = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_BREAKER_THRESHOLD: int = int(os.getenv("WEBHOOK_BREAKER_THRESHOLD", "5"))
+WEBHOOK_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("WEBHOOK_BREAKER_COOLDOWN_SECONDS", "60"))
+
+CIRCUIT_OPEN_ERROR = "Circuit open: endpoint is failing consistently"
+
+# (url, body, headers)
+DeliveryRequest = Tuple[str, bytes, Dict[str, str]]
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one POST; ``error`` is ``None`` only for a 2xx response."""
+    status_code: Optional[int] = None
+    response_body: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _Circuit:
+    """Failure bookkeeping for one endpoint."""
+
+    __slots__ = ("failures", "open_until", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until: Optional[float] = None
+        self.probing = False
+
+
+class _LoopState:
+    """HTTP client and concurrency limits that belong to one event loop."""
+
+    __slots__ = ("client", "slots", "hosts")
+
+    def __init__(self, max_concurrency: int):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+
+class WebhookDeliveryEngine:
+    """Process-wide webhook sender shared by dispatch, retries and test pings."""
+
+    def __init__(
+        self,
+        max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+        per_host_concurrency: int = WEBHOOK_PER_HOST_CONCURRENCY,
+        timeout: float = WEBHOOK_TIMEOUT_SECONDS,
+        breaker_threshold: int = WEBHOOK_BREAKER_THRESHOLD,
+        breaker_cooldown: float = WEBHOOK_BREAKER_COOLDOWN_SECONDS,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.timeout = timeout
+        self.breaker_threshold = max(1, breaker_threshold)
+        self.breaker_cooldown = breaker_cooldown
+
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+        # asyncio primitives and httpx pools are bound to the loop that uses
+        # them, so Celery tasks running their own loop get their own state
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "delivered": 0,
+            "failed": 0,
+            "short_circuited": 0,
+            "circuits_opened": 0,
+        }
+
+    # ── Delivery ─────────────────────────────────────────────────────
+
+    async def deliver_many(
+        self, requests: Sequence[DeliveryRequest], force: bool = False
+    ) -> List[DeliveryResult]:
+        """POST every request concurrently; results come back in request order."""
+        if not requests:
+            return []
+        return list(await asyncio.gather(*(self.post(*r, force=force) for r in requests)))
+
+    async def post(
+        self, url: str, body: bytes, headers: Dict[str, str], force: bool = False
+    ) -> DeliveryResult:
+        """
+        POST one webhook; never raises for delivery problems.
+
+        *force* skips the circuit check (manual test pings); the outcome is
+        still recorded, so a successful forced request closes the circuit.
+        """
+        if not force and not self._allow(url):
+            self.stats["short_circuited"] += 1
+            return DeliveryResult(error=CIRCUIT_OPEN_ERROR)
+
+        try:
+            state = self._loop_state()
+            # Host slot first: requests queued behind one slow receiver must
+            # not sit on the global slots other receivers could use
+            async with self._host_slot(state, url), state.slots:
+                self.stats["requests"] += 1
+                response = await self._client(state).post(url, content=body, headers=headers)
+            result = DeliveryResult(
+                status_code=response.status_code,
+                response_body=response.text[:2000] if response.text else None,
+                error=None if 200 <= response.status_code < 300 else f"HTTP {response.status_code}",
+            )
+        except httpx.TimeoutException:
+            result = DeliveryResult(error="Request timed out")
+        except httpx.RequestError as exc:
+            result = DeliveryResult(error=f"Connection error: {exc}")
+        except asyncio.CancelledError:
+            self._release_probe(url)
+            raise
+        except Exception as exc:
+            # Invalid URLs and the like: report, don't break the fan-out
+            result = DeliveryResult(error=f"Delivery error: {exc}")
+
+        self._record(url, result.ok)
+        self.stats["delivered" if result.ok else "failed"] += 1
+        return result
+
+    # ── Circuit breaker ──────────────────────────────────────────────
+
+    def _allow(self, url: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(url)
+            if circuit is None or circuit.open_until is None:
+                return True
+            if time.monotonic() < circuit.open_until or circuit.probing:
+                return False
+            circuit.probing = True  # Half-open: let one trial request through
+            return True
+
+    def _record(self, url: str, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._circuits.pop(url, None)
+                return
+            circuit = self._circuits.get(url)
+            if circuit is None:
+                circuit = self._circuits[url] = _Circuit()
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.failures >= self.breaker_threshold:
+                if circuit.open_until is None:
+                    self.stats["circuits_opened"] += 1
+                    logger.warning(
+                        "Webhook circuit opened for %s after %d consecutive failures",
+                        url, circuit.failures,
+                    )
+                circuit.open_until = time.monotonic() + self.breaker_cooldown
+
+    def _release_probe(self, url: str) -> None:
+        with self._lock:
+            circuit = self._circuits.get(url)
+            if circuit is not None:
+                circuit.probing = False
+
+    # ── Per-loop state ───────────────────────────────────────────────
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.max_concurrency)
+        return state
+
+    def _host_slot(self, state: _LoopState, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        slot = state.hosts.get(host)
+        if slot is None:
+            slot = state.hosts[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return slot
+
+    def _client(self, state: _LoopState) -> httpx.AsyncClient:
+        if state.client is None or state.client.is_closed:
+            state.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return state.client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client opened on the running event loop."""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and state.client is not None:
+            try:
+                await state.client.aclose()
+            except Exception as e:
+                logger.debug("Closing webhook HTTP client failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            open_circuits = [
+                url for url, c in self._circuits.items()
+                if c.open_until is not None and c.open_until > now
+            ]
+        return {
+            **self.stats,
+            "open_circuits": open_circuits,
+            "max_concurrency": self.max_concurrency,
+            "per_host_concurrency": self.per_host_concurrency,
+        }
+
+
+# Global instance
+webhook_delivery_engine = WebhookDeliveryEngine()
@@ -4,21 +4,28 @@ Phase 12.2 — Webhook Dispatch Service
 Fires outbound webhook events to all matching subscriptions with:
   - HMAC-SHA256 signing
   - Exponential backoff retry (5 attempts)
-  - Fire-and-forget background delivery
+  - Concurrent delivery over a shared, pooled HTTP client with per-host
+    limits and circuit breaking (see webhook_delivery_engine.py)
+  - An in-process event type -> subscriptions index, refreshed when
+    subscriptions change (hooks in models/entities/webhook.py) and at
+    least every WEBHOOK_INDEX_TTL_SECONDS
 """
 
 import hashlib
 import hmac
 import json
 import logging
+import threading
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import httpx
 from sqlalchemy.orm import Session
 
 from backend.models.entities.webhook import WebhookSubscription, WebhookDeliveryLog
+from backend.services.webhook_delivery_engine import DeliveryResult, webhook_delivery_engine
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +33,11 @@ logger = logging.getLogger(__name__)
 RETRY_DELAYS = [10, 30, 90, 270, 810]
 MAX_ATTEMPTS = 5
 
+# Bounds how long another worker's subscription edits can go unnoticed
+WEBHOOK_INDEX_TTL_SECONDS = 30
+# Deliveries retried per retry_pending_deliveries call
+RETRY_BATCH_SIZE = 500
+
 # All supported event types
 SUPPORTED_EVENTS = {
     "task.created",
@@ -39,6 +51,62 @@ SUPPORTED_EVENTS = {
 }
 
 
+@dataclass(frozen=True)
+class _Target:
+    """What delivery needs from a subscription (no ORM state)."""
+    id: str
+    url: str
+    secret: str
+
+
+class WebhookSubscriptionIndex:
+    """Active subscriptions grouped by event type."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_event: Dict[str, Tuple[_Target, ...]] = {}
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+
+    def for_event(self, event_type: str, db: Session) -> Tuple[_Target, ...]:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > WEBHOOK_INDEX_TTL_SECONDS:
+            self._load(db)
+        return self._by_event.get(event_type, ())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+    def _load(self, db: Session) -> None:
+        generation = self._generation
+        rows = (
+            db.query(
+                WebhookSubscription.id,
+                WebhookSubscription.url,
+                WebhookSubscription.secret,
+                WebhookSubscription.events,
+            )
+            .filter(WebhookSubscription.is_active == True)
+            .all()
+        )
+        by_event: Dict[str, List[_Target]] = {}
+        for sub_id, url, secret, events in rows:
+            target = _Target(sub_id, url, secret)
+            for event_type in set(events or []):
+                by_event.setdefault(event_type, []).append(target)
+        with self._lock:
+            self._by_event = {event: tuple(targets) for event, targets in by_event.items()}
+            # A change committed while we were loading keeps the index stale
+            if generation == self._generation:
+                self._loaded_at = time.monotonic()
+
+
+# Global instance
+webhook_subscription_index = WebhookSubscriptionIndex()
+
+
 class WebhookDispatchService:
     """Dispatch outbound webhook events to registered subscriptions."""
 
@@ -51,6 +119,17 @@ class WebhookDispatchService:
             hashlib.sha256,
         ).hexdigest()
 
+    @staticmethod
+    def _headers(secret: str, delivery: WebhookDeliveryLog, payload_bytes: bytes) -> Dict[str, str]:
+        signature = WebhookDispatchService.sign_payload(secret, payload_bytes)
+        return {
+            "Content-Type": "application/json",
+            "X-Agentium-Event": delivery.event_type,
+            "X-Agentium-Delivery-ID": delivery.delivery_id,
+            "X-Agentium-Signature": f"sha256={signature}",
+            "User-Agent": "Agentium-Webhooks/1.0",
+        }
+
     @staticmethod
     async def dispatch_event(
         event_type: str,
@@ -66,108 +145,95 @@ class WebhookDispatchService:
             logger.warning("Unknown webhook event type: %s", event_type)
             return 0
 
-        subscriptions: List[WebhookSubscription] = (
-            db.query(WebhookSubscription)
-            .filter(
-                WebhookSubscription.is_active == True,
-            )
-            .all()
-        )
-
-        # Filter to subscriptions that include this event type
-        matching = [
-            sub for sub in subscriptions
-            if event_type in (sub.events or [])
-        ]
-
+        matching = webhook_subscription_index.for_event(event_type, db)
         if not matching:
             return 0
 
-        count = 0
-        for sub in matching:
-            delivery = WebhookDeliveryLog(
+        deliveries = [
+            WebhookDeliveryLog(
                 subscription_id=sub.id,
                 delivery_id=str(uuid.uuid4()),
                 event_type=event_type,
                 payload=payload,
+                attempts=0,
             )
-            db.add(delivery)
-            db.flush()  # get the delivery_id assigned
-
-            # Attempt immediate delivery
-            try:
-                await WebhookDispatchService._deliver(sub, delivery, db)
-            except Exception as exc:
-                logger.error(
-                    "Webhook delivery failed for sub=%s event=%s: %s",
-                    sub.id, event_type, exc,
-                )
-                # Schedule retry
-                delivery.error = str(exc)
-                delivery.next_retry_at = datetime.utcnow() + timedelta(seconds=RETRY_DELAYS[0])
-
-            count += 1
+            for sub in matching
+        ]
+        db.add_all(deliveries)
+        db.flush()
+
+        # Attempt immediate delivery to every subscriber at once
+        await WebhookDispatchService._deliver_all(list(zip(matching, deliveries)))
 
         db.commit()
-        return count
+        return len(deliveries)
+
+    @staticmethod
+    async def _deliver_all(
+        pairs: Sequence[Tuple[Any, WebhookDeliveryLog]],
+        force: bool = False,
+    ) -> List[bool]:
+        """
+        Deliver each (subscription, delivery) pair concurrently.
+
+        *subscription* is anything with ``id``, ``url`` and ``secret``.  The
+        delivery rows are updated only after all requests have finished, so
+        the session is never touched from concurrent tasks.  *force* bypasses
+        open circuits (see WebhookDeliveryEngine.post).
+        """
+        # Deliveries of one event share the payload object: serialize it once
+        bodies: Dict[int, bytes] = {}
+        requests = []
+        for sub, delivery in pairs:
+            body = bodies.get(id(delivery.payload))
+            if body is None:
+                body = bodies[id(delivery.payload)] = json.dumps(delivery.payload, default=str).encode("utf-8")
+            requests.append((sub.url, body, WebhookDispatchService._headers(sub.secret, delivery, body)))
+
+        results = await webhook_delivery_engine.deliver_many(requests, force=force)
+        return [
+            WebhookDispatchService._apply_result(sub, delivery, result)
+            for (sub, delivery), result in zip(pairs, results)
+        ]
 
     @staticmethod
     async def _deliver(
         subscription: WebhookSubscription,
         delivery: WebhookDeliveryLog,
         db: Session,
+        force: bool = False,
     ) -> bool:
         """
         Attempt to deliver a webhook event.
 
+        *force* sends even while the subscription's circuit is open.
         Returns True if delivery succeeded (2xx response).
         """
-        payload_bytes = json.dumps(delivery.payload, default=str).encode("utf-8")
-        signature = WebhookDispatchService.sign_payload(subscription.secret, payload_bytes)
-
-        headers = {
-            "Content-Type": "application/json",
-            "X-Agentium-Event": delivery.event_type,
-            "X-Agentium-Delivery-ID": delivery.delivery_id,
-            "X-Agentium-Signature": f"sha256={signature}",
-            "User-Agent": "Agentium-Webhooks/1.0",
-        }
-
-        delivery.attempts += 1
+        results = await WebhookDispatchService._deliver_all([(subscription, delivery)], force=force)
+        return results[0]
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    subscription.url,
-                    content=payload_bytes,
-                    headers=headers,
-                )
-
-            delivery.status_code = response.status_code
-            delivery.response_body = response.text[:2000] if response.text else None
+    @staticmethod
+    def _apply_result(subscription: Any, delivery: WebhookDeliveryLog, result: DeliveryResult) -> bool:
+        """Record one attempt on *delivery* and schedule the retry if it failed."""
+        delivery.attempts = (delivery.attempts or 0) + 1
+        delivery.status_code = result.status_code
+        delivery.response_body = result.response_body
+
+        if result.ok:
+            delivery.delivered_at = datetime.utcnow()
+            delivery.next_retry_at = None
+            delivery.error = None
+            logger.info(
+                "✅ Webhook delivered: sub=%s event=%s status=%d",
+                subscription.id, delivery.event_type, result.status_code,
+            )
+            return True
 
-            if 200 <= response.status_code < 300:
-                delivery.delivered_at = datetime.utcnow()
-                delivery.next_retry_at = None
-                delivery.error = None
-                logger.info(
-                    "✅ Webhook delivered: sub=%s event=%s status=%d",
-                    subscription.id, delivery.event_type, response.status_code,
-                )
-                return True
-            else:
-                delivery.error = f"HTTP {response.status_code}"
-                logger.warning(
-                    "⚠️ Webhook delivery got non-2xx: sub=%s status=%d",
-                    subscription.id, response.status_code,
-                )
-
-        except httpx.TimeoutException:
-            delivery.error = "Request timed out"
-            logger.warning("⚠️ Webhook timeout: sub=%s", subscription.id)
-        except httpx.RequestError as exc:
-            delivery.error = f"Connection error: {exc}"
-            logger.warning("⚠️ Webhook connection error: sub=%s: %s", subscription.id, exc)
+        delivery.error = result.error
+        logger.warning(
+            "⚠️ Webhook delivery failed: sub=%s event=%s: %s",
+            subscription.id, delivery.event_type, result.error,
+        )
 
         # Schedule retry if attempts remain
         if delivery.attempts < MAX_ATTEMPTS:
@@ -204,31 +270,35 @@ class WebhookDispatchService:
                 WebhookDeliveryLog.delivered_at == None,
                 WebhookDeliveryLog.failed_at == None,
             )
+            .order_by(WebhookDeliveryLog.next_retry_at)
+            .limit(RETRY_BATCH_SIZE)
             .all()
         )
+        if not pending:
+            return 0
+
+        subscription_ids = {d.subscription_id for d in pending}
+        subscriptions = {
+            sub.id: sub
+            for sub in db.query(WebhookSubscription)
+            .filter(WebhookSubscription.id.in_(subscription_ids))
+            .all()
+        }
 
-        retried = 0
+        pairs = []
         for delivery in pending:
-            subscription = (
-                db.query(WebhookSubscription)
-                .filter(WebhookSubscription.id == delivery.subscription_id)
-                .first()
-            )
+            subscription = subscriptions.get(delivery.subscription_id)
             if not subscription or not subscription.is_active:
                 delivery.failed_at = now
                 delivery.next_retry_at = None
                 delivery.error = "Subscription deactivated"
                 continue
+            pairs.append((subscription, delivery))
 
-            try:
-                await WebhookDispatchService._deliver(subscription, delivery, db)
-            except Exception as exc:
-                logger.error("Retry failed for delivery %s: %s", delivery.delivery_id, exc)
-
-            retried += 1
+        await WebhookDispatchService._deliver_all(pairs)
 
         db.commit()
-        return retried
+        return len(pairs)
 
 
 # Module-level convenience function
@@ -49,6 +49,8 @@ export interface WebSocketMessage {
     content?: string;
     /** Server-generated stable ID — use for dedup, NOT timestamp */
     message_id?: string;
+    /** Broadcast stream sequence number (Redis stream ID) — replay resume point */
+    seq?: string;
     timestamp?: string;
     metadata?: Record<string, unknown>;
 
@@ -121,6 +123,8 @@ interface WebSocketState {
      */
     _connectionStable: boolean;
     _lastMessageTimestamp: string | null;
+    /** Stream sequence number of the last broadcast received (replay resume point) */
+    _lastEventSeq: string | null;
 
     // Public actions
     connect: () => void;
@@ -197,6 +201,7 @@ export const useWebSocketStore = create<WebSocketState>()((set, get) => ({
     _lastConnectTime:    0,       // BUG 3 FIX
     _connectionStable:   false,   // BUG 2 FIX
     _lastMessageTimestamp: null,
+    _lastEventSeq:       null,
 
     // ── Internal setters ───────────────────────────────────────────────────
     _setConnected:   (connected)  => set({ isConnected: connected }),
@@ -319,28 +324,49 @@ export const useWebSocketStore = create<WebSocketState>()((set, get) => ({
 
     _fetchReplay: async () => {
         const since = get()._lastMessageTimestamp;
-        if (!since) return;
+        let sinceId = get()._lastEventSeq;
+        if (!since && !sinceId) return;
         try {
             const token = localStorage.getItem('access_token');
             const headers: Record<string, string> = {};
             if (token) headers['Authorization'] = `Bearer ${token}`;
-            
-            const res = await fetch(`/api/v1/ws/replay?since=${encodeURIComponent(since)}`, { headers });
-            if (!res.ok) return;
-            const data = await res.json();
-            if (data.events && Array.isArray(data.events)) {
-                if (data.events.length > 0) {
-                    console.log(`[WebSocket] Replaying ${data.events.length} missed events`);
+
+            // The server answers in pages; keep reading until it has nothing more
+            let replayed = 0;
+            while (true) {
+                const query = sinceId
+                    ? `since_id=${encodeURIComponent(sinceId)}`
+                    : `since=${encodeURIComponent(since!)}`;
+                const res = await fetch(`/api/v1/ws/replay?${query}`, { headers });
+                if (!res.ok) return;
+                const data = await res.json();
+
+                if (data.gap) {
+                    // Events we missed were already trimmed from the stream:
+                    // replaying the rest would leave the UI inconsistent.
+                    console.warn('[WebSocket] Replay gap — missed events expired, reloading');
+                    window.location.reload();
+                    return;
                 }
+
                 const ws = get()._ws;
                 if (!ws || !ws.onmessage) return;
-                
-                data.events.forEach((ev: any) => {
-                    const syntheticEvent = new MessageEvent('message', {
-                        data: JSON.stringify(ev)
+
+                if (Array.isArray(data.events)) {
+                    data.events.forEach((ev: any) => {
+                        const syntheticEvent = new MessageEvent('message', {
+                            data: JSON.stringify(ev)
+                        });
+                        ws.onmessage!.call(ws, syntheticEvent as any);
                     });
-                    ws.onmessage!.call(ws, syntheticEvent as any);
-                });
+                    replayed += data.events.length;
+                }
+
+                if (!data.has_more || !data.last_id || data.last_id === sinceId) break;
+                sinceId = data.last_id;
+            }
+            if (replayed > 0) {
+                console.log(`[WebSocket] Replayed ${replayed} missed events`);
             }
         } catch (err) {
             console.error('[WebSocket] Replay fetch failed:', err);
@@ -444,6 +470,9 @@ export const useWebSocketStore = create<WebSocketState>()((set, get) => ({
                     if (data.timestamp) {
                         set({ _lastMessageTimestamp: data.timestamp });
                     }
+                    if (data.seq) {
+                        set({ _lastEventSeq: data.seq });
+                    }
 
                     get()._setLastMessage(data);
                     get().addMessageToHistory(data);